@@ -0,0 +1,264 @@
+"""Asyncio bus backend with bounded subscriber queues.
+
+    bus = simple_bus.open_async_bus(queue_size=1024)
+
+    async def fusion():
+        async for msg in bus.subscribe("signal.display.v1", policy=DROP_OLDEST):
+            ...
+
+    await bus.publish("market.tick.v1", tick)
+
+Each subscription owns a bounded queue. When it is full the subscription's
+policy decides what `publish` does:
+
+  - "block": wait until the subscriber catches up (lossless backpressure);
+  - "drop_newest": discard the incoming message for that subscriber;
+  - "drop_oldest": evict the subscriber's oldest queued message.
+
+Dropped messages are counted per subscription. Persistence goes through a
+background writer task that hands batches to the `BusWriter` in a worker
+thread; its queue is bounded too, so a slow disk applies backpressure to
+publishers instead of growing memory. A bus lives on a single event loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from services.event_store.writer import BusWriter
+
+POLICY_BLOCK = "block"
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+POLICIES = (POLICY_BLOCK, DROP_NEWEST, DROP_OLDEST)
+
+
+class Subscription:
+    """Async iterator over one subscriber's queue."""
+
+    def __init__(self, bus: "AsyncBus", topic: str, maxsize: int, policy: str):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown backpressure policy: {policy}")
+        self.topic = topic
+        self.maxsize = maxsize
+        self.policy = policy
+        self.delivered = 0
+        self.dropped = 0
+        self.closed = False
+        self._bus = bus
+        self._items: Deque[Dict[str, Any]] = deque()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        while not self._items:
+            if self.closed:
+                raise StopAsyncIteration
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        self._not_full.set()
+        return self._items.popleft()
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def full(self) -> bool:
+        return self.maxsize > 0 and len(self._items) >= self.maxsize
+
+    def close(self) -> None:
+        """Stop receiving; already queued messages are still yielded."""
+        self.closed = True
+        self._bus._unsubscribe(self)
+        self._not_empty.set()
+        self._not_full.set()
+
+    def _append(self, message: Dict[str, Any]) -> None:
+        self._items.append(message)
+        self.delivered += 1
+        self._not_empty.set()
+
+    def _offer(self, message: Dict[str, Any]) -> bool:
+        """Apply the drop policy; False means a blocking put is required."""
+        if self.closed:
+            return True
+        if self.full():
+            if self.policy == DROP_NEWEST:
+                self.dropped += 1
+                return True
+            if self.policy == DROP_OLDEST:
+                self._items.popleft()
+                self.dropped += 1
+            else:
+                return False
+        self._append(message)
+        return True
+
+    async def _put(self, message: Dict[str, Any]) -> None:
+        while not self._offer(message):
+            self._not_full.clear()
+            await self._not_full.wait()
+
+
+class AsyncBus:
+    """Asyncio publish/subscribe with optional persistence to the file log.
+
+    `writer_lock` guards the writer when it is shared with other backends
+    (see `simple_bus.open_async_bus`).
+    """
+
+    def __init__(
+        self,
+        writer: Optional[BusWriter] = None,
+        queue_size: int = 1024,
+        policy: str = POLICY_BLOCK,
+        persist_queue_size: int = 8192,
+        write_batch: int = 512,
+        writer_lock: Optional[threading.Lock] = None,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown backpressure policy: {policy}")
+        self.writer = writer
+        self.queue_size = queue_size
+        self.policy = policy
+        self.persist_queue_size = persist_queue_size
+        self.write_batch = max(1, write_batch)
+        self.writer_lock = writer_lock or threading.Lock()
+        self._subscriptions: Dict[str, List[Subscription]] = {}
+        self._persist_queue: Optional[
+            "asyncio.Queue[Tuple[str, Dict[str, Any]]]"
+        ] = None
+        self._writer_task: Optional["asyncio.Task[None]"] = None
+        self._error: Optional[BaseException] = None
+
+    def subscribe(
+        self,
+        topic: str,
+        maxsize: Optional[int] = None,
+        policy: Optional[str] = None,
+    ) -> Subscription:
+        """New subscription to `topic`, iterated with `async for`."""
+        sub = Subscription(
+            self,
+            topic,
+            self.queue_size if maxsize is None else maxsize,
+            policy or self.policy,
+        )
+        self._subscriptions.setdefault(topic, []).append(sub)
+        return sub
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subscriptions.get(sub.topic, [])
+        if sub in subs:
+            subs.remove(sub)
+
+    def _queue(self) -> "asyncio.Queue[Tuple[str, Dict[str, Any]]]":
+        if self._persist_queue is None:
+            self._persist_queue = asyncio.Queue(maxsize=self.persist_queue_size)
+            self._writer_task = asyncio.get_running_loop().create_task(
+                self._run_writer()
+            )
+        return self._persist_queue
+
+    def _write_batch(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        assert self.writer is not None
+        with self.writer_lock:
+            for topic, message in batch:
+                self.writer.publish(topic, message)
+
+    def _flush_writer(self, topic: Optional[str]) -> None:
+        assert self.writer is not None
+        with self.writer_lock:
+            self.writer.flush(topic)
+
+    async def _run_writer(self) -> None:
+        q = self._queue()
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await q.get()]
+            while len(batch) < self.write_batch and not q.empty():
+                batch.append(q.get_nowait())
+            try:
+                await loop.run_in_executor(None, self._write_batch, batch)
+            except Exception as exc:  # surfaced on the next publish/flush
+                self._error = exc
+            finally:
+                for _ in batch:
+                    q.task_done()
+
+    def _raise_pending_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    async def publish(self, topic: str, message: Dict[str, Any]) -> None:
+        """Persist and deliver `message`, waiting on full blocking queues."""
+        self._raise_pending_error()
+        if self.writer is not None:
+            await self._queue().put((topic, message))
+        for sub in tuple(self._subscriptions.get(topic, ())):
+            await sub._put(message)
+
+    def publish_nowait(self, topic: str, message: Dict[str, Any]) -> None:
+        """Non-blocking publish for synchronous callers on the loop thread.
+
+        Raises `asyncio.QueueFull` without delivering anything when the
+        persistence queue or a blocking subscriber's queue is full; drop
+        policies apply as usual. Suitable as a `simple_bus.subscribe`
+        callback to bridge synchronous stages into the async bus.
+        """
+        self._raise_pending_error()
+        subs = tuple(self._subscriptions.get(topic, ()))
+        q = self._queue() if self.writer is not None else None
+        if (q is not None and q.full()) or any(
+            s.policy == POLICY_BLOCK and s.full() and not s.closed for s in subs
+        ):
+            raise asyncio.QueueFull(topic)
+        if q is not None:
+            q.put_nowait((topic, message))
+        for sub in subs:
+            sub._offer(message)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-topic totals of queued, delivered and dropped messages."""
+        out: Dict[str, Dict[str, int]] = {}
+        for topic, subs in self._subscriptions.items():
+            out[topic] = {
+                "subscribers": len(subs),
+                "queued": sum(s.qsize() for s in subs),
+                "delivered": sum(s.delivered for s in subs),
+                "dropped": sum(s.dropped for s in subs),
+            }
+        return out
+
+    async def flush(self, topic: Optional[str] = None) -> None:
+        """Wait for queued persistence and flush the writer."""
+        if self._persist_queue is not None:
+            await self._persist_queue.join()
+        self._raise_pending_error()
+        if self.writer is not None:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._flush_writer, topic
+            )
+
+    async def close(self) -> None:
+        """Flush, stop the writer task and end every subscription.
+
+        The writer itself is left open; its owner closes it.
+        """
+        await self.flush()
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+        self._writer_task = None
+        self._persist_queue = None
+        for subs in list(self._subscriptions.values()):
+            for sub in list(subs):
+                sub.close()
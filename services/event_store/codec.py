@@ -0,0 +1,304 @@
+"""Record formats for topic files: NDJSON and length-prefixed binary.
+
+The format of a data file follows from its suffix (`.ndjson` / `.bin`), so
+readers decode both transparently. Binary frames are a uint32 payload length
+followed by the payload, whose first byte selects the schema:
+
+  - fixed schemas (ticks, bars): struct-packed int64/bool fields followed by
+    length-prefixed UTF-8 strings;
+  - anything else: compact sorted-key JSON.
+
+A message only uses a fixed schema when its key set and value types match
+exactly, so decoding always returns an equal dict.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+NDJSON_SUFFIX = ".ndjson"
+BINARY_SUFFIX = ".bin"
+ENCODING_NDJSON = "ndjson"
+ENCODING_BINARY = "binary"
+
+SCHEMA_JSON = 0
+SCHEMA_TICK = 1
+SCHEMA_BAR = 2
+
+_HEADER = struct.Struct("<I")
+_STR_LEN = struct.Struct("<H")
+_INT64 = struct.Struct("<q")
+_BOOL = struct.Struct("<?")
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+
+# (offset of the record, payload, offset just past the record)
+RecordSpan = Tuple[int, bytes, int]
+
+
+def _dump_json(message: Dict[str, Any]) -> str:
+    return json.dumps(message, separators=(",", ":"), sort_keys=True)
+
+
+class _FixedSchema:
+    def __init__(
+        self,
+        schema_id: int,
+        ints: Sequence[str],
+        bools: Sequence[str] = (),
+        strs: Sequence[str] = (),
+    ):
+        self.schema_id = schema_id
+        self.ints = tuple(ints)
+        self.bools = tuple(bools)
+        self.strs = tuple(strs)
+        self.keys = frozenset(self.ints + self.bools + self.strs)
+        self.struct = struct.Struct("<B" + "q" * len(ints) + "?" * len(bools))
+        # Decoded dicts use sorted key order, like json.loads of sort_keys output.
+        names = self.ints + self.bools + self.strs
+        self._order = sorted(range(len(names)), key=lambda i: names[i])
+        self._names = [names[i] for i in self._order]
+        self.names = tuple(self._names)
+        # Fixed-width fields can be read in place without decoding the record.
+        self._fixed = {}
+        pos = 1
+        for name in self.ints:
+            self._fixed[name] = (pos, _INT64)
+            pos += _INT64.size
+        for name in self.bools:
+            self._fixed[name] = (pos, _BOOL)
+            pos += _BOOL.size
+
+    def pack(self, message: Dict[str, Any]) -> Optional[bytes]:
+        if message.keys() != self.keys:
+            return None
+        values: List[Any] = [self.schema_id]
+        for name in self.ints:
+            v = message[name]
+            if type(v) is not int or not _INT64_MIN <= v <= _INT64_MAX:
+                return None
+            values.append(v)
+        for name in self.bools:
+            v = message[name]
+            if type(v) is not bool:
+                return None
+            values.append(v)
+        parts = [self.struct.pack(*values)]
+        for name in self.strs:
+            v = message[name]
+            if type(v) is not str:
+                return None
+            raw = v.encode("utf-8")
+            if len(raw) > 0xFFFF:
+                return None
+            parts.append(_STR_LEN.pack(len(raw)))
+            parts.append(raw)
+        return b"".join(parts)
+
+    def field(self, payload: Any, name: str) -> Any:
+        """Single field straight from the payload buffer."""
+        fixed = self._fixed.get(name)
+        if fixed is not None:
+            pos, fmt = fixed
+            return fmt.unpack_from(payload, pos)[0]
+        if name not in self.strs:
+            raise KeyError(name)
+        pos = self.struct.size
+        for str_name in self.strs:
+            (n,) = _STR_LEN.unpack_from(payload, pos)
+            pos += _STR_LEN.size
+            if str_name == name:
+                return bytes(payload[pos : pos + n]).decode("utf-8")
+            pos += n
+        raise KeyError(name)
+
+    def unpack(self, payload: bytes) -> Dict[str, Any]:
+        values = list(self.struct.unpack_from(payload))[1:]
+        pos = self.struct.size
+        for _ in self.strs:
+            (n,) = _STR_LEN.unpack_from(payload, pos)
+            pos += _STR_LEN.size
+            values.append(bytes(payload[pos : pos + n]).decode("utf-8"))
+            pos += n
+        return dict(zip(self._names, [values[i] for i in self._order]))
+
+
+TICK_SCHEMA = _FixedSchema(
+    SCHEMA_TICK,
+    ints=("seq_no", "ts_ms", "recv_ts_ms", "price_ticks", "size"),
+    strs=("source_id", "symbol", "venue"),
+)
+BAR_SCHEMA = _FixedSchema(
+    SCHEMA_BAR,
+    ints=(
+        "timeframe_ms",
+        "timeframe_start_ms",
+        "open",
+        "high",
+        "low",
+        "close",
+        "volume",
+        "trade_count",
+        "version",
+        "emitted_ts_ms",
+    ),
+    bools=("replaced",),
+    strs=("symbol",),
+)
+FIXED_SCHEMAS = {s.schema_id: s for s in (TICK_SCHEMA, BAR_SCHEMA)}
+
+
+class RecordFormat(ABC):
+    """How records are framed in a data file."""
+
+    name = ""
+    suffix = ""
+
+    @abstractmethod
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        ...
+
+    @abstractmethod
+    def decode(self, payload: bytes) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def frame(self, payload: bytes) -> bytes:
+        ...
+
+    @abstractmethod
+    def iter_records(self, buf: Any, pos: int = 0) -> Iterator[RecordSpan]:
+        """Complete records in `buf` from `pos`; a partial tail is left alone."""
+
+
+class NdjsonFormat(RecordFormat):
+    name = ENCODING_NDJSON
+    suffix = NDJSON_SUFFIX
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        return (_dump_json(message) + "\n").encode("utf-8")
+
+    def decode(self, payload: bytes) -> Dict[str, Any]:
+        return json.loads(bytes(payload))
+
+    def frame(self, payload: bytes) -> bytes:
+        return bytes(payload) + b"\n"
+
+    def iter_records(self, buf: Any, pos: int = 0) -> Iterator[RecordSpan]:
+        while True:
+            end = buf.find(b"\n", pos)
+            if end < 0:
+                return
+            payload = buf[pos:end]
+            if payload.strip():
+                yield pos, payload, end + 1
+            pos = end + 1
+
+
+class BinaryFormat(RecordFormat):
+    name = ENCODING_BINARY
+    suffix = BINARY_SUFFIX
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        for schema in FIXED_SCHEMAS.values():
+            payload = schema.pack(message)
+            if payload is not None:
+                return self.frame(payload)
+        return self.frame(bytes([SCHEMA_JSON]) + _dump_json(message).encode("utf-8"))
+
+    def decode(self, payload: bytes) -> Dict[str, Any]:
+        schema = self.schema(payload)
+        if schema is None:
+            return json.loads(bytes(payload[1:]))
+        return schema.unpack(payload)
+
+    def schema(self, payload: Any) -> Optional[_FixedSchema]:
+        """Fixed schema of a payload, or None for the JSON fallback."""
+        schema_id = payload[0]
+        if schema_id == SCHEMA_JSON:
+            return None
+        schema = FIXED_SCHEMAS.get(schema_id)
+        if schema is None:
+            raise ValueError(f"unknown binary record schema: {schema_id}")
+        return schema
+
+    def frame(self, payload: bytes) -> bytes:
+        return _HEADER.pack(len(payload)) + bytes(payload)
+
+    def iter_records(self, buf: Any, pos: int = 0) -> Iterator[RecordSpan]:
+        size = len(buf)
+        while pos + _HEADER.size <= size:
+            (length,) = _HEADER.unpack_from(buf, pos)
+            end = pos + _HEADER.size + length
+            if end > size:
+                return
+            yield pos, buf[pos + _HEADER.size : end], end
+            pos = end
+
+
+NDJSON = NdjsonFormat()
+BINARY = BinaryFormat()
+FORMATS = {f.name: f for f in (NDJSON, BINARY)}
+DATA_SUFFIXES = tuple(f.suffix for f in FORMATS.values())
+
+
+def format_named(name: str) -> RecordFormat:
+    try:
+        return FORMATS[name]
+    except KeyError:
+        raise ValueError(f"unknown topic encoding: {name}") from None
+
+
+def format_for(path: Path) -> RecordFormat:
+    return BINARY if path.suffix == BINARY_SUFFIX else NDJSON
+
+
+def sidecar_path(data_path: Path, suffix: str) -> Path:
+    """Index sidecar next to a data file; binary files keep their suffix in it."""
+    if data_path.suffix == BINARY_SUFFIX:
+        return data_path.with_name(data_path.name + suffix)
+    return data_path.with_suffix(suffix)
+
+
+def scan(path: Path, chunk_size: int = 1 << 20) -> Iterator[Tuple[int, bytes]]:
+    """Stream (offset, payload) for every complete record of a data file."""
+    fmt = format_for(path)
+    base = 0
+    buf = b""
+    with path.open("rb") as fh:
+        while True:
+            data = fh.read(chunk_size)
+            if not data:
+                return
+            buf += data
+            consumed = 0
+            for offset, payload, end in fmt.iter_records(buf):
+                yield base + offset, payload
+                consumed = end
+            buf = buf[consumed:]
+            base += consumed
+
+
+def iter_messages(path: Path) -> Iterator[Dict[str, Any]]:
+    fmt = format_for(path)
+    for _, payload in scan(path):
+        yield fmt.decode(payload)
+
+
+def read_at(path: Path, offsets: Sequence[int]) -> Iterator[Dict[str, Any]]:
+    """Decode the records starting at each of `offsets`."""
+    if not offsets:
+        return
+    fmt = format_for(path)
+    with path.open("rb") as fh:
+        for offset in offsets:
+            fh.seek(offset)
+            if fmt is NDJSON:
+                yield fmt.decode(fh.readline())
+                continue
+            (length,) = _HEADER.unpack(fh.read(_HEADER.size))
+            yield fmt.decode(fh.read(length))
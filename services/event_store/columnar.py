@@ -0,0 +1,313 @@
+"""Columnar store for historical ticks and bars.
+
+    writer = ColumnarWriter(root, "market.tick.v1")
+    writer.extend(ticks)
+    writer.close()
+    for batch in ColumnarReader(root, "market.tick.v1").scan(
+        "CBA.ASX", ["ts_ms", "price_ticks", "size"], since_ts=t0, until_ts=t1
+    ):
+        agg.handle_tick_arrays("CBA.ASX", batch["ts_ms"], batch["price_ticks"],
+                               batch["size"], now_ms=t1)
+
+Records are partitioned by symbol and UTC date of their time column into
+`<root>/<topic>/symbol=<symbol>/date=<YYYY-MM-DD>/part-<n>.col`. A part file
+is one JSON header line followed by one block per column: int64 values for
+columns whose values are all integers, a JSON list otherwise. The header
+records each block's position and the part's time range, so a scan opens
+only the partitions and parts that overlap the requested range and reads
+only the requested columns. Ranges are half-open, `[since_ts, until_ts)`, as
+in `EventStore.read_all`. Rows keep their append order.
+
+The format needs only the standard library; it plays the role Parquet
+would for a deployment that ships pyarrow.
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import sys
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import quote, unquote
+
+PART_SUFFIX = ".col"
+DEFAULT_ROWS_PER_PART = 65_536
+
+# Column that drives partitioning and time predicates, per topic.
+TIME_COLUMNS = {
+    "market.tick.v1": "ts_ms",
+    "ohlcv.bar.v1": "timeframe_start_ms",
+}
+
+KIND_INT64 = "i8"
+KIND_JSON = "json"
+
+_DAY_MS = 86_400_000
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+
+def time_column(topic: str) -> str:
+    return TIME_COLUMNS.get(topic, "ts_ms")
+
+
+def _date_of(ts_ms: int) -> str:
+    day = datetime.fromtimestamp(ts_ms // _DAY_MS * 86_400, tz=timezone.utc)
+    return day.strftime("%Y-%m-%d")
+
+
+def _day_start_ms(date: str) -> int:
+    day = datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return int(day.timestamp()) * 1000
+
+
+def _encode_column(values: List[Any]) -> Tuple[str, bytes]:
+    if all(
+        type(v) is int and _INT64_MIN <= v <= _INT64_MAX for v in values
+    ):  # bools are not ints here
+        data = array("q", values)
+        if sys.byteorder == "big":
+            data.byteswap()
+        return KIND_INT64, data.tobytes()
+    return KIND_JSON, json.dumps(values, separators=(",", ":")).encode()
+
+
+def _decode_column(kind: str, data: bytes) -> List[Any]:
+    if kind == KIND_INT64:
+        values = array("q")
+        values.frombytes(data)
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values.tolist()
+    return json.loads(data)
+
+
+def write_part(path: Path, rows: Sequence[Dict[str, Any]], ts_column: str) -> None:
+    """Write `rows` as one part file (atomically)."""
+    names: Dict[str, None] = {}
+    for row in rows:
+        for name in row:
+            names.setdefault(name, None)
+    ts = [int(row[ts_column]) for row in rows]
+    blocks: List[bytes] = []
+    columns: Dict[str, List[Any]] = {}
+    offset = 0
+    for name in names:
+        kind, data = _encode_column([row.get(name) for row in rows])
+        columns[name] = [kind, offset, len(data)]
+        blocks.append(data)
+        offset += len(data)
+    header = {
+        "rows": len(rows),
+        "time_column": ts_column,
+        "min_ts": min(ts),
+        "max_ts": max(ts),
+        "sorted": all(a <= b for a, b in zip(ts, ts[1:])),
+        "columns": columns,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as fh:
+        fh.write(json.dumps(header, separators=(",", ":")).encode() + b"\n")
+        for data in blocks:
+            fh.write(data)
+    os.replace(tmp, path)
+
+
+def read_part_header(path: Path) -> Dict[str, Any]:
+    with path.open("rb") as fh:
+        return json.loads(fh.readline())
+
+
+def read_part(
+    path: Path,
+    columns: Optional[Sequence[str]] = None,
+    since_ts: Optional[int] = None,
+    until_ts: Optional[int] = None,
+) -> Dict[str, List[Any]]:
+    """Columns of the rows in `path` with `since_ts` <= time < `until_ts`.
+
+    Columns a part does not have come back as lists of None.
+    """
+    with path.open("rb") as fh:
+        header = json.loads(fh.readline())
+        base = fh.tell()
+        ts_column = header["time_column"]
+        rows = header["rows"]
+
+        def load(name: str) -> List[Any]:
+            spec = header["columns"].get(name)
+            if spec is None:
+                return [None] * rows
+            kind, offset, length = spec
+            fh.seek(base + offset)
+            return _decode_column(kind, fh.read(length))
+
+        wanted = list(header["columns"]) if columns is None else list(columns)
+        lo = since_ts if since_ts is not None else header["min_ts"]
+        hi = until_ts if until_ts is not None else header["max_ts"] + 1
+        if lo <= header["min_ts"] and hi > header["max_ts"]:
+            return {name: load(name) for name in wanted}
+        ts = load(ts_column)
+        if header["sorted"]:
+            start = bisect.bisect_left(ts, lo)
+            stop = bisect.bisect_left(ts, hi)
+            out = {name: load(name)[start:stop] for name in wanted if name != ts_column}
+            if ts_column in wanted:
+                out[ts_column] = ts[start:stop]
+            return {name: out[name] for name in wanted}
+        keep = [i for i, t in enumerate(ts) if lo <= t < hi]
+        out = {}
+        for name in wanted:
+            values = ts if name == ts_column else load(name)
+            out[name] = [values[i] for i in keep]
+        return out
+
+
+class ColumnarWriter:
+    """Buffers records per (symbol, date) partition and writes them as parts.
+
+    A partition's buffer is written once it holds `rows_per_part` records;
+    `flush()` writes all buffers. Each write adds a new part, so parts are
+    never rewritten. One writer per topic directory at a time.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        topic: str,
+        rows_per_part: int = DEFAULT_ROWS_PER_PART,
+        symbol_key: str = "symbol",
+    ):
+        self.root = Path(root)
+        self.topic = topic
+        self.ts_column = time_column(topic)
+        self.rows_per_part = max(1, rows_per_part)
+        self.symbol_key = symbol_key
+        self._buffers: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._next_part: Dict[Path, int] = {}
+        self.rows_written = 0
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def append(self, message: Dict[str, Any]) -> None:
+        key = (
+            str(message[self.symbol_key]),
+            _date_of(int(message[self.ts_column])),
+        )
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = []
+        buffer.append(message)
+        if len(buffer) >= self.rows_per_part:
+            self._write(key)
+
+    def extend(self, messages: Sequence[Dict[str, Any]]) -> None:
+        for message in messages:
+            self.append(message)
+
+    def _write(self, key: Tuple[str, str]) -> None:
+        rows = self._buffers.pop(key)
+        symbol, date = key
+        directory = partition_dir(self.root, self.topic, symbol, date)
+        index = self._next_part.get(directory)
+        if index is None:
+            index = len(list(directory.glob("part-*" + PART_SUFFIX)))
+        write_part(directory / f"part-{index:06d}{PART_SUFFIX}", rows, self.ts_column)
+        self._next_part[directory] = index + 1
+        self.rows_written += len(rows)
+
+    def flush(self) -> None:
+        for key in sorted(self._buffers):
+            self._write(key)
+
+    def close(self) -> None:
+        self.flush()
+
+
+def topic_dir(root: Path, topic: str) -> Path:
+    return Path(root) / topic
+
+
+def partition_dir(root: Path, topic: str, symbol: str, date: str) -> Path:
+    return topic_dir(root, topic) / f"symbol={quote(symbol, safe='')}" / f"date={date}"
+
+
+class ColumnarReader:
+    """Time-range column scans over a `ColumnarWriter` directory."""
+
+    def __init__(self, root: Path, topic: str):
+        self.root = Path(root)
+        self.topic = topic
+
+    def symbols(self) -> List[str]:
+        base = topic_dir(self.root, self.topic)
+        if not base.exists():
+            return []
+        return sorted(
+            unquote(p.name[len("symbol=") :])
+            for p in base.iterdir()
+            if p.name.startswith("symbol=")
+        )
+
+    def parts(
+        self,
+        symbol: str,
+        since_ts: Optional[int] = None,
+        until_ts: Optional[int] = None,
+    ) -> List[Path]:
+        """Part files of `symbol` whose dates overlap the range, in order."""
+        base = topic_dir(self.root, self.topic) / f"symbol={quote(symbol, safe='')}"
+        if not base.exists():
+            return []
+        out: List[Path] = []
+        for day in sorted(base.glob("date=*")):
+            start = _day_start_ms(day.name[len("date=") :])
+            if until_ts is not None and start >= until_ts:
+                continue
+            if since_ts is not None and start + _DAY_MS <= since_ts:
+                continue
+            out.extend(sorted(day.glob("part-*" + PART_SUFFIX)))
+        return out
+
+    def scan(
+        self,
+        symbol: str,
+        columns: Optional[Sequence[str]] = None,
+        since_ts: Optional[int] = None,
+        until_ts: Optional[int] = None,
+    ) -> Iterator[Dict[str, List[Any]]]:
+        """Yield one column batch per part overlapping [since_ts, until_ts).
+
+        Bounds apply to the topic's time column; `until_ts` is exclusive, so
+        adjacent windows never share a row. Parts are skipped using their
+        header's time range before any column is read.
+        """
+        for path in self.parts(symbol, since_ts, until_ts):
+            header = read_part_header(path)
+            if since_ts is not None and header["max_ts"] < since_ts:
+                continue
+            if until_ts is not None and header["min_ts"] >= until_ts:
+                continue
+            batch = read_part(path, columns, since_ts, until_ts)
+            if batch and next(iter(batch.values())):
+                yield batch
+
+    def rows(
+        self,
+        symbol: str,
+        since_ts: Optional[int] = None,
+        until_ts: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Records of `symbol` in the range as dicts (missing fields dropped)."""
+        for batch in self.scan(symbol, None, since_ts, until_ts):
+            names = list(batch)
+            for values in zip(*(batch[name] for name in names)):
+                yield {n: v for n, v in zip(names, values) if v is not None}
@@ -0,0 +1,73 @@
+"""Convert topic data files between NDJSON and the binary record format.
+
+Run it while no writer has the topic open, then configure the topic with the
+matching `TopicConfig(encoding=...)`. Committed reader offsets inside a
+converted file are re-aligned to its start, so records may be redelivered.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import List
+
+from services.event_store import codec, key_index, offset_index, segments
+
+
+def convert_file(src: Path, dst: Path) -> int:
+    """Rewrite `src` as `dst`, picking both formats from the suffixes."""
+    src_fmt = codec.format_for(src)
+    dst_fmt = codec.format_for(dst)
+    count = 0
+    tmp = dst.with_name(dst.name + ".tmp")
+    with tmp.open("wb") as out:
+        for _, payload in codec.scan(src):
+            if src_fmt is dst_fmt:
+                out.write(dst_fmt.frame(payload))
+            else:
+                out.write(dst_fmt.encode(src_fmt.decode(payload)))
+            count += 1
+    os.replace(tmp, dst)
+    offset_index.rebuild(dst)
+    key_index.rebuild(dst)
+    return count
+
+
+def convert_topic(root: Path, topic: str, encoding: str) -> List[Path]:
+    """Convert every data file of `topic` to `encoding`; returns new paths.
+
+    A closed segment is only converted when the result still fits in its
+    logical offset range, so later segment bases stay valid.
+    """
+    suffix = codec.format_named(encoding).suffix
+    files = segments.topic_files(root, topic)
+    segmented = bool(segments.list_segments(root, topic))
+    converted: List[Path] = []
+    for i, (base, path) in enumerate(files):
+        if path.suffix == suffix:
+            continue
+        dst = path.with_suffix(suffix)
+        convert_file(path, dst)
+        if segmented and i + 1 < len(files):
+            if dst.stat().st_size > files[i + 1][0] - base:
+                segments.delete_segment(dst)
+                continue
+        segments.delete_segment(path)
+        converted.append(dst)
+    return converted
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from services.event_store.store import default_root
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--root", default=str(default_root()))
+    parser.add_argument("--topic", required=True)
+    parser.add_argument(
+        "--to", choices=sorted(codec.FORMATS), default=codec.ENCODING_BINARY
+    )
+    args = parser.parse_args()
+    for p in convert_topic(Path(args.root), args.topic, args.to):
+        print(p)
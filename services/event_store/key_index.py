@@ -0,0 +1,249 @@
+"""Per-topic symbol / event-time index for topic data files.
+
+Two sidecars sit next to the data file `<topic>.ndjson` (or `.bin`):
+
+  - `<topic>.symbols`: interned symbol names, one per line (id = line number).
+  - `<topic>.keys`: one fixed-width entry per record,
+    (byte offset uint64, event ts int64, symbol id uint32).
+
+Filtered reads load the entries once, refresh them incrementally and then
+seek straight to the matching records instead of parsing the whole topic.
+"""
+from __future__ import annotations
+
+import os
+import struct
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.event_store import codec
+
+KEYS_SUFFIX = ".keys"
+SYMBOLS_SUFFIX = ".symbols"
+ENTRY = struct.Struct("<QqI")
+NO_TS = -(2**63)
+
+# First field present wins; covers ticks, bars, signals, snapshots and traces.
+TS_FIELDS = (
+    "ts_ms",
+    "end_ts_ms",
+    "timeframe_start_ms",
+    "generated_ts_ms",
+    "created_ts_ms",
+    "as_of_ts_ms",
+    "analysis_ts_ms",
+)
+
+
+def keys_path(data_path: Path) -> Path:
+    return codec.sidecar_path(data_path, KEYS_SUFFIX)
+
+
+def symbols_path(data_path: Path) -> Path:
+    return codec.sidecar_path(data_path, SYMBOLS_SUFFIX)
+
+
+def record_key(message: dict) -> Tuple[str, int]:
+    symbol = message.get("symbol")
+    ts = NO_TS
+    for field in TS_FIELDS:
+        value = message.get(field)
+        if value is None:
+            continue
+        try:
+            ts = int(value)
+        except (TypeError, ValueError):
+            continue
+        break
+    return (symbol if isinstance(symbol, str) else "", ts)
+
+
+def _load_symbols(path: Path) -> List[str]:
+    if not path.exists():
+        return []
+    return path.read_bytes().decode("utf-8").splitlines()
+
+
+def _entry_count(path: Path) -> int:
+    return path.stat().st_size // ENTRY.size if path.exists() else 0
+
+
+def _replace(path: Path, content: bytes) -> None:
+    # Swap in a new file so incremental readers notice the inode change.
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(content)
+    os.replace(tmp, path)
+
+
+def rebuild(data_path: Path) -> int:
+    symbols: Dict[str, int] = {}
+    entries = bytearray()
+    if data_path.exists():
+        fmt = codec.format_for(data_path)
+        for offset, payload in codec.scan(data_path):
+            symbol, ts = record_key(fmt.decode(payload))
+            sid = symbols.setdefault(symbol, len(symbols))
+            entries += ENTRY.pack(offset, ts, sid)
+    names = "".join(name + "\n" for name in symbols)
+    _replace(symbols_path(data_path), names.encode("utf-8"))
+    _replace(keys_path(data_path), bytes(entries))
+    return len(entries) // ENTRY.size
+
+
+def ensure(data_path: Path, expected_entries: int) -> None:
+    """Rebuild the sidecars unless they cover exactly `expected_entries`."""
+    if _entry_count(keys_path(data_path)) != expected_entries:
+        rebuild(data_path)
+
+
+class KeyIndexWriter:
+    """Append side of the index, owned by the topic's writer."""
+
+    def __init__(self, data_path: Path):
+        self._symbols = {
+            name: i for i, name in enumerate(_load_symbols(symbols_path(data_path)))
+        }
+        self._symbols_fh = symbols_path(data_path).open("ab")
+        self._keys_fh = keys_path(data_path).open("ab")
+
+    def append(self, offsets: Iterable[int], keys: Iterable[Tuple[str, int]]) -> None:
+        new_names = []
+        entries = bytearray()
+        for offset, (symbol, ts) in zip(offsets, keys):
+            sid = self._symbols.get(symbol)
+            if sid is None:
+                sid = self._symbols[symbol] = len(self._symbols)
+                new_names.append(symbol + "\n")
+            entries += ENTRY.pack(offset, ts, sid)
+        if new_names:
+            self._symbols_fh.write("".join(new_names).encode("utf-8"))
+        self._keys_fh.write(bytes(entries))
+
+    def flush(self, fsync: bool = False) -> None:
+        # Symbols first: an entry must never reference an unknown symbol id.
+        for fh in (self._symbols_fh, self._keys_fh):
+            fh.flush()
+            if fsync:
+                os.fsync(fh.fileno())
+
+    def close(self) -> None:
+        self._symbols_fh.close()
+        self._keys_fh.close()
+
+
+class KeyIndex:
+    """Read side of the index; refreshes incrementally from the sidecars."""
+
+    def __init__(self, data_path: Path):
+        self.data_path = data_path
+        self._reset()
+
+    def _reset(self) -> None:
+        self._inode: Optional[int] = None
+        self._keys_pos = 0
+        self._data_inode: Optional[int] = None
+        self._data_pos = 0
+        self._symbols: List[str] = []
+        self._offsets: Dict[str, List[int]] = {}
+        self._ts: Dict[str, List[int]] = {}
+        self._ordered: Dict[str, bool] = {}
+
+    def refresh(self) -> None:
+        kp = keys_path(self.data_path)
+        if not kp.exists():
+            self._refresh_from_data()
+            return
+        st = kp.stat()
+        if st.st_ino != self._inode or st.st_size < self._keys_pos:
+            self._reset()
+            self._inode = st.st_ino
+        if st.st_size - self._keys_pos < ENTRY.size:
+            return
+        data_size = self.data_path.stat().st_size if self.data_path.exists() else 0
+        with kp.open("rb") as fh:
+            fh.seek(self._keys_pos)
+            chunk = fh.read(st.st_size - self._keys_pos)
+        self._consume(chunk, data_size)
+
+    def _refresh_from_data(self) -> None:
+        # No sidecars (e.g. a shared-append topic): index the data in memory.
+        if not self.data_path.exists():
+            self._reset()
+            return
+        st = self.data_path.stat()
+        if (
+            self._inode is not None
+            or st.st_ino != self._data_inode
+            or st.st_size < self._data_pos
+        ):
+            self._reset()
+            self._data_inode = st.st_ino
+        if st.st_size == self._data_pos:
+            return
+        fmt = codec.format_for(self.data_path)
+        with self.data_path.open("rb") as fh:
+            fh.seek(self._data_pos)
+            chunk = fh.read(st.st_size - self._data_pos)
+        consumed = 0
+        for offset, payload, end in fmt.iter_records(chunk):
+            symbol, ts = record_key(fmt.decode(payload))
+            self._add(symbol, self._data_pos + offset, ts)
+            consumed = end
+        self._data_pos += consumed
+
+    def _add(self, symbol: str, offset: int, ts: int) -> None:
+        offsets = self._offsets.setdefault(symbol, [])
+        stamps = self._ts.setdefault(symbol, [])
+        if stamps and ts < stamps[-1]:
+            self._ordered[symbol] = False
+        else:
+            self._ordered.setdefault(symbol, True)
+        offsets.append(offset)
+        stamps.append(ts)
+
+    def _consume(self, chunk: bytes, data_size: int) -> None:
+        usable = len(chunk) - len(chunk) % ENTRY.size
+        for offset, ts, sid in ENTRY.iter_unpack(chunk[:usable]):
+            if sid >= len(self._symbols):
+                self._symbols = _load_symbols(symbols_path(self.data_path))
+            if offset >= data_size or sid >= len(self._symbols):
+                # Not fully visible yet; pick it up on the next refresh.
+                return
+            self._add(self._symbols[sid], offset, ts)
+            self._keys_pos += ENTRY.size
+
+    def symbols(self) -> List[str]:
+        return sorted(self._offsets)
+
+    def lookup(
+        self,
+        symbol: Optional[str] = None,
+        since_ts: Optional[int] = None,
+        until_ts: Optional[int] = None,
+    ) -> List[int]:
+        """Offsets of records for `symbol` with `since_ts <= ts < until_ts`."""
+        names = [symbol] if symbol is not None else list(self._offsets)
+        matched: List[int] = []
+        for name in names:
+            offsets = self._offsets.get(name, [])
+            stamps = self._ts.get(name, [])
+            if since_ts is None and until_ts is None:
+                matched.extend(offsets)
+                continue
+            lo_ts = since_ts if since_ts is not None else NO_TS + 1
+            if self._ordered.get(name, True):
+                lo = bisect_left(stamps, lo_ts)
+                hi = len(stamps)
+                if until_ts is not None:
+                    hi = bisect_left(stamps, until_ts)
+                matched.extend(offsets[lo:hi])
+            else:
+                matched.extend(
+                    off
+                    for off, ts in zip(offsets, stamps)
+                    if ts >= lo_ts and (until_ts is None or ts < until_ts)
+                )
+        if symbol is None:
+            matched.sort()
+        return matched
@@ -0,0 +1,151 @@
+"""In-process pub/sub backend with optional file persistence."""
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from services.event_store.writer import BusWriter
+
+PERSIST_SYNC = "sync"
+PERSIST_ASYNC = "async"
+PERSIST_NONE = "none"
+PERSIST_MODES = (PERSIST_SYNC, PERSIST_ASYNC, PERSIST_NONE)
+
+Callback = Callable[[Dict[str, Any]], None]
+
+_STOP = object()
+
+
+class InMemoryBus:
+    """Delivers published messages straight to subscriber callbacks.
+
+    Callbacks run synchronously in the publisher's thread, in subscription
+    order; a callback that publishes again is dispatched depth-first, so a
+    tick can flow through aggregator -> indicators -> signals in one call.
+    Exceptions raised by callbacks propagate to the publisher.
+
+    Persistence to the file log (`writer`) is one of:
+
+      - "sync": written before subscribers are called (default);
+      - "async": handed to a background thread through a queue bounded by
+        `queue_size` (0 = unbounded), so disk I/O stays off the hot path;
+      - "none": not persisted.
+
+    Published messages are shared with subscribers and the persistence
+    thread and must not be mutated afterwards.
+    """
+
+    def __init__(
+        self,
+        writer: Optional[BusWriter] = None,
+        persist: str = PERSIST_SYNC,
+        queue_size: int = 0,
+    ):
+        if persist not in PERSIST_MODES:
+            raise ValueError(f"unknown persistence mode: {persist}")
+        if persist != PERSIST_NONE and writer is None:
+            raise ValueError(f"persistence mode {persist} needs a writer")
+        self.writer = writer
+        self.persist = persist
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, List[Callback]] = {}
+        self.writer_lock = threading.Lock()
+        self._queue: Optional["queue.Queue[Any]"] = None
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+    def subscribe(self, topic: str, callback: Callback) -> Callable[[], None]:
+        """Register `callback(message)` for `topic`; returns an unsubscriber."""
+        self._subscribers.setdefault(topic, []).append(callback)
+        return lambda: self.unsubscribe(topic, callback)
+
+    def unsubscribe(self, topic: str, callback: Callback) -> None:
+        callbacks = self._subscribers.get(topic, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def set_persist(self, persist: str) -> None:
+        if persist not in PERSIST_MODES:
+            raise ValueError(f"unknown persistence mode: {persist}")
+        self.flush()
+        self.persist = persist
+
+    def _start(self) -> "queue.Queue[Any]":
+        if self._queue is None:
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._thread = threading.Thread(
+                target=self._run, name="bus-persist", daemon=True
+            )
+            self._thread.start()
+        return self._queue
+
+    def _run(self) -> None:
+        q = self._queue
+        assert q is not None and self.writer is not None
+        while True:
+            item = q.get()
+            try:
+                if item is _STOP:
+                    return
+                topic, message = item
+                with self.writer_lock:
+                    if isinstance(message, list):
+                        self.writer.publish_many(topic, message)
+                    else:
+                        self.writer.publish(topic, message)
+            except BaseException as exc:  # surfaced on the next flush/publish
+                self._error = exc
+            finally:
+                q.task_done()
+
+    def _raise_pending_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def publish(self, topic: str, message: Dict[str, Any]) -> None:
+        if self.persist == PERSIST_SYNC:
+            assert self.writer is not None
+            with self.writer_lock:
+                self.writer.publish(topic, message)
+        elif self.persist == PERSIST_ASYNC:
+            self._raise_pending_error()
+            item: Tuple[str, Dict[str, Any]] = (topic, message)
+            self._start().put(item)
+        for callback in tuple(self._subscribers.get(topic, ())):
+            callback(message)
+
+    def publish_many(self, topic: str, messages: List[Dict[str, Any]]) -> None:
+        """`publish` for a batch; persisted with a single write-out."""
+        if self.persist == PERSIST_SYNC:
+            assert self.writer is not None
+            with self.writer_lock:
+                self.writer.publish_many(topic, messages)
+        elif self.persist == PERSIST_ASYNC:
+            self._raise_pending_error()
+            self._start().put((topic, list(messages)))
+        callbacks = tuple(self._subscribers.get(topic, ()))
+        if callbacks:
+            for message in messages:
+                for callback in callbacks:
+                    callback(message)
+
+    def flush(self, topic: Optional[str] = None) -> None:
+        """Wait for queued persistence and flush the writer."""
+        if self._queue is not None:
+            self._queue.join()
+        self._raise_pending_error()
+        if self.writer is not None:
+            with self.writer_lock:
+                self.writer.flush(topic)
+
+    def close(self) -> None:
+        self.flush()
+        if self._queue is not None and self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._queue = None
+        self._thread = None
+        if self.writer is not None:
+            self.writer.close()
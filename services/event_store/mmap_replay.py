@@ -0,0 +1,139 @@
+"""Memory-mapped replay of topic data files for backtests.
+
+Records are yielded as `LazyRecord` views over the mapped file: nothing is
+copied into Python strings up front, and a field is only decoded when it is
+read. Binary fixed-schema records (see `codec`) read int/bool fields in
+place; NDJSON and JSON-fallback records are parsed on first access.
+
+Payload views are only valid while the replay generator is running; call
+`to_dict()` on anything that has to outlive it.
+
+Example, feeding an aggregator from a tick topic:
+
+    for rec in replay_topic(root, "market.tick.v1"):
+        agg.handle_tick(rec["symbol"], rec.to_dict())
+"""
+from __future__ import annotations
+
+import mmap
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from services.event_store import codec, segments
+
+
+class LazyRecord(Mapping):
+    """Read-only mapping over one record's payload buffer."""
+
+    __slots__ = ("offset", "_fmt", "_payload", "_schema", "_decoded")
+
+    def __init__(self, fmt: codec.RecordFormat, payload: memoryview, offset: int):
+        self.offset = offset
+        self._fmt = fmt
+        self._payload = payload
+        self._schema = fmt.schema(payload) if fmt is codec.BINARY else None
+        self._decoded: Optional[Dict[str, Any]] = None
+
+    @property
+    def payload(self) -> memoryview:
+        return self._payload
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self._decoded is None:
+            self._decoded = self._fmt.decode(self._payload)
+        return self._decoded
+
+    def __getitem__(self, key: str) -> Any:
+        if self._decoded is None and self._schema is not None:
+            if key not in self._schema.keys:
+                raise KeyError(key)
+            return self._schema.field(self._payload, key)
+        return self.to_dict()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        if self._decoded is None and self._schema is not None:
+            return iter(self._schema.names)
+        return iter(self.to_dict())
+
+    def __len__(self) -> int:
+        if self._decoded is None and self._schema is not None:
+            return len(self._schema.names)
+        return len(self.to_dict())
+
+
+_BLANK = b" \t\r"
+
+
+def _spans(
+    fmt: codec.RecordFormat, mm: mmap.mmap, view: memoryview
+) -> Iterator[Tuple[int, memoryview]]:
+    if fmt is codec.BINARY:
+        for offset, payload, _ in fmt.iter_records(view):
+            yield offset, payload
+        return
+    pos = 0
+    while True:
+        end = mm.find(b"\n", pos)
+        if end < 0:
+            return
+        # Like the line reader, skip blank and whitespace-only lines; only
+        # lines that start with whitespace need the copy to check.
+        if end > pos and (mm[pos] not in _BLANK or mm[pos:end].strip()):
+            yield pos, view[pos:end]
+        pos = end + 1
+
+
+def replay_file(path: Path) -> Iterator[LazyRecord]:
+    """Yield every complete record of one data file from a read-only mmap."""
+    if not path.exists() or path.stat().st_size == 0:
+        return
+    fmt = codec.format_for(path)
+    with path.open("rb") as fh:
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mm)
+    try:
+        for offset, payload in _spans(fmt, mm, view):
+            yield LazyRecord(fmt, payload, offset)
+    finally:
+        try:
+            view.release()
+            mm.close()
+        except BufferError:
+            # A caller still holds a payload view; the map is released once
+            # that view is garbage collected.
+            pass
+
+
+def replay_topic(root: Path, topic: str) -> Iterator[LazyRecord]:
+    """Replay every data file of `topic` (all segments) in append order."""
+    for _, path in segments.topic_files(root, topic):
+        yield from replay_file(path)
+
+
+def replay_columns(
+    root: Path,
+    topic: str,
+    fields: Sequence[str],
+    batch_size: int = 65_536,
+    symbol: Optional[str] = None,
+) -> Iterator[Dict[str, List[Any]]]:
+    """Yield column batches (field -> values) decoding only `fields`.
+
+    Missing fields come back as None. With `symbol` only that symbol's
+    records are included.
+    """
+    batch: Dict[str, List[Any]] = {f: [] for f in fields}
+    count = 0
+    for rec in replay_topic(root, topic):
+        if symbol is not None and rec.get("symbol") != symbol:
+            continue
+        for f in fields:
+            batch[f].append(rec.get(f))
+        count += 1
+        if count >= batch_size:
+            yield batch
+            batch = {f: [] for f in fields}
+            count = 0
+    if count:
+        yield batch
@@ -0,0 +1,92 @@
+"""Sidecar message-offset index for topic data files.
+
+`<topic>.idx` stores one little-endian uint64 byte offset per record in the
+matching data file, so record N can be located without scanning.
+"""
+from __future__ import annotations
+
+import struct
+from pathlib import Path
+from typing import Iterable, List
+
+from services.event_store import codec
+
+INDEX_SUFFIX = ".idx"
+ENTRY = struct.Struct("<Q")
+
+
+def index_path(data_path: Path) -> Path:
+    return codec.sidecar_path(data_path, INDEX_SUFFIX)
+
+
+def pack_offsets(offsets: Iterable[int]) -> bytes:
+    offsets = list(offsets)
+    return struct.pack(f"<{len(offsets)}Q", *offsets)
+
+
+def scan_offsets(data_path: Path) -> List[int]:
+    return [offset for offset, _ in codec.scan(data_path)]
+
+
+def entry_count(idx_path: Path) -> int:
+    if not idx_path.exists():
+        return 0
+    return idx_path.stat().st_size // ENTRY.size
+
+
+def offset_at(idx_path: Path, n: int) -> int:
+    if n < 0 or n >= entry_count(idx_path):
+        raise IndexError(f"record {n} is not in {idx_path.name}")
+    with idx_path.open("rb") as fh:
+        fh.seek(n * ENTRY.size)
+        return ENTRY.unpack(fh.read(ENTRY.size))[0]
+
+
+def is_current(data_path: Path) -> bool:
+    """Cheap consistency check: the last indexed record must end the file."""
+    idx = index_path(data_path)
+    data_size = data_path.stat().st_size if data_path.exists() else 0
+    if not idx.exists():
+        return data_size == 0
+    idx_size = idx.stat().st_size
+    if idx_size % ENTRY.size:
+        return False
+    if idx_size == 0:
+        return data_size == 0
+    last = offset_at(idx, idx_size // ENTRY.size - 1)
+    if last >= data_size:
+        return False
+    with data_path.open("rb") as fh:
+        fh.seek(last)
+        tail = fh.read()
+    spans = list(codec.format_for(data_path).iter_records(tail))
+    return len(spans) == 1 and spans[0][2] == len(tail)
+
+
+def rebuild(data_path: Path) -> int:
+    offsets = scan_offsets(data_path) if data_path.exists() else []
+    index_path(data_path).write_bytes(pack_offsets(offsets))
+    return len(offsets)
+
+
+def ensure(data_path: Path) -> Path:
+    if not is_current(data_path):
+        rebuild(data_path)
+    return index_path(data_path)
+
+
+def contains(idx_path: Path, offset: int) -> bool:
+    """Whether a record starts at `offset` (binary search over the sidecar)."""
+    lo, hi = 0, entry_count(idx_path)
+    with idx_path.open("rb") as fh:
+        while lo < hi:
+            mid = (lo + hi) // 2
+            fh.seek(mid * ENTRY.size)
+            value = ENTRY.unpack(fh.read(ENTRY.size))[0]
+            if value == offset:
+                return True
+            if value < offset:
+                lo = mid + 1
+            else:
+                hi = mid
+    return False
@@ -0,0 +1,275 @@
+"""Offset-tracking, tailable readers for NDJSON bus topics."""
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from services.event_store import codec, offset_index, segments
+
+START_COMMITTED = "committed"
+START_EARLIEST = "earliest"
+START_LATEST = "latest"
+START_MODES = (START_COMMITTED, START_EARLIEST, START_LATEST)
+
+OFFSETS_DIR = "_offsets"
+# Bytes read from a data file per step; a poll reads at most about
+# `max_records` records plus one step.
+READ_CHUNK_BYTES = 1 << 20
+
+
+class OffsetStore:
+    """Committed byte offsets per consumer group, one JSON file per group."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _path(self, group: str) -> Path:
+        return self.root / OFFSETS_DIR / f"{group}.json"
+
+    def load_all(self, group: str) -> Dict[str, int]:
+        p = self._path(group)
+        if not p.exists():
+            return {}
+        return {k: int(v) for k, v in json.loads(p.read_text()).items()}
+
+    def load(self, group: str, topic: str) -> Optional[int]:
+        return self.load_all(group).get(topic)
+
+    def save(self, group: str, topic: str, offset: int) -> None:
+        p = self._path(group)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        offsets = self.load_all(group)
+        offsets[topic] = offset
+        tmp = p.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(offsets, sort_keys=True))
+        os.replace(tmp, p)
+
+
+class TopicReader:
+    """Incremental reader over one topic.
+
+    The reader keeps a logical byte offset into the topic and each `poll()`
+    parses only complete records appended since the previous call. For a
+    plain topic the offset is the position in its data file; for a
+    segmented topic it is the segment base plus the position within that
+    segment, so it keeps increasing across rolls. Segments dropped by
+    retention are skipped; a segment rewritten by compaction is re-read from
+    its start, so consumers of compacted topics must tolerate redelivery.
+
+    With a `group` the offset can be committed and later resumed; `start`
+    picks the initial position ("committed" falls back to "earliest").
+    `before_read` is called ahead of every poll, which lets an in-process
+    writer flush its buffer first.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        topic: str,
+        group: Optional[str] = None,
+        start: str = START_COMMITTED,
+        before_read: Optional[Callable[[], None]] = None,
+    ):
+        if start not in START_MODES:
+            raise ValueError(f"unknown start mode: {start}")
+        self.root = Path(root)
+        self.topic = topic
+        self.group = group
+        self._offsets = OffsetStore(self.root)
+        self._before_read = before_read
+        self._fh: Optional[BinaryIO] = None
+        self._fh_path: Optional[Path] = None
+        self._inode: Optional[int] = None
+        self._position = 0
+
+        if start == START_LATEST:
+            self.seek_to_end()
+        elif start == START_COMMITTED and group is not None:
+            self._position = self._offsets.load(group, topic) or 0
+
+    @property
+    def position(self) -> int:
+        return self._position
+
+    def _files(self) -> List[Tuple[int, Path]]:
+        if self._before_read is not None:
+            self._before_read()
+        return segments.topic_files(self.root, self.topic)
+
+    def _locate(self, files: List[Tuple[int, Path]]) -> int:
+        if self._position < files[0][0]:
+            # Older segments were dropped by retention.
+            self._position = files[0][0]
+        i = 0
+        while i + 1 < len(files) and files[i + 1][0] <= self._position:
+            i += 1
+        return i
+
+    def _size(self, base: int, path: Path) -> int:
+        st = path.stat()
+        if self._fh_path == path and st.st_ino != self._inode:
+            # The file was replaced (reset or compaction); start it over.
+            self._close_handle()
+            self._position = base
+        return st.st_size
+
+    def _close_handle(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+        self._fh = None
+        self._fh_path = None
+        self._inode = None
+
+    def _open(self, path: Path) -> BinaryIO:
+        if self._fh is None or self._fh_path != path:
+            self._close_handle()
+            self._fh = path.open("rb")
+            self._fh_path = path
+            self._inode = os.fstat(self._fh.fileno()).st_ino
+        return self._fh
+
+    def _read_segment(
+        self, base: int, path: Path, size: int, records: List[dict], max_records: int
+    ) -> None:
+        entering = self._fh_path != path
+        fh = self._open(path)
+        local = self._position - base
+        if entering and 0 < local < size and not self._is_record_start(path, local):
+            # Not on a record boundary, e.g. the range was compacted since the
+            # offset was committed; re-read the segment from its start.
+            self._position = base
+            local = 0
+        fh.seek(local)
+        fmt = codec.format_for(path)
+        pending = b""  # unparsed bytes from `self._position` on
+        remaining = size - local
+        while remaining > 0:
+            data = fh.read(min(READ_CHUNK_BYTES, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            pending += data
+            consumed = 0
+            for _, payload, end in fmt.iter_records(pending):
+                records.append(fmt.decode(payload))
+                consumed = end
+                if max_records and len(records) >= max_records:
+                    self._position += consumed
+                    return
+            self._position += consumed
+            pending = pending[consumed:]
+        # Skip blank lines trailing the last record (legacy NDJSON files).
+        last_nl = pending.rfind(b"\n")
+        if fmt is codec.NDJSON and last_nl >= 0:
+            if not pending[: last_nl + 1].strip():
+                self._position += last_nl + 1
+
+    @staticmethod
+    def _is_record_start(path: Path, local: int) -> bool:
+        idx = offset_index.index_path(path)
+        if not idx.exists():
+            # Unindexed file (shared-append writers keep no sidecars).
+            return local in offset_index.scan_offsets(path)
+        return offset_index.contains(idx, local)
+
+    def poll(self, max_records: int = 0) -> List[dict]:
+        """Return records appended since the last poll (at most `max_records`)."""
+        records: List[dict] = []
+        files = self._files()
+        while files:
+            i = self._locate(files)
+            base, path = files[i]
+            try:
+                size = self._size(base, path)
+            except FileNotFoundError:
+                self._close_handle()
+                break
+            if self._position - base < size:
+                self._read_segment(base, path, size, records, max_records)
+                if max_records and len(records) >= max_records:
+                    break
+            if i + 1 == len(files) or self._position - base < size:
+                break
+            self._position = files[i + 1][0]
+        if not files:
+            self._close_handle()
+        return records
+
+    def __iter__(self) -> Iterator[dict]:
+        yield from self.poll()
+
+    def tail(
+        self, poll_interval_s: float = 0.1, idle_timeout_s: Optional[float] = None
+    ) -> Iterator[dict]:
+        """Yield records as they are appended.
+
+        Stops after `idle_timeout_s` seconds without new records, or never when
+        it is None.
+        """
+        idle_since = time.monotonic()
+        while True:
+            records = self.poll()
+            if records:
+                yield from records
+                idle_since = time.monotonic()
+                continue
+            if (
+                idle_timeout_s is not None
+                and time.monotonic() - idle_since >= idle_timeout_s
+            ):
+                return
+            time.sleep(poll_interval_s)
+
+    def seek(self, offset: int) -> None:
+        self._position = max(0, offset)
+
+    def seek_to_beginning(self) -> None:
+        self._position = 0
+
+    def seek_to_end(self) -> None:
+        files = self._files()
+        if not files:
+            self._position = 0
+            return
+        base, path = files[-1]
+        self._position = base + path.stat().st_size
+
+    def seek_to_index(self, n: int) -> None:
+        """Position the reader on the n-th record using the `.idx` sidecars.
+
+        Files without a sidecar (shared-append topics) are scanned instead.
+        """
+        remaining = n
+        for base, path in self._files():
+            idx = offset_index.index_path(path)
+            scanned = None if idx.exists() else offset_index.scan_offsets(path)
+            count = offset_index.entry_count(idx) if scanned is None else len(scanned)
+            if remaining < count:
+                if scanned is None:
+                    offset = offset_index.offset_at(idx, remaining)
+                else:
+                    offset = scanned[remaining]
+                if offset >= path.stat().st_size:
+                    raise IndexError(f"record {n} of {self.topic} is not yet visible")
+                self._position = base + offset
+                return
+            remaining -= count
+        if remaining:
+            raise IndexError(f"record {n} is not in {self.topic}")
+        self.seek_to_end()
+
+    def commit(self) -> None:
+        if self.group is None:
+            raise ValueError("commit() requires a consumer group")
+        self._offsets.save(self.group, self.topic, self._position)
+
+    def committed(self) -> Optional[int]:
+        if self.group is None:
+            return None
+        return self._offsets.load(self.group, self.topic)
+
+    def close(self) -> None:
+        self._close_handle()
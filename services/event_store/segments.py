@@ -0,0 +1,171 @@
+"""Segmented topic layout, retention and key compaction.
+
+A segmented topic lives in `<root>/<topic>/` as a series of `<base>.ndjson`
+(or `.bin`) files, each with its own index sidecars. `base` is the logical
+byte offset at which the segment starts, so reader positions keep
+increasing across segments. Only the last segment is ever appended to;
+retention and compaction only touch closed segments.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from services.event_store import codec, key_index, offset_index
+
+SIDECAR_SUFFIXES = (
+    offset_index.INDEX_SUFFIX,
+    key_index.KEYS_SUFFIX,
+    key_index.SYMBOLS_SUFFIX,
+)
+
+
+class TopicConfig:
+    """Segmentation, retention and compaction settings for one topic.
+
+    A topic is segmented once `segment_bytes` or `segment_ms` is set; the
+    active segment rolls when either bound is reached. Retention drops the
+    oldest closed segments once they are older than `retention_ms` or the
+    topic exceeds `retention_bytes`. With `compact_key` closed segments are
+    rewritten on every roll to keep only the latest record per key.
+    `encoding` selects the record format of new data files ("ndjson" or
+    "binary", see `codec`).
+    """
+
+    def __init__(
+        self,
+        segment_bytes: int = 0,
+        segment_ms: int = 0,
+        retention_bytes: int = 0,
+        retention_ms: int = 0,
+        compact_key: Optional[Sequence[str]] = None,
+        encoding: str = codec.ENCODING_NDJSON,
+    ):
+        self.format = codec.format_named(encoding)
+        self.encoding = encoding
+        self.segment_bytes = segment_bytes
+        self.segment_ms = segment_ms
+        self.retention_bytes = retention_bytes
+        self.retention_ms = retention_ms
+        self.compact_key = tuple(compact_key) if compact_key else None
+        if not self.segmented and (retention_bytes or retention_ms or self.compact_key):
+            raise ValueError("retention and compaction require segment_bytes/ms")
+
+    @property
+    def segmented(self) -> bool:
+        return bool(self.segment_bytes or self.segment_ms)
+
+
+def segment_dir(root: Path, topic: str) -> Path:
+    return Path(root) / topic
+
+
+def segment_path(
+    root: Path, topic: str, base: int, suffix: str = codec.NDJSON_SUFFIX
+) -> Path:
+    return segment_dir(root, topic) / f"{base:020d}{suffix}"
+
+
+def list_segments(root: Path, topic: str) -> List[Tuple[int, Path]]:
+    d = segment_dir(root, topic)
+    if not d.is_dir():
+        return []
+    return sorted(
+        (int(p.stem), p)
+        for p in d.iterdir()
+        if p.suffix in codec.DATA_SUFFIXES and p.stem.isdigit()
+    )
+
+
+def topic_files(root: Path, topic: str) -> List[Tuple[int, Path]]:
+    """(base offset, path) of every data file of `topic`, oldest first.
+
+    An unsegmented topic normally has a single `<topic>.ndjson` or
+    `<topic>.bin`; if both exist they are read as one log, NDJSON first.
+    """
+    segments = list_segments(root, topic)
+    if segments:
+        return segments
+    files: List[Tuple[int, Path]] = []
+    base = 0
+    for suffix in codec.DATA_SUFFIXES:
+        path = Path(root) / f"{topic}{suffix}"
+        if path.exists():
+            files.append((base, path))
+            base += path.stat().st_size
+    return files
+
+
+def delete_segment(path: Path) -> None:
+    for suffix in SIDECAR_SUFFIXES:
+        codec.sidecar_path(path, suffix).unlink(missing_ok=True)
+    path.unlink(missing_ok=True)
+
+
+def apply_retention(
+    root: Path, topic: str, config: TopicConfig, now_ms: int
+) -> List[Path]:
+    """Delete the oldest closed segments that fall outside retention."""
+    segments = list_segments(root, topic)
+    closed = segments[:-1]
+    total = sum(p.stat().st_size for _, p in segments)
+    removed: List[Path] = []
+    for _, path in closed:
+        st = path.stat()
+        expired = (
+            config.retention_ms
+            and now_ms - int(st.st_mtime * 1000) > config.retention_ms
+        )
+        oversize = config.retention_bytes and total > config.retention_bytes
+        if not (expired or oversize):
+            break
+        total -= st.st_size
+        delete_segment(path)
+        removed.append(path)
+    return removed
+
+
+def compact(root: Path, topic: str, key_fields: Sequence[str]) -> Optional[Path]:
+    """Merge closed segments keeping only the latest record per key.
+
+    Records missing any key field are kept as they are. The result replaces
+    the oldest closed segment; returns its path, or None when there was
+    nothing to compact.
+    """
+    closed = list_segments(root, topic)[:-1]
+    if not closed:
+        return None
+    target = closed[0][1]
+    target_fmt = codec.format_for(target)
+    latest: Dict[Tuple[object, ...], int] = {}
+    frames: List[Tuple[Optional[Tuple[object, ...]], bytes]] = []
+    for _, path in closed:
+        fmt = codec.format_for(path)
+        for _, payload in codec.scan(path):
+            record = fmt.decode(payload)
+            key = (
+                tuple(record[f] for f in key_fields)
+                if all(f in record for f in key_fields)
+                else None
+            )
+            if key is not None:
+                latest[key] = len(frames)
+            frame = (
+                fmt.frame(payload) if fmt is target_fmt else target_fmt.encode(record)
+            )
+            frames.append((key, frame))
+
+    kept = [
+        frame
+        for i, (key, frame) in enumerate(frames)
+        if key is None or latest[key] == i
+    ]
+    tmp = target.with_suffix(".compact.tmp")
+    tmp.write_bytes(b"".join(kept))
+    for _, path in closed[1:]:
+        delete_segment(path)
+    os.replace(tmp, target)
+    offset_index.rebuild(target)
+    key_index.rebuild(target)
+    return target
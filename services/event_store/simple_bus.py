@@ -1,30 +1,129 @@
-import json
+"""Module-level bus API backed by a lazily created default `EventStore`.
+
+The default store lives under `BUS_DIR` (`BUS_ROOT`, or `./tmp_event_bus`)
+and is only created on first use. `use_store` routes every call made in the
+current context (thread / asyncio task) to another store instead.
+"""
+import atexit
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Iterable
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional
+
+from services.event_store.memory_bus import Callback
+from services.event_store.mmap_replay import LazyRecord
+from services.event_store.reader import START_COMMITTED, TopicReader
+from services.event_store.segments import TopicConfig
+from services.event_store.store import EventStore, default_root
+from services.event_store.writer import FlushPolicy
+
+if TYPE_CHECKING:
+    from services.event_store.async_bus import AsyncBus
+
+BUS_DIR = default_root()
+
+_default_store: Optional[EventStore] = None
+_current_store: ContextVar[Optional[EventStore]] = ContextVar(
+    "event_store", default=None
+)
 
-BUS_DIR = Path("tmp_event_bus")
-BUS_DIR.mkdir(parents=True, exist_ok=True)
+
+def get_store() -> EventStore:
+    """Store used by the module-level functions in the current context."""
+    global _default_store
+    store = _current_store.get()
+    if store is not None:
+        return store
+    if _default_store is None:
+        _default_store = EventStore(BUS_DIR)
+        atexit.register(_default_store.close)
+    return _default_store
+
+
+@contextmanager
+def use_store(store: EventStore) -> Iterator[EventStore]:
+    """Route module-level calls in this context to `store`."""
+    token = _current_store.set(store)
+    try:
+        yield store
+    finally:
+        _current_store.reset(token)
 
 
 def topic_path(topic: str) -> Path:
-    p = BUS_DIR / f"{topic}.ndjson"
-    p.parent.mkdir(parents=True, exist_ok=True)
-    if not p.exists():
-        p.write_text("")
-    return p
+    return get_store().topic_path(topic)
+
+
+def configure_writer(policy: FlushPolicy) -> None:
+    """Swap the flush policy of the store's writer, flushing first."""
+    get_store().configure_writer(policy)
+
+
+def configure_persistence(persist: str) -> None:
+    """Persist published messages "sync", "async" or "none" (see `InMemoryBus`)."""
+    get_store().configure_persistence(persist)
+
+
+def configure_topic(topic: str, config: TopicConfig) -> None:
+    """Enable segmentation, retention or compaction for `topic`."""
+    get_store().configure_topic(topic, config)
+
+
+def apply_retention(topic: str) -> List[Path]:
+    """Drop expired segments of `topic` without waiting for the next roll."""
+    return get_store().apply_retention(topic)
+
+
+def open_async_bus(
+    queue_size: int = 1024, policy: Optional[str] = None, persist: bool = True
+) -> "AsyncBus":
+    """Asyncio backend sharing the store's writer (see `async_bus`)."""
+    return get_store().open_async_bus(queue_size, policy, persist)
+
+
+def subscribe(topic: str, callback: Callback) -> Callable[[], None]:
+    """Call `callback(message)` in-process for every message published to `topic`."""
+    return get_store().subscribe(topic, callback)
+
+
+def unsubscribe(topic: str, callback: Callback) -> None:
+    get_store().unsubscribe(topic, callback)
 
 
 def publish(topic: str, message: dict) -> None:
-    p = topic_path(topic)
-    with p.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(message, separators=(",", ":"), sort_keys=True) + "\n")
-
-
-def read_all(topic: str) -> Iterable[dict]:
-    p = topic_path(topic)
-    if not p.exists():
-        return
-    with p.open("r", encoding="utf-8") as f:
-        for line in f:
-            if line.strip():
-                yield json.loads(line)
+    get_store().publish(topic, message)
+
+
+def publish_many(topic: str, messages: List[dict]) -> None:
+    """Publish a batch of messages, persisted with a single write-out."""
+    get_store().publish_many(topic, messages)
+
+
+def flush(topic: Optional[str] = None) -> None:
+    get_store().flush(topic)
+
+
+def close() -> None:
+    get_store().close()
+
+
+def open_reader(
+    topic: str, group: Optional[str] = None, start: str = START_COMMITTED
+) -> TopicReader:
+    """Incremental reader over `topic` that sees this process's pending writes."""
+    return get_store().open_reader(topic, group=group, start=start)
+
+
+def read_all(
+    topic: str,
+    symbol: Optional[str] = None,
+    since_ts: Optional[int] = None,
+    until_ts: Optional[int] = None,
+) -> Iterable[dict]:
+    """Yield records of `topic` in append order, optionally filtered by key."""
+    return get_store().read_all(topic, symbol, since_ts, until_ts)
+
+
+def replay(topic: str) -> Iterator[LazyRecord]:
+    """Memory-mapped, lazily decoded replay of `topic` (see `mmap_replay`)."""
+    return get_store().replay(topic)
@@ -0,0 +1,158 @@
+"""Event store: one bus root with its writer, in-process bus and read caches.
+
+Nothing touches the filesystem until a topic is written or read; the root
+and topic directories are created on first write. Several stores with
+different roots can live in one process (e.g. parallel backtests).
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional
+
+from services.event_store import codec, segments
+from services.event_store.key_index import KeyIndex
+from services.event_store.memory_bus import Callback, InMemoryBus
+from services.event_store.mmap_replay import LazyRecord, replay_topic
+from services.event_store.reader import START_COMMITTED, TopicReader
+from services.event_store.segments import TopicConfig
+from services.event_store.writer import BusWriter, FlushPolicy
+
+if TYPE_CHECKING:
+    from services.event_store.async_bus import AsyncBus
+
+DEFAULT_ROOT = "tmp_event_bus"
+
+
+def default_root() -> Path:
+    """Bus root from `BUS_ROOT`, falling back to `./tmp_event_bus`."""
+    return Path(os.getenv("BUS_ROOT", DEFAULT_ROOT))
+
+
+class EventStore:
+    """File-backed topics under `root` with in-process subscribers.
+
+    The writer keeps one open handle set per topic (see `BusWriter`), and
+    filtered reads keep one incrementally refreshed `KeyIndex` per data file.
+    """
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        writer: Optional[BusWriter] = None,
+        persist: Optional[str] = None,
+    ):
+        self.root = Path(root) if root is not None else default_root()
+        self.writer = writer or BusWriter.from_env(self.root)
+        self.bus = InMemoryBus(
+            self.writer, persist=persist or os.getenv("BUS_PERSIST", "sync")
+        )
+        self._key_indexes: Dict[Path, KeyIndex] = {}
+
+    def __enter__(self) -> "EventStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def topic_path(self, topic: str) -> Path:
+        """Data file of an unsegmented topic (not created here)."""
+        return self.writer.path_for(topic)
+
+    def configure_writer(self, policy: FlushPolicy) -> None:
+        """Swap the writer's flush policy, flushing first."""
+        self.bus.flush()
+        self.writer.policy = policy
+
+    def configure_persistence(self, persist: str) -> None:
+        """Persist published messages "sync", "async" or "none" (see `InMemoryBus`)."""
+        self.bus.set_persist(persist)
+
+    def configure_topic(self, topic: str, config: TopicConfig) -> None:
+        """Enable segmentation, retention or compaction for `topic`."""
+        self.bus.flush()
+        self.writer.configure_topic(topic, config)
+
+    def apply_retention(self, topic: str) -> List[Path]:
+        """Drop expired segments of `topic` without waiting for the next roll."""
+        self.bus.flush()
+        return self.writer.apply_retention(topic)
+
+    def open_async_bus(
+        self, queue_size: int = 1024, policy: Optional[str] = None, persist: bool = True
+    ) -> "AsyncBus":
+        """Asyncio backend sharing this store's writer (see `async_bus`)."""
+        from services.event_store.async_bus import POLICY_BLOCK, AsyncBus
+
+        return AsyncBus(
+            self.writer if persist else None,
+            queue_size=queue_size,
+            policy=policy or POLICY_BLOCK,
+            writer_lock=self.bus.writer_lock,
+        )
+
+    def subscribe(self, topic: str, callback: Callback) -> Callable[[], None]:
+        """Call `callback(message)` in-process for each message on `topic`."""
+        return self.bus.subscribe(topic, callback)
+
+    def unsubscribe(self, topic: str, callback: Callback) -> None:
+        self.bus.unsubscribe(topic, callback)
+
+    def publish(self, topic: str, message: dict) -> None:
+        self.bus.publish(topic, message)
+
+    def publish_many(self, topic: str, messages: List[dict]) -> None:
+        """Publish a batch of messages, persisted with a single write-out."""
+        self.bus.publish_many(topic, messages)
+
+    def flush(self, topic: Optional[str] = None) -> None:
+        self.bus.flush(topic)
+
+    def close(self) -> None:
+        self.bus.close()
+        self._key_indexes.clear()
+
+    def open_reader(
+        self, topic: str, group: Optional[str] = None, start: str = START_COMMITTED
+    ) -> TopicReader:
+        """Incremental reader over `topic` that sees this store's pending writes."""
+        return TopicReader(
+            self.root,
+            topic,
+            group=group,
+            start=start,
+            before_read=lambda: self.flush(topic),
+        )
+
+    def read_all(
+        self,
+        topic: str,
+        symbol: Optional[str] = None,
+        since_ts: Optional[int] = None,
+        until_ts: Optional[int] = None,
+    ) -> Iterable[dict]:
+        """Yield records of `topic` in append order.
+
+        With `symbol` and/or a `[since_ts, until_ts)` event-time range only the
+        matching records are read, located through the topic's key index.
+        """
+        self.flush(topic)
+        files = segments.topic_files(self.root, topic)
+        filtered = symbol is not None or since_ts is not None or until_ts is not None
+        if filtered:
+            for stale in [p for p in self._key_indexes if not p.exists()]:
+                del self._key_indexes[stale]
+        for _, p in files:
+            if filtered:
+                index = self._key_indexes.get(p)
+                if index is None:
+                    index = self._key_indexes[p] = KeyIndex(p)
+                index.refresh()
+                yield from codec.read_at(p, index.lookup(symbol, since_ts, until_ts))
+            else:
+                yield from codec.iter_messages(p)
+
+    def replay(self, topic: str) -> Iterator[LazyRecord]:
+        """Memory-mapped, lazily decoded replay of `topic` (see `mmap_replay`)."""
+        self.flush(topic)
+        return replay_topic(self.root, topic)
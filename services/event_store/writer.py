@@ -0,0 +1,424 @@
+"""Buffered topic writer with cached file handles."""
+from __future__ import annotations
+
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.event_store import codec, key_index, offset_index, segments
+from services.event_store.segments import TopicConfig
+
+DURABILITY_NONE = "none"
+DURABILITY_FLUSH = "flush"
+DURABILITY_FSYNC = "fsync"
+DURABILITY_MODES = (DURABILITY_NONE, DURABILITY_FLUSH, DURABILITY_FSYNC)
+
+# Largest single append in shared mode; larger records are rejected.
+DEFAULT_MAX_APPEND_BYTES = 1 << 20
+
+
+def _int_env(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+class FlushPolicy:
+    """Thresholds that decide when buffered records are written out.
+
+    A topic buffer is written as soon as any enabled threshold is reached;
+    a threshold of 0 disables it. `max_interval_ms` is evaluated on publish,
+    there is no background timer. `durability` controls what a write-out does:
+
+      - "none": hand the batch to the file object (Python-level buffering).
+      - "flush": additionally flush the file object to the OS.
+      - "fsync": additionally fsync the file descriptor.
+    """
+
+    def __init__(
+        self,
+        max_records: int = 1,
+        max_bytes: int = 0,
+        max_interval_ms: int = 0,
+        durability: str = DURABILITY_FLUSH,
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"unknown durability mode: {durability}")
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.max_interval_ms = max_interval_ms
+        self.durability = durability
+
+    @classmethod
+    def from_env(cls, prefix: Optional[str] = None) -> "FlushPolicy":
+        p = (prefix + "_") if prefix else ""
+        durability = os.getenv(p + "BUS_DURABILITY", DURABILITY_FLUSH)
+        if durability not in DURABILITY_MODES:
+            durability = DURABILITY_FLUSH
+        return cls(
+            max_records=_int_env(p + "BUS_FLUSH_MAX_RECORDS", 1),
+            max_bytes=_int_env(p + "BUS_FLUSH_MAX_BYTES", 0),
+            max_interval_ms=_int_env(p + "BUS_FLUSH_INTERVAL_MS", 0),
+            durability=durability,
+        )
+
+
+def _drop_sidecars(path: Path) -> None:
+    for sidecar in (
+        offset_index.index_path(path),
+        key_index.keys_path(path),
+        key_index.symbols_path(path),
+    ):
+        if sidecar.exists():
+            sidecar.unlink()
+
+
+def _chunks(records: List[bytes], limit: int) -> List[bytes]:
+    """Join records into as few buffers of at most `limit` bytes as possible."""
+    chunks: List[bytes] = []
+    current: List[bytes] = []
+    size = 0
+    for record in records:
+        if current and size + len(record) > limit:
+            chunks.append(b"".join(current))
+            current, size = [], 0
+        current.append(record)
+        size += len(record)
+    if current:
+        chunks.append(b"".join(current))
+    return chunks
+
+
+class _TopicFiles:
+    """Open append handles for one topic: data file plus its index sidecars.
+
+    With `max_append_bytes` set the file is shared with other writers: it is
+    opened unbuffered in O_APPEND mode, every chunk of whole records goes out
+    in a single write(2), and no sidecars are kept (their entries would
+    interleave across writers).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        index: bool,
+        base: int = 0,
+        opened_ms: int = 0,
+        max_append_bytes: int = 0,
+    ):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.base = base
+        self.opened_ms = opened_ms
+        self.max_append_bytes = max_append_bytes
+        self.data: BinaryIO = path.open("ab", buffering=0 if max_append_bytes else -1)
+        self.offsets: Optional[BinaryIO] = None
+        self.keys: Optional[key_index.KeyIndexWriter] = None
+        if max_append_bytes:
+            _drop_sidecars(path)
+        elif index:
+            idx = offset_index.ensure(path)
+            key_index.ensure(path, offset_index.entry_count(idx))
+            self.offsets = idx.open("ab")
+            self.keys = key_index.KeyIndexWriter(path)
+
+    def stale(self) -> bool:
+        return os.fstat(self.data.fileno()).st_nlink == 0
+
+    def append(self, records: List[bytes], keys: List[Tuple[str, int]]) -> None:
+        if self.max_append_bytes:
+            fd = self.data.fileno()
+            for chunk in _chunks(records, self.max_append_bytes):
+                written = os.write(fd, chunk)
+                if written != len(chunk):
+                    raise OSError(
+                        f"short append to shared topic file ({written} of "
+                        f"{len(chunk)} bytes)"
+                    )
+            return
+        if self.offsets is None:
+            self.data.write(b"".join(records))
+            return
+        offsets = []
+        pos = self.data.tell()
+        for record in records:
+            offsets.append(pos)
+            pos += len(record)
+        self.data.write(b"".join(records))
+        self.offsets.write(offset_index.pack_offsets(offsets))
+        if self.keys is not None:
+            self.keys.append(offsets, keys)
+
+    def flush(self, fsync: bool = False) -> None:
+        # Data goes out before its indexes so readers never see an offset
+        # that points past the end of the file.
+        handles = [self.data] + ([self.offsets] if self.offsets else [])
+        for fh in handles:
+            fh.flush()
+            if fsync:
+                os.fsync(fh.fileno())
+        if self.keys is not None:
+            self.keys.flush(fsync)
+
+    def close(self) -> None:
+        self.data.close()
+        if self.offsets is not None:
+            self.offsets.close()
+        if self.keys is not None:
+            self.keys.close()
+
+
+class BusWriter:
+    """Appends records to `<root>/<topic>.ndjson` through long-lived handles.
+
+    Topics configured with `TopicConfig(encoding="binary")` are written to
+    `<root>/<topic>.bin` in the length-prefixed format from `codec` instead.
+
+    Records are buffered per topic and written out in one call according to
+    the `FlushPolicy`. Call `flush()` before handing a topic to a reader in
+    another process and `close()` before removing the bus directory.
+
+    With `index=True` every record is also registered in the `<topic>.idx`
+    offset sidecar (see `offset_index`) and the symbol / event-time sidecars
+    (see `key_index`) as it is written.
+
+    Topics configured with a segmenting `TopicConfig` are written as rolling
+    segments (see `segments`); retention and compaction run on each roll.
+
+    With `shared=True` several processes may append to the same topics
+    without a lock: each write-out is split into single O_APPEND writes of at
+    most `max_append_bytes` holding whole records, so records never
+    interleave. Shared topics keep no sidecars (readers index them in
+    memory) and cannot be segmented. Every published record is stamped with
+    `bus_writer` (unique per writer) and `bus_seq` (per topic, from 1), so
+    consumers can order and de-duplicate records per writer. All writers of
+    a topic must use the same mode.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        policy: Optional[FlushPolicy] = None,
+        time_source: Optional[Callable[[], int]] = None,
+        index: bool = True,
+        shared: bool = False,
+        max_append_bytes: int = DEFAULT_MAX_APPEND_BYTES,
+    ):
+        if shared and max_append_bytes <= 0:
+            raise ValueError("shared mode needs a positive max_append_bytes")
+        self.root = Path(root)
+        self.policy = policy or FlushPolicy()
+        self.index = index
+        self.shared = shared
+        self.max_append_bytes = max_append_bytes
+        self.writer_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._seq: Dict[str, int] = {}
+        self._time_source = time_source or (lambda: int(time.time() * 1000))
+        self._configs: Dict[str, TopicConfig] = {}
+        self._files: Dict[str, _TopicFiles] = {}
+        self._pending: Dict[str, List[bytes]] = {}
+        self._pending_keys: Dict[str, List[Tuple[str, int]]] = {}
+        self._pending_bytes: Dict[str, int] = {}
+        self._last_write_ms: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls, root: Path, prefix: Optional[str] = None) -> "BusWriter":
+        """Writer configured from `FlushPolicy.from_env` plus
+        `BUS_SHARED_APPEND` (1/0) and `BUS_MAX_APPEND_BYTES`."""
+        p = (prefix + "_") if prefix else ""
+        return cls(
+            root,
+            FlushPolicy.from_env(prefix),
+            shared=os.getenv(p + "BUS_SHARED_APPEND", "0") == "1",
+            max_append_bytes=_int_env(
+                p + "BUS_MAX_APPEND_BYTES", DEFAULT_MAX_APPEND_BYTES
+            ),
+        )
+
+    def _format(self, topic: str) -> codec.RecordFormat:
+        config = self._configs.get(topic)
+        return config.format if config is not None else codec.NDJSON
+
+    def path_for(self, topic: str) -> Path:
+        return self.root / f"{topic}{self._format(topic).suffix}"
+
+    def configure_topic(self, topic: str, config: TopicConfig) -> None:
+        if self.shared and config.segmented:
+            raise ValueError("segmented topics need a single writer")
+        if not config.segmented:
+            for fmt in codec.FORMATS.values():
+                other = self.root / f"{topic}{fmt.suffix}"
+                if fmt is not config.format and other.exists() and other.stat().st_size:
+                    raise ValueError(
+                        f"{other.name} holds {topic} in another encoding; "
+                        "convert it first"
+                    )
+        self.flush(topic)
+        files = self._files.pop(topic, None)
+        if files is not None:
+            files.close()
+        self._configs[topic] = config
+
+    def apply_retention(self, topic: str) -> List[Path]:
+        config = self._configs.get(topic)
+        if config is None or not config.segmented:
+            return []
+        self.flush(topic)
+        return segments.apply_retention(self.root, topic, config, self._time_source())
+
+    def _open_files(self, topic: str) -> _TopicFiles:
+        now_ms = self._time_source()
+        config = self._configs.get(topic)
+        if config is None or not config.segmented:
+            return _TopicFiles(
+                self.path_for(topic),
+                self.index,
+                opened_ms=now_ms,
+                max_append_bytes=self.max_append_bytes if self.shared else 0,
+            )
+        suffix = config.format.suffix
+        existing = segments.list_segments(self.root, topic)
+        base = 0
+        if existing:
+            base, last = existing[-1]
+            if last.suffix != suffix:
+                # Encoding changed: continue in a fresh segment after the last one.
+                base += last.stat().st_size
+        path = segments.segment_path(self.root, topic, base, suffix)
+        return _TopicFiles(path, self.index, base=base, opened_ms=now_ms)
+
+    def _topic_files(self, topic: str) -> _TopicFiles:
+        files = self._files.get(topic)
+        if files is not None and files.stale():
+            # The file was removed underneath us (e.g. bus reset); reopen it.
+            files.close()
+            files = None
+        if files is None:
+            files = self._files[topic] = self._open_files(topic)
+        return files
+
+    def _maybe_roll(self, topic: str, files: _TopicFiles) -> _TopicFiles:
+        config = self._configs.get(topic)
+        if config is None or not config.segmented:
+            return files
+        size = files.data.tell()
+        now_ms = self._time_source()
+        full = config.segment_bytes and size >= config.segment_bytes
+        aged = config.segment_ms and now_ms - files.opened_ms >= config.segment_ms
+        if size == 0 or not (full or aged):
+            return files
+
+        files.flush(fsync=self.policy.durability == DURABILITY_FSYNC)
+        files.close()
+        base = files.base + size
+        path = segments.segment_path(self.root, topic, base, config.format.suffix)
+        files = _TopicFiles(path, self.index, base=base, opened_ms=now_ms)
+        self._files[topic] = files
+        if config.compact_key:
+            segments.compact(self.root, topic, config.compact_key)
+        segments.apply_retention(self.root, topic, config, now_ms)
+        return files
+
+    def _should_write(self, topic: str) -> bool:
+        policy = self.policy
+        if policy.max_records and len(self._pending[topic]) >= policy.max_records:
+            return True
+        if policy.max_bytes and self._pending_bytes[topic] >= policy.max_bytes:
+            return True
+        if policy.max_interval_ms:
+            last = self._last_write_ms.setdefault(topic, self._time_source())
+            if self._time_source() - last >= policy.max_interval_ms:
+                return True
+        return False
+
+    def _write_out(self, topic: str, force_flush: bool = False) -> None:
+        pending = self._pending.get(topic)
+        if pending:
+            keys = self._pending_keys[topic]
+            files = self._maybe_roll(topic, self._topic_files(topic))
+            files.append(pending, keys)
+            pending.clear()
+            keys.clear()
+            self._pending_bytes[topic] = 0
+            self._last_write_ms[topic] = self._time_source()
+        files = self._files.get(topic)
+        if files is None:
+            return
+        durability = self.policy.durability
+        if force_flush or durability != DURABILITY_NONE:
+            files.flush(fsync=durability == DURABILITY_FSYNC)
+
+    def publish(self, topic: str, message: dict) -> None:
+        if self.shared:
+            seq = self._seq[topic] = self._seq.get(topic, 0) + 1
+            message = dict(message, bus_writer=self.writer_id, bus_seq=seq)
+        symbol, ts = key_index.record_key(message)
+        record = self._format(topic).encode(message)
+        self.write_raw(topic, record, symbol=symbol, ts=ts)
+
+    def publish_many(self, topic: str, messages: Iterable[dict]) -> None:
+        """Encode `messages` and write them out in one append.
+
+        The flush policy's record/byte/interval thresholds are bypassed;
+        its durability mode still applies.
+        """
+        fmt = self._format(topic)
+        records: List[bytes] = []
+        keys: List[Tuple[str, int]] = []
+        for message in messages:
+            if self.shared:
+                seq = self._seq[topic] = self._seq.get(topic, 0) + 1
+                message = dict(message, bus_writer=self.writer_id, bus_seq=seq)
+            record = fmt.encode(message)
+            if self.shared and len(record) > self.max_append_bytes:
+                raise ValueError(
+                    f"{len(record)} byte record exceeds max_append_bytes "
+                    f"({self.max_append_bytes}) for shared topic {topic}"
+                )
+            records.append(record)
+            keys.append(key_index.record_key(message))
+        self._pending.setdefault(topic, []).extend(records)
+        self._pending_keys.setdefault(topic, []).extend(keys)
+        self._pending_bytes[topic] = self._pending_bytes.get(topic, 0) + sum(
+            map(len, records)
+        )
+        self._write_out(topic)
+
+    def write_raw(
+        self, topic: str, record: bytes, symbol: str = "", ts: int = key_index.NO_TS
+    ) -> None:
+        """Buffer a record framed in the topic's format.
+
+        `symbol` / `ts` feed the key index.
+        """
+        if self.shared and len(record) > self.max_append_bytes:
+            raise ValueError(
+                f"{len(record)} byte record exceeds max_append_bytes "
+                f"({self.max_append_bytes}) for shared topic {topic}"
+            )
+        self._pending.setdefault(topic, []).append(record)
+        self._pending_keys.setdefault(topic, []).append((symbol, ts))
+        self._pending_bytes[topic] = self._pending_bytes.get(topic, 0) + len(record)
+        if self._should_write(topic):
+            self._write_out(topic)
+
+    def flush(self, topic: Optional[str] = None) -> None:
+        """Write out pending records and flush handles to the OS."""
+        topics = [topic] if topic is not None else sorted(self._pending)
+        for name in topics:
+            self._write_out(name, force_flush=True)
+
+    def close(self) -> None:
+        self.flush()
+        for files in self._files.values():
+            files.close()
+        self._files.clear()
+        self._pending.clear()
+        self._pending_keys.clear()
+        self._pending_bytes.clear()
+        self._last_write_ms.clear()
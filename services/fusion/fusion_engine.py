@@ -21,7 +21,7 @@ def fuse_signals(
     trace_topic: str = "fusion.trace.v1",
     out_topic: str = "candidate.v1",
 ) -> None:
-    signals = [s for s in read_all(input_topic) if s.get("symbol") == symbol]
+    signals = list(read_all(input_topic, symbol=symbol))
     if not signals:
         return
 
@@ -1,85 +1,214 @@
 from __future__ import annotations
 
 import time
-from collections import deque
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 from services.codex_orchestrator.validate_and_publish import (
     validate_and_publish_display,
 )
 from services.event_store.simple_bus import publish
+from services.indicators.library import IndicatorSet, IndicatorSpec
+
+try:
+    import numpy as np  # type: ignore[import-not-found]
+except ModuleNotFoundError:  # matrix mode falls back to plain lists
+    np = None
 
 INDICATORS_TOPIC = "indicators.bar.v1"
 SIGNAL_TOPIC = "signal.display.v1"
 EMA_SHORT = 9
 EMA_LONG = 21
 ATR_PERIOD = 14
+INDICATOR_NAMES = ("ema_short", "ema_long", "atr")
+# Batch results agree with `handle_bar` within this relative tolerance. The
+# pure-Python paths run the streaming indicators themselves; NumPy may sum
+# the seed windows in a different order.
+BATCH_RTOL = 1e-9
 
-
-def _ema(alpha: float, prev: float, value: float) -> float:
-    return alpha * value + (1 - alpha) * prev
+IndicatorSeries = Dict[str, List[Optional[float]]]
 
 
 class IndicatorState:
+    """Per-symbol indicators: EMA short/long and ATR, plus `extra` specs.
+
+    The values come from the shared `library` indicators; `extra` maps
+    further output names to `(kind, params)` specs (see `library.create`).
+    """
+
     def __init__(
-        self, short: int = EMA_SHORT, long: int = EMA_LONG, atr_period: int = ATR_PERIOD
+        self,
+        short: int = EMA_SHORT,
+        long: int = EMA_LONG,
+        atr_period: int = ATR_PERIOD,
+        extra: Optional[Dict[str, IndicatorSpec]] = None,
     ):
         self.short = short
         self.long = long
         self.atr_period = atr_period
-        self.prices: deque[float] = deque(maxlen=max(self.long, self.atr_period) + 10)
+        specs: Dict[str, IndicatorSpec] = {
+            "ema_short": ("ema", {"period": short}),
+            "ema_long": ("ema", {"period": long}),
+            "atr": ("atr", {"period": atr_period}),
+        }
+        for name, spec in (extra or {}).items():
+            if name in specs:
+                raise ValueError(f"indicator name already in use: {name}")
+            specs[name] = spec
+        self.indicators = IndicatorSet(specs)
         self.ema_short: Optional[float] = None
         self.ema_long: Optional[float] = None
         self.prev_ema_short: Optional[float] = None
         self.prev_ema_long: Optional[float] = None
-        self.trs: deque[float] = deque(maxlen=self.atr_period)
         self.atr: Optional[float] = None
-        self.last_close: Optional[float] = None
 
     def update_from_bar(self, bar: Dict[str, int]) -> Dict[str, Optional[float]]:
-        close = float(bar["close"])
-        high = float(bar["high"])
-        low = float(bar["low"])
+        values = self.indicators.update(
+            float(bar["close"]),
+            float(bar["high"]),
+            float(bar["low"]),
+            float(bar.get("volume", 0)),
+        )
+        self.prev_ema_short = self.ema_short
+        self.prev_ema_long = self.ema_long
+        self.ema_short = values["ema_short"]
+        self.ema_long = values["ema_long"]
+        self.atr = values["atr"]
+        return values
 
-        if self.last_close is None:
-            self.last_close = close
+    def update_batch(
+        self,
+        closes: Sequence[Any],
+        highs: Sequence[Any],
+        lows: Sequence[Any],
+        volumes: Optional[Sequence[Any]] = None,
+    ) -> IndicatorSeries:
+        """`update_from_bar` over whole columns; returns one list per indicator.
 
-        self.prices.append(close)
+        Leaves the state exactly as the equivalent `update_from_bar` calls
+        would, without building a dict per row.
+        """
+        closes = [float(c) for c in closes]
+        highs = [float(h) for h in highs]
+        lows = [float(lo) for lo in lows]
+        if volumes is None:
+            volumes = [0.0] * len(closes)
+        else:
+            volumes = [float(v) for v in volumes]
+        out = self.indicators.update_columns(closes, highs, lows, volumes)
+        if closes:
+            ema_short, ema_long = out["ema_short"], out["ema_long"]
+            if len(closes) > 1:
+                self.prev_ema_short, self.prev_ema_long = ema_short[-2], ema_long[-2]
+            else:
+                self.prev_ema_short, self.prev_ema_long = self.ema_short, self.ema_long
+            self.ema_short, self.ema_long = ema_short[-1], ema_long[-1]
+            self.atr = out["atr"][-1]
+        return out
 
-        self.prev_ema_short = self.ema_short
-        self.prev_ema_long = self.ema_long
 
-        if self.ema_short is None and len(self.prices) >= self.short:
-            self.ema_short = sum(list(self.prices)[-self.short :]) / self.short
-        elif self.ema_short is not None:
-            alpha_short = 2 / (self.short + 1)
-            self.ema_short = _ema(alpha_short, self.ema_short, close)
+def _matrix_numpy(
+    close: Any, high: Any, low: Any, short: int, long: int, atr_period: int
+) -> Dict[str, Any]:
+    close = np.asarray(close, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    rows = close.shape[0]
+    out: Dict[str, Any] = {}
+    for name, period in (("ema_short", short), ("ema_long", long)):
+        ema = np.full(close.shape, np.nan)
+        if rows >= period:
+            alpha = 2 / (period + 1)
+            ema[period - 1] = close[:period].sum(axis=0) / period
+            for t in range(period, rows):
+                ema[t] = alpha * close[t] + (1 - alpha) * ema[t - 1]
+        out[name] = ema
+    prev_close = np.concatenate([close[:1], close[:-1]])
+    tr = np.maximum(
+        high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close))
+    )
+    atr = np.full(close.shape, np.nan)
+    if rows >= atr_period:
+        atr[atr_period - 1] = tr[:atr_period].sum(axis=0) / atr_period
+        for t in range(atr_period, rows):
+            atr[t] = (atr[t - 1] * (atr_period - 1) + tr[t]) / atr_period
+    out["atr"] = atr
+    return out
 
-        if self.ema_long is None and len(self.prices) >= self.long:
-            self.ema_long = sum(list(self.prices)[-self.long :]) / self.long
-        elif self.ema_long is not None:
-            alpha_long = 2 / (self.long + 1)
-            self.ema_long = _ema(alpha_long, self.ema_long, close)
 
-        tr = max(high - low, abs(high - self.last_close), abs(low - self.last_close))
-        self.trs.append(tr)
-        if self.atr is None and len(self.trs) >= self.atr_period:
-            self.atr = sum(self.trs) / len(self.trs)
-        elif self.atr is not None:
-            self.atr = (self.atr * (self.atr_period - 1) + tr) / self.atr_period
+def compute_matrix(
+    close: Any,
+    high: Any,
+    low: Any,
+    short: int = EMA_SHORT,
+    long: int = EMA_LONG,
+    atr_period: int = ATR_PERIOD,
+) -> Dict[str, Any]:
+    """Indicators for many symbols at once from fresh state.
 
-        self.last_close = close
-        return {"ema_short": self.ema_short, "ema_long": self.ema_long, "atr": self.atr}
+    Inputs are (bars x symbols) matrices, one column per symbol, all aligned
+    on the same bar times. Returns a matrix of the same shape per name in
+    `INDICATOR_NAMES`, NaN where the streaming path would give None. With
+    NumPy each recursion step updates every symbol in one array operation
+    (results within `BATCH_RTOL` of `handle_bar`); without it the columns go
+    through `IndicatorState.update_batch` and lists of rows are returned.
+    """
+    if np is not None:
+        return _matrix_numpy(close, high, low, short, long, atr_period)
+    columns = [
+        IndicatorState(short, long, atr_period).update_batch(c, h, lo)
+        for c, h, lo in zip(zip(*close), zip(*high), zip(*low))
+    ]
+    nan = float("nan")
+    return {
+        name: [
+            [nan if v is None else v for v in row]
+            for row in zip(*(col[name] for col in columns))
+        ]
+        for name in INDICATOR_NAMES
+    }
 
 
 class IndicatorEngine:
-    def __init__(self, stop_atr_multiplier: float = 1.5):
+    """Per-symbol indicators and EMA-crossover signals from closed bars.
+
+    `indicators` adds outputs to every symbol's state (see `IndicatorState`);
+    they are published with the default ones.
+    """
+
+    def __init__(
+        self,
+        stop_atr_multiplier: float = 1.5,
+        indicators: Optional[Dict[str, IndicatorSpec]] = None,
+    ):
         self._states: Dict[str, IndicatorState] = {}
         self.stop_atr_multiplier = stop_atr_multiplier
+        self.extra_indicators = dict(indicators or {})
+
+    def _state(self, symbol: str) -> IndicatorState:
+        state = self._states.get(symbol)
+        if state is None:
+            state = self._states[symbol] = IndicatorState(extra=self.extra_indicators)
+        return state
+
+    def compute_batch(
+        self, symbol: str, bars: Sequence[Dict[str, Any]]
+    ) -> IndicatorSeries:
+        """Indicator values of `symbol` for `bars`, without publishing.
+
+        Continues from (and advances) the symbol's streaming state, so a
+        backfill with `compute_batch` followed by `handle_bar` calls gives the
+        same values as `handle_bar` throughout. No signals are emitted.
+        """
+        return self._state(symbol).update_batch(
+            [bar["close"] for bar in bars],
+            [bar["high"] for bar in bars],
+            [bar["low"] for bar in bars],
+            [bar.get("volume", 0) for bar in bars],
+        )
 
     def handle_bar(self, bar: Dict[str, int]) -> None:
         symbol = str(bar["symbol"])
-        state = self._states.setdefault(symbol, IndicatorState())
+        state = self._state(symbol)
         indicators = state.update_from_bar(bar)
 
         publish(
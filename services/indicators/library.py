@@ -0,0 +1,387 @@
+"""Incremental indicators shared by the indicator engine and feature worker.
+
+    indicators = IndicatorSet({"ema_9": ("ema", {"period": 9}),
+                               "bb": ("bollinger", {"period": 20})})
+    values = indicators.update(close, high, low, volume)
+
+Every indicator is registered under a kind name and created from
+`(kind, params)`. `update` costs O(1) per bar: windows keep running sums
+(SMA), running Welford moments (Bollinger, z-score) or monotonic deques
+(rolling high/low), and recursive indicators keep only their last value.
+An indicator returns None until its warm-up is complete.
+
+Arithmetic follows the inputs: pass floats, or `Decimal`s together with
+`num=Decimal` so that constants are built as `Decimal` as well.
+"""
+from __future__ import annotations
+
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple, Type
+
+Number = Callable[[Any], Any]
+# (kind, params) as accepted by `create`.
+IndicatorSpec = Tuple[str, Dict[str, Any]]
+
+INDICATORS: Dict[str, Type["Indicator"]] = {}
+
+SEED_SMA = "sma"
+SEED_FIRST = "first"
+
+
+def register(kind: str) -> Callable[[Type["Indicator"]], Type["Indicator"]]:
+    """Class decorator adding an indicator to `INDICATORS` under `kind`."""
+
+    def wrap(cls: Type["Indicator"]) -> Type["Indicator"]:
+        cls.kind = kind
+        INDICATORS[kind] = cls
+        return cls
+
+    return wrap
+
+
+def create(kind: str, num: Number = float, **params: Any) -> "Indicator":
+    cls = INDICATORS.get(kind)
+    if cls is None:
+        raise ValueError(f"unknown indicator: {kind}")
+    return cls(num=num, **params)
+
+
+def _sqrt(value: Any) -> Any:
+    return value.sqrt() if hasattr(value, "sqrt") else math.sqrt(value)
+
+
+class Indicator(ABC):
+    """Base class; `update` takes one bar and returns the current value.
+
+    Indicators with several outputs list them in `parts` and return a dict.
+    """
+
+    kind = ""
+    parts: Tuple[str, ...] = ()
+
+    def __init__(self, num: Number = float):
+        self.num = num
+        self.value: Any = None
+
+    @abstractmethod
+    def update(self, close: Any, high: Any, low: Any, volume: Any) -> Any:
+        ...
+
+
+class _RollingMoments:
+    """Mean and variance of a sliding window (Welford, with removal)."""
+
+    def __init__(self, period: int, num: Number):
+        self.period = period
+        self.window: Deque[Any] = deque()
+        self.mean = num(0)
+        self.m2 = num(0)
+        self._zero = num(0)
+
+    def push(self, x: Any) -> None:
+        self.window.append(x)
+        n = len(self.window)
+        delta = x - self.mean
+        self.mean += delta / n
+        self.m2 += delta * (x - self.mean)
+        if n > self.period:
+            old = self.window.popleft()
+            n -= 1
+            delta = old - self.mean
+            self.mean -= delta / n
+            self.m2 -= delta * (old - self.mean)
+
+    @property
+    def full(self) -> bool:
+        return len(self.window) >= self.period
+
+    def std(self) -> Any:
+        # Population deviation; rounding can leave m2 slightly negative.
+        return _sqrt(max(self.m2, self._zero) / len(self.window))
+
+
+@register("sma")
+class Sma(Indicator):
+    def __init__(self, period: int, num: Number = float):
+        super().__init__(num)
+        self.period = period
+        self.window: Deque[Any] = deque()
+        self.total = num(0)
+
+    def update(self, close: Any, high: Any, low: Any, volume: Any) -> Any:
+        self.window.append(close)
+        self.total += close
+        if len(self.window) > self.period:
+            self.total -= self.window.popleft()
+        if len(self.window) == self.period:
+            self.value = self.total / self.period
+        return self.value
+
+
+@register("ema")
+class Ema(Indicator):
+    """EMA with alpha 2 / (period + 1).
+
+    `seed="sma"` starts from the mean of the first `period` closes (None
+    before that); `seed="first"` starts from the first close.
+    """
+
+    def __init__(self, period: int, seed: str = SEED_SMA, num: Number = float):
+        super().__init__(num)
+        if seed not in (SEED_SMA, SEED_FIRST):
+            raise ValueError(f"unknown EMA seed: {seed}")
+        self.period = period
+        self.seed = seed
+        self.alpha = num(2) / num(period + 1)
+        self.count = 0
+        self.total = num(0)
+
+    def update(self, close: Any, high: Any, low: Any, volume: Any) -> Any:
+        if self.value is not None:
+            self.value = self.alpha * close + (1 - self.alpha) * self.value
+        elif self.seed == SEED_FIRST:
+            self.value = close
+        else:
+            self.count += 1
+            self.total += close
+            if self.count >= self.period:
+                self.value = self.total / self.period
+        return self.value
+
+
+@register("atr")
+class Atr(Indicator):
+    """Wilder ATR, seeded with the mean true range of the first `period` bars."""
+
+    def __init__(self, period: int, num: Number = float):
+        super().__init__(num)
+        self.period = period
+        self.count = 0
+        self.total = num(0)
+        self.prev_close: Any = None
+
+    def update(self, close: Any, high: Any, low: Any, volume: Any) -> Any:
+        prev = close if self.prev_close is None else self.prev_close
+        tr = max(high - low, abs(high - prev), abs(low - prev))
+        self.prev_close = close
+        if self.value is not None:
+            self.value = (self.value * (self.period - 1) + tr) / self.period
+        else:
+            self.count += 1
+            self.total += tr
+            if self.count >= self.period:
+                self.value = self.total / self.count
+        return self.value
+
+
+@register("vwap")
+class Vwap(Indicator):
+    """Cumulative volume-weighted close; None while the volume is zero."""
+
+    def __init__(self, num: Number = float):
+        super().__init__(num)
+        self.cum_pv = num(0)
+        self.cum_vol = num(0)
+
+    def update(self, close: Any, high: Any, low: Any, volume: Any) -> Any:
+        size = self.num(volume)
+        self.cum_pv += close * size
+        self.cum_vol += size
+        if self.cum_vol != 0:
+            self.value = self.cum_pv / self.cum_vol
+        return self.value
+
+
+class _RollingExtreme(Indicator):
+    """Extreme of the last `period` bars from a monotonic deque."""
+
+    def __init__(self, period: int, num: Number = float):
+        super().__init__(num)
+        self.period = period
+        self.count = 0
+        # (bar index, value); values strictly decrease (max) or increase (min).
+        self.candidates: Deque[Tuple[int, Any]] = deque()
+
+    def _push(self, x: Any, dominates: Callable[[Any, Any], bool]) -> Any:
+        candidates = self.candidates
+        while candidates and dominates(x, candidates[-1][1]):
+            candidates.pop()
+        candidates.append((self.count, x))
+        self.count += 1
+        if candidates[0][0] <= self.count - 1 - self.period:
+            candidates.popleft()
+        if self.count >= self.period:
+            self.value = candidates[0][1]
+        return self.value
+
+
+@register("rolling_high")
+class RollingHigh(_RollingExtreme):
+    def update(self, close: Any, high: Any, low: Any, volume: Any) -> Any:
+        return self._push(high, lambda x, y: x >= y)
+
+
+@register("rolling_low")
+class RollingLow(_RollingExtreme):
+    def update(self, close: Any, high: Any, low: Any, volume: Any) -> Any:
+        return self._push(low, lambda x, y: x <= y)
+
+
+@register("bollinger")
+class Bollinger(Indicator):
+    """Mean of the last `period` closes +/- `width` population deviations.
+
+    The value is a dict with `middle`, `upper` and `lower`.
+    """
+
+    parts = ("middle", "upper", "lower")
+
+    def __init__(self, period: int = 20, width: float = 2, num: Number = float):
+        super().__init__(num)
+        self.width = num(width)
+        self.moments = _RollingMoments(period, num)
+
+    def update(self, close: Any, high: Any, low: Any, volume: Any) -> Any:
+        moments = self.moments
+        moments.push(close)
+        if moments.full:
+            band = self.width * moments.std()
+            self.value = {
+                "middle": moments.mean,
+                "upper": moments.mean + band,
+                "lower": moments.mean - band,
+            }
+        return self.value
+
+
+@register("zscore")
+class ZScore(Indicator):
+    """Distance of the close from the mean of the last `period` closes, in
+    population deviations (0 for a flat window)."""
+
+    def __init__(self, period: int = 20, num: Number = float):
+        super().__init__(num)
+        self.moments = _RollingMoments(period, num)
+
+    def update(self, close: Any, high: Any, low: Any, volume: Any) -> Any:
+        moments = self.moments
+        moments.push(close)
+        if moments.full:
+            std = moments.std()
+            self.value = (close - moments.mean) / std if std else self.num(0)
+        return self.value
+
+
+@register("rsi")
+class Rsi(Indicator):
+    """Wilder RSI; averages seeded with the mean of the first `period` changes."""
+
+    def __init__(self, period: int = 14, num: Number = float):
+        super().__init__(num)
+        self.period = period
+        self.count = 0
+        self.prev_close: Any = None
+        self.avg_gain = num(0)
+        self.avg_loss = num(0)
+
+    def update(self, close: Any, high: Any, low: Any, volume: Any) -> Any:
+        if self.prev_close is None:
+            self.prev_close = close
+            return self.value
+        change = close - self.prev_close
+        self.prev_close = close
+        zero = self.num(0)
+        gain = change if change > 0 else zero
+        loss = -change if change < 0 else zero
+        period = self.period
+        if self.count < period:
+            self.count += 1
+            self.avg_gain += gain / period
+            self.avg_loss += loss / period
+            if self.count < period:
+                return self.value
+        else:
+            self.avg_gain = (self.avg_gain * (period - 1) + gain) / period
+            self.avg_loss = (self.avg_loss * (period - 1) + loss) / period
+        hundred = self.num(100)
+        if self.avg_loss == 0:
+            self.value = hundred if self.avg_gain else hundred / 2
+        else:
+            self.value = hundred - hundred / (1 + self.avg_gain / self.avg_loss)
+        return self.value
+
+
+class IndicatorSet:
+    """Named indicators updated together from one bar.
+
+    `update` returns a dict with one entry per name, in spec order.
+    Multi-output indicators (Bollinger) get one `<name>_<part>` entry per
+    part instead. `update_columns` does the same for many bars at once.
+    """
+
+    def __init__(self, specs: Dict[str, IndicatorSpec], num: Number = float):
+        self.indicators: Dict[str, Indicator] = {
+            name: create(kind, num=num, **params)
+            for name, (kind, params) in specs.items()
+        }
+        self._simple = all(not ind.parts for ind in self.indicators.values())
+
+    @property
+    def names(self) -> List[str]:
+        """Output names, in the order `update` returns them."""
+        out: List[str] = []
+        for name, indicator in self.indicators.items():
+            if indicator.parts:
+                out.extend(f"{name}_{part}" for part in indicator.parts)
+            else:
+                out.append(name)
+        return out
+
+    def update(
+        self,
+        close: Any,
+        high: Optional[Any] = None,
+        low: Optional[Any] = None,
+        volume: Any = 0,
+    ) -> Dict[str, Any]:
+        high = close if high is None else high
+        low = close if low is None else low
+        if self._simple:
+            return {
+                name: indicator.update(close, high, low, volume)
+                for name, indicator in self.indicators.items()
+            }
+        out: Dict[str, Any] = {}
+        for name, indicator in self.indicators.items():
+            value = indicator.update(close, high, low, volume)
+            if not indicator.parts:
+                out[name] = value
+                continue
+            for part in indicator.parts:
+                out[f"{name}_{part}"] = None if value is None else value[part]
+        return out
+
+    def update_columns(
+        self,
+        closes: Sequence[Any],
+        highs: Sequence[Any],
+        lows: Sequence[Any],
+        volumes: Sequence[Any],
+    ) -> Dict[str, List[Any]]:
+        """`update` per row of the columns; returns one list per name.
+
+        Runs one indicator over all rows at a time, so no per-row dict is
+        built.
+        """
+        out: Dict[str, List[Any]] = {}
+        for name, indicator in self.indicators.items():
+            update = indicator.update
+            values = list(map(update, closes, highs, lows, volumes))
+            if not indicator.parts:
+                out[name] = values
+                continue
+            for part in indicator.parts:
+                out[f"{name}_{part}"] = [None if v is None else v[part] for v in values]
+        return out
@@ -1,36 +1,237 @@
+"""CSV tick ingest.
+
+`ingest_csv_ticks` publishes one message per row. `ingest_csv_bulk` parses
+the file in chunks of `chunk_rows` rows and publishes each chunk with one
+write-out. `ingest_directory` fans a directory of files out to worker
+processes, which parse while the parent publishes. Every function accepts
+plain, gzip (`.gz`) or zstd (`.zst`, needs the `zstandard` package) files
+and reads them as a stream. The bulk functions can also write the ticks to
+a `ColumnarWriter` for historical queries.
+"""
 import csv
+import gzip
+import io
+import multiprocessing
+import queue
+import traceback
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Union
+
+from services.event_store.columnar import ColumnarWriter
+from services.event_store.simple_bus import publish, publish_many
 
-from services.event_store.simple_bus import publish
+try:
+    import zstandard
+except ModuleNotFoundError:  # .zst inputs need it
+    zstandard = None
 
 # Example CSV columns: ts_ms,symbol,price_ticks,size,venue
 
+DEFAULT_CHUNK_ROWS = 10_000
 
-def ingest_csv_ticks(csv_path: str, topic: str = "market.tick.v1") -> None:
+PathLike = Union[str, Path]
+
+
+def _open_text(path: Path) -> TextIO:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd-compressed; install zstandard")
+        raw = zstandard.ZstdDecompressor().stream_reader(path.open("rb"))
+        return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    return path.open("r", encoding="utf-8", newline="")
+
+
+def iter_tick_chunks(
+    csv_path: PathLike, chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> Iterator[List[Dict[str, Any]]]:
+    """Yield tick messages of `csv_path` in lists of up to `chunk_rows`.
+
+    Columns are located once from the header and converted by position,
+    which is much cheaper than a dict per row from `csv.DictReader`.
+    """
     p = Path(csv_path)
     if not p.exists():
         raise FileNotFoundError(csv_path)
-    with p.open("r", encoding="utf-8") as fh:
-        reader = csv.DictReader(fh)
+    with _open_text(p) as fh:
+        reader = csv.reader(fh)
+        header = next(reader, None)
+        if header is None:
+            return
+        col = {name: i for i, name in enumerate(header)}
+        i_symbol = col["symbol"]
+        i_ts = col["ts_ms"]
+        i_price = col["price_ticks"]
+        i_size = col["size"]
+        i_seq = col.get("seq_no")
+        i_recv = col.get("recv_ts_ms")
+        i_venue = col.get("venue")
+        chunk: List[Dict[str, Any]] = []
         for row in reader:
-            msg = {
-                "source_id": "csv_ingest",
-                "symbol": row["symbol"],
-                "seq_no": int(row.get("seq_no", 0)),
-                "ts_ms": int(row["ts_ms"]),
-                "recv_ts_ms": int(row.get("recv_ts_ms", row["ts_ms"])),
-                "price_ticks": int(row["price_ticks"]),
-                "size": int(row["size"]),
-                "venue": row.get("venue", "CSV"),
-            }
+            if not row:
+                continue
+            ts_ms = int(row[i_ts])
+            chunk.append(
+                {
+                    "source_id": "csv_ingest",
+                    "symbol": row[i_symbol],
+                    "seq_no": int(row[i_seq]) if i_seq is not None else 0,
+                    "ts_ms": ts_ms,
+                    "recv_ts_ms": int(row[i_recv]) if i_recv is not None else ts_ms,
+                    "price_ticks": int(row[i_price]),
+                    "size": int(row[i_size]),
+                    "venue": row[i_venue] if i_venue is not None else "CSV",
+                }
+            )
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def ingest_csv_ticks(csv_path: str, topic: str = "market.tick.v1") -> None:
+    for chunk in iter_tick_chunks(csv_path):
+        for msg in chunk:
             publish(topic, msg)
 
 
+def ingest_csv_bulk(
+    csv_path: PathLike,
+    topic: str = "market.tick.v1",
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    columnar: Optional[ColumnarWriter] = None,
+) -> int:
+    """Publish the ticks of `csv_path` chunk by chunk; returns the row count.
+
+    With `columnar` every chunk is appended to it as well; the caller
+    flushes or closes it.
+    """
+    count = 0
+    for chunk in iter_tick_chunks(csv_path, chunk_rows):
+        publish_many(topic, chunk)
+        if columnar is not None:
+            columnar.extend(chunk)
+        count += len(chunk)
+    return count
+
+
+def _parse_files(
+    tasks: "multiprocessing.Queue[Any]",
+    results: "multiprocessing.Queue[Any]",
+    chunk_rows: int,
+) -> None:
+    """Worker: parse files from `tasks` and stream their chunks to `results`."""
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        index, path = task
+        try:
+            for chunk in iter_tick_chunks(path, chunk_rows):
+                results.put(("chunk", index, chunk))
+        except Exception:
+            results.put(("error", index, traceback.format_exc()))
+        else:
+            results.put(("done", index, None))
+
+
+def ingest_directory(
+    directory: PathLike,
+    topic: str = "market.tick.v1",
+    pattern: str = "*.csv*",
+    processes: Optional[int] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    max_pending_chunks: int = 16,
+    columnar: Optional[ColumnarWriter] = None,
+) -> Dict[str, int]:
+    """Bulk-ingest every file matching `pattern`; returns rows per file.
+
+    With several files and `processes` != 1 (default: one per CPU), files are
+    parsed by a pool of worker processes and published here as their chunks
+    arrive. Each file's rows keep their order; rows of different files may
+    interleave. At most `max_pending_chunks` parsed chunks wait in memory.
+    A file that fails to parse raises `RuntimeError` once the rest is done;
+    its rows parsed before the error are published. `columnar` is passed
+    on as in `ingest_csv_bulk`.
+    """
+    files = sorted(p for p in Path(directory).glob(pattern) if p.is_file())
+    counts = {str(p): 0 for p in files}
+    workers = min(processes or multiprocessing.cpu_count(), len(files))
+    if workers <= 1:
+        for p in files:
+            counts[str(p)] = ingest_csv_bulk(p, topic, chunk_rows, columnar)
+        return counts
+
+    ctx = multiprocessing.get_context()
+    tasks: "multiprocessing.Queue[Any]" = ctx.Queue()
+    results: "multiprocessing.Queue[Any]" = ctx.Queue(maxsize=max_pending_chunks)
+    for index, p in enumerate(files):
+        tasks.put((index, str(p)))
+    for _ in range(workers):
+        tasks.put(None)
+    procs = [
+        ctx.Process(target=_parse_files, args=(tasks, results, chunk_rows), daemon=True)
+        for _ in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+    errors: List[str] = []
+    remaining = len(files)
+    try:
+        while remaining:
+            try:
+                kind, index, payload = results.get(timeout=1.0)
+            except queue.Empty:
+                if not any(proc.is_alive() for proc in procs):
+                    raise RuntimeError("ingest workers exited unexpectedly")
+                continue
+            name = str(files[index])
+            if kind == "chunk":
+                publish_many(topic, payload)
+                if columnar is not None:
+                    columnar.extend(payload)
+                counts[name] += len(payload)
+            else:
+                remaining -= 1
+                if kind == "error":
+                    errors.append(f"{name}:\n{payload}")
+    finally:
+        for proc in procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+    if errors:
+        raise RuntimeError("ingest failed\n" + "\n".join(errors))
+    return counts
+
+
 if __name__ == "__main__":
     import argparse
 
     parser = argparse.ArgumentParser()
-    parser.add_argument("csv_path")
+    parser.add_argument("csv_path", help="CSV file (optionally .gz/.zst) or directory")
     parser.add_argument("--topic", default="market.tick.v1")
+    parser.add_argument("--bulk", action="store_true", help="chunked batch publish")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--columnar", help="also write ticks to this columnar store")
     args = parser.parse_args()
-    ingest_csv_ticks(args.csv_path, args.topic)
+    columnar = (
+        ColumnarWriter(Path(args.columnar), args.topic) if args.columnar else None
+    )
+    if Path(args.csv_path).is_dir():
+        ingest_directory(
+            args.csv_path,
+            args.topic,
+            processes=args.processes,
+            chunk_rows=args.chunk_rows,
+            columnar=columnar,
+        )
+    elif args.bulk or columnar is not None:
+        ingest_csv_bulk(args.csv_path, args.topic, args.chunk_rows, columnar)
+    else:
+        ingest_csv_ticks(args.csv_path, args.topic)
+    if columnar is not None:
+        columnar.close()
@@ -0,0 +1,108 @@
+"""Single-pass CSV backfill: ingest straight into the aggregator.
+
+    agg = DeterministicAggregator(**AggregatorConfig().as_kwargs())
+    run_csv_pipeline(["ticks-2024-01.csv.gz"], agg, IndicatorEngine())
+
+Parsed ticks are fed to the aggregator in-process instead of being written
+to `market.tick.v1` and read back. Each tick's `recv_ts_ms` drives the
+aggregator clock, as in `consume_ticks`, so the bars match a run that ingests
+first and consumes the topic afterwards. With an indicator engine, every bar
+the aggregator publishes is also passed to `IndicatorEngine.handle_bar`. Raw
+ticks are only persisted with `persist_ticks=True`. With `columnar_root`
+the ticks and the finalized bars are also written to a columnar store there
+(corrections stay on the bus only).
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, Optional
+
+from services.event_store import simple_bus
+from services.event_store.columnar import ColumnarWriter
+from services.event_store.simple_bus import publish_many
+from services.indicators.engine import IndicatorEngine
+from services.ingest.ingest import DEFAULT_CHUNK_ROWS, PathLike, iter_tick_chunks
+from services.ohlcv.aggregator import OHLCV_TOPIC, DeterministicAggregator
+
+
+def run_csv_pipeline(
+    csv_paths: Iterable[PathLike],
+    aggregator: DeterministicAggregator,
+    indicators: Optional[IndicatorEngine] = None,
+    persist_ticks: bool = False,
+    topic: str = "market.tick.v1",
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    flush: bool = True,
+    columnar_root: Optional[PathLike] = None,
+) -> int:
+    """Feed the ticks of `csv_paths`, in order, into `aggregator`.
+
+    Returns the number of ticks read. With `persist_ticks` each chunk is also
+    published to `topic` before it is applied. `flush` finalizes the open
+    bars at the end (pass False to keep feeding the aggregator afterwards).
+    """
+    unsubscribers = []
+    if indicators is not None:
+        unsubscribers.append(simple_bus.subscribe(OHLCV_TOPIC, indicators.handle_bar))
+    tick_store = bar_store = None
+    if columnar_root is not None:
+        tick_store = ColumnarWriter(Path(columnar_root), topic)
+        bar_store = ColumnarWriter(Path(columnar_root), OHLCV_TOPIC)
+        unsubscribers.append(simple_bus.subscribe(OHLCV_TOPIC, bar_store.append))
+    count = 0
+    try:
+        for path in csv_paths:
+            for chunk in iter_tick_chunks(path, chunk_rows):
+                if persist_ticks:
+                    publish_many(topic, chunk)
+                if tick_store is not None:
+                    tick_store.extend(chunk)
+                for tick in chunk:
+                    aggregator.handle_tick(tick["symbol"], tick, tick["recv_ts_ms"])
+                count += len(chunk)
+        if flush:
+            aggregator.flush()
+    finally:
+        for unsubscribe in unsubscribers:
+            unsubscribe()
+        if tick_store is not None and bar_store is not None:
+            try:
+                tick_store.close()
+            finally:
+                bar_store.close()
+    return count
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from services.ohlcv.config import AggregatorConfig
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("csv_path", help="CSV file (optionally .gz/.zst) or directory")
+    parser.add_argument("--pattern", default="*.csv*", help="files of a directory")
+    parser.add_argument("--indicators", action="store_true")
+    parser.add_argument("--persist-ticks", action="store_true")
+    parser.add_argument("--topic", default="market.tick.v1")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--columnar", help="also write ticks and bars to this store")
+    args = parser.parse_args()
+    source = Path(args.csv_path)
+    paths = (
+        sorted(p for p in source.glob(args.pattern) if p.is_file())
+        if source.is_dir()
+        else [source]
+    )
+    agg = DeterministicAggregator(**AggregatorConfig().as_kwargs())
+    try:
+        run_csv_pipeline(
+            paths,
+            agg,
+            IndicatorEngine() if args.indicators else None,
+            persist_ticks=args.persist_ticks,
+            topic=args.topic,
+            chunk_rows=args.chunk_rows,
+            columnar_root=args.columnar,
+        )
+    finally:
+        agg.close()
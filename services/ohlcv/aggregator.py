@@ -1,30 +1,82 @@
 from __future__ import annotations
 
-import json
+import heapq
 import time
-from collections import OrderedDict
-from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, Optional, Tuple
+from collections import deque
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 
 from services.event_store.simple_bus import publish
+from services.ohlcv.audit import (
+    AUDIT_FULL,
+    AUDIT_LEVELS,
+    AUDIT_OFF,
+    AUDIT_SAMPLED,
+    AUDIT_TOPIC,
+    AuditSink,
+)
+from services.ohlcv.dedupe import TradeDeduper, trade_key
+
+try:
+    import numpy as np  # type: ignore[import-not-found]
+except ModuleNotFoundError:  # batch path falls back to plain lists
+    np = None
 
-AUDIT_TOPIC = "audit.records.v1"
 OHLCV_TOPIC = "ohlcv.bar.v1"
 OHLCV_CORRECTION_TOPIC = "ohlcv.correction.v1"
 METRICS_TOPIC = "metrics.ohlcv.v1"
+OHLCV_DEAD_LETTER_TOPIC = "ohlcv.dead_letter.v1"
 
+# Bumped whenever the `snapshot()` layout changes.
+SNAPSHOT_VERSION = 2
 
-@dataclass
+CLOCK_PROCESSING = "processing"
+CLOCK_EVENT = "event"
+CLOCK_MODES = (CLOCK_PROCESSING, CLOCK_EVENT)
+
+# (symbol, timeframe_ms, timeframe_start_ms)
+BarKey = Tuple[str, int, int]
+# (symbol, venue) feeding the event-time watermark.
+SourceKey = Tuple[str, Optional[str]]
+# A single clock for the whole batch, or one value per tick.
+BatchClock = Union[None, int, Sequence[int]]
+
+
+def _as_list(values: Any) -> List[Any]:
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
+
+def _bar_starts(ts: List[int], timeframe_ms: int) -> List[int]:
+    if np is not None and len(ts) > 64:
+        arr = np.asarray(ts, dtype=np.int64)
+        return ((arr // timeframe_ms) * timeframe_ms).tolist()
+    return [(t // timeframe_ms) * timeframe_ms for t in ts]
+
+
+@dataclass(slots=True)
 class Tick:
     ts_ms: int
     price_ticks: int
     size: int = 1
     trade_id: Optional[str] = None
     seq: Optional[int] = None
-    raw: Dict[str, Any] = field(default_factory=dict)
+    # Not filled in by the aggregator; the payload is not kept alive.
+    raw: Optional[Dict[str, Any]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Bar:
     symbol: str
     timeframe_ms: int
@@ -52,12 +104,48 @@ class Bar:
         }
 
 
+def _bar_row(bar: Bar) -> List[Any]:
+    return [getattr(bar, name) for name in Bar.__slots__]
+
+
 class DeterministicAggregator:
     """Deterministic OHLCV aggregator with dedupe, watermarking, and correction support.
 
     Notes:
       - This class is designed for a single-threaded worker loop.
       - `time_source` can be injected in tests for deterministic emitted timestamps.
+      - Open bars are kept in a min-heap keyed by expiry
+        (`timeframe_start_ms + timeframe_ms + allowed_lateness_ms`), so each
+        tick only touches the bars that actually expire. Ties are broken by
+        bar creation order, which keeps emission order deterministic.
+      - Finalized bars are kept for late-tick corrections. `correction_horizon_ms`
+        (measured from bar end, >= `allowed_lateness_ms`) and/or
+        `max_published_per_symbol` bound that history; 0 keeps it forever.
+        Ticks for bars beyond the horizon are counted and routed to
+        `OHLCV_DEAD_LETTER_TOPIC` instead of re-opening the bar.
+      - `timeframes` builds a ladder of bar sizes (e.g. 1s, 1m, 5m, 1h) from
+        one pass: each tick is parsed and deduped once, then folded into the
+        open bar of every timeframe. `lateness_by_timeframe_ms` overrides
+        `allowed_lateness_ms` per timeframe. Without `timeframes` only
+        `timeframe_ms` is built.
+      - `audit_level` is "full" (every event), "sampled" (every
+        `audit_sample_every`-th event of each type) or "off";
+        `audit_background=True` serializes audit records on a background
+        thread (see `AuditSink`). With `metrics_interval_ms` metrics are
+        summed per symbol/timeframe and emitted once per interval of the
+        aggregator clock instead of once per bar.
+      - Dedupe keys are integer hashes (see `services.ohlcv.dedupe`). Each
+        symbol keeps up to `dedupe_limit` keys, or with `dedupe_window_ms`
+        only those within that much event time of its newest tick; a Bloom
+        filter of `dedupe_bloom_capacity` keys (0 = off) still catches
+        duplicates that aged out of the exact set.
+      - `clock_mode="event"` finalizes bars against an event-time watermark
+        instead of `now_ms`: the lowest newest-tick `ts_ms` over all
+        sources (symbol, `venue`), ignoring sources whose newest tick is more
+        than `idle_timeout_ms` behind the newest tick overall (0 = sources
+        never go idle). Replays then release bars as they go, at any speed.
+        `now_ms` is ignored in this mode, and `emitted_ts_ms` still comes
+        from `time_source`.
     """
 
     def __init__(
@@ -67,21 +155,88 @@ class DeterministicAggregator:
         dedupe_limit: int = 10_000,
         prune_batch: int = 1_000,
         time_source: Optional[Callable[[], int]] = None,
+        correction_horizon_ms: int = 0,
+        max_published_per_symbol: int = 0,
+        timeframes: Optional[Sequence[int]] = None,
+        lateness_by_timeframe_ms: Optional[Dict[int, int]] = None,
+        audit_level: str = AUDIT_FULL,
+        audit_sample_every: int = 100,
+        audit_background: bool = False,
+        metrics_interval_ms: int = 0,
+        dedupe_window_ms: int = 0,
+        dedupe_bloom_capacity: int = 0,
+        dedupe_bloom_bits_per_key: int = 10,
+        clock_mode: str = CLOCK_PROCESSING,
+        idle_timeout_ms: int = 60_000,
     ):
-        self.timeframe_ms = timeframe_ms
+        if audit_level not in AUDIT_LEVELS:
+            raise ValueError(f"unknown audit level: {audit_level}")
+        if clock_mode not in CLOCK_MODES:
+            raise ValueError(f"unknown clock mode: {clock_mode}")
+        self.timeframes = sorted(set(timeframes)) if timeframes else [timeframe_ms]
+        if any(tf <= 0 for tf in self.timeframes):
+            raise ValueError("timeframes must be positive")
+        self.timeframe_ms = self.timeframes[0]
         self.allowed_lateness_ms = allowed_lateness_ms
+        self.lateness_ms = {
+            tf: (lateness_by_timeframe_ms or {}).get(tf, allowed_lateness_ms)
+            for tf in self.timeframes
+        }
+        if 0 < correction_horizon_ms < max(self.lateness_ms.values()):
+            raise ValueError("correction_horizon_ms must be >= allowed_lateness_ms")
         self.dedupe_limit = dedupe_limit
         self.prune_batch = prune_batch
+        self.correction_horizon_ms = correction_horizon_ms
+        self.max_published_per_symbol = max_published_per_symbol
+        self.audit_level = audit_level
+        self.audit_sample_every = max(1, audit_sample_every)
+        self.metrics_interval_ms = metrics_interval_ms
+        self.clock_mode = clock_mode
+        self.idle_timeout_ms = idle_timeout_ms
+        # Event-time watermark: newest tick per source, a lazily updated
+        # min-heap of (newest ts, seq, source) over non-idle sources, and the
+        # idle sources left out of it.
+        self._source_max: Dict[SourceKey, int] = {}
+        self._source_heap: List[Tuple[int, int, SourceKey]] = []
+        self._source_seq = 0
+        self._idle_sources: Set[SourceKey] = set()
+        self._max_event_ms: Optional[int] = None
+        self._watermark_ms: Optional[int] = None
+        self._audit_sink = AuditSink(AUDIT_TOPIC, background=audit_background)
+        self._audit_seen: Dict[str, int] = {}
+        self._metrics_due_ms: Optional[int] = None
+        self._pending_metrics: Dict[Tuple[str, int], Dict[str, int]] = {}
         self._time_source = time_source or (lambda: int(time.time() * 1000))
-        self._bars: Dict[Tuple[str, int], Bar] = {}
-        self._published: Dict[Tuple[str, int], Bar] = {}
-        self._dedupe: Dict[str, OrderedDict[str, int]] = {}
+        self._bars: Dict[BarKey, Bar] = {}
+        # (expiry_ms, creation seq, key) for every open bar.
+        self._expiry_heap: List[Tuple[int, int, BarKey]] = []
+        self._bar_seq = 0
+        self._published: Dict[BarKey, Bar] = {}
+        # (evict_at_ms, key) for the time horizon; publish order and the
+        # newest evicted start per (symbol, timeframe) for the count bound.
+        self._retention_heap: List[Tuple[int, BarKey]] = []
+        self._published_order: Dict[Tuple[str, int], Deque[int]] = {}
+        self._evicted_upto: Dict[Tuple[str, int], int] = {}
+        self._deduper = TradeDeduper(
+            dedupe_limit,
+            prune_batch,
+            window_ms=dedupe_window_ms,
+            bloom_capacity=dedupe_bloom_capacity,
+            bloom_bits_per_key=dedupe_bloom_bits_per_key,
+        )
         self._counters: Dict[str, int] = {
             "bars_published": 0,
             "corrections": 0,
             "duplicates": 0,
+            "published_evicted": 0,
+            "late_beyond_horizon": 0,
         }
 
+    def _counter_snapshot(self) -> Dict[str, int]:
+        counters = dict(self._counters)
+        counters.update(self._deduper.counters)
+        return counters
+
     def _now_ms(self) -> int:
         return self._time_source()
 
@@ -89,37 +244,25 @@ class DeterministicAggregator:
         return (ts_ms // self.timeframe_ms) * self.timeframe_ms
 
     def _audit(self, event_type: str, payload: Dict[str, Any]) -> None:
-        now_ms = self._now_ms()
-        publish(
-            AUDIT_TOPIC,
-            {
-                "id": f"audit-{event_type}-{now_ms}",
-                "event_type": event_type,
-                "ts_ms": now_ms,
-                "payload_json": json.dumps(payload, sort_keys=True),
-            },
-        )
+        if self.audit_level == AUDIT_OFF:
+            return
+        if self.audit_level == AUDIT_SAMPLED:
+            seen = self._audit_seen.get(event_type, 0)
+            self._audit_seen[event_type] = seen + 1
+            if seen % self.audit_sample_every:
+                return
+        self._audit_sink.emit(event_type, self._now_ms(), payload)
 
     def _is_duplicate(self, symbol: str, tick: Tick) -> bool:
-        if not tick.trade_id and tick.seq is None:
-            return False
-
-        dedupe_key = (
-            tick.trade_id
-            if tick.trade_id
-            else f"{tick.seq}:{tick.ts_ms}:{tick.price_ticks}:{tick.size}"
+        dedupe_key = trade_key(
+            tick.trade_id, tick.seq, tick.ts_ms, tick.price_ticks, tick.size
         )
-        symbol_seen = self._dedupe.setdefault(symbol, OrderedDict())
+        return dedupe_key is not None and self._seen(symbol, dedupe_key, tick.ts_ms)
 
-        if dedupe_key in symbol_seen:
+    def _seen(self, symbol: str, dedupe_key: int, ts_ms: int) -> bool:
+        if self._deduper.seen(symbol, dedupe_key, ts_ms):
             self._counters["duplicates"] += 1
             return True
-
-        symbol_seen[dedupe_key] = self._now_ms()
-        if len(symbol_seen) > self.dedupe_limit:
-            to_prune = min(self.prune_batch, len(symbol_seen))
-            for _ in range(to_prune):
-                symbol_seen.popitem(last=False)
         return False
 
     def _publish_bar(self, bar: Bar, replaced: bool = False) -> None:
@@ -136,6 +279,19 @@ class DeterministicAggregator:
             self._counters["bars_published"] += 1
 
     def _emit_metrics(self, symbol: str, bar: Bar) -> None:
+        if self.metrics_interval_ms:
+            pending = self._pending_metrics.get((symbol, bar.timeframe_ms))
+            if pending is None:
+                pending = self._pending_metrics[(symbol, bar.timeframe_ms)] = {
+                    "bars": 0,
+                    "trade_count": 0,
+                    "volume": 0,
+                }
+            pending["timeframe_start_ms"] = bar.timeframe_start_ms
+            pending["bars"] += 1
+            pending["trade_count"] += bar.trade_count
+            pending["volume"] += bar.volume
+            return
         payload = {
             "symbol": symbol,
             "timeframe_start_ms": bar.timeframe_start_ms,
@@ -143,50 +299,167 @@ class DeterministicAggregator:
             "trade_count": bar.trade_count,
             "volume": bar.volume,
             "emitted_ts_ms": self._now_ms(),
-            "counters": dict(self._counters),
+            "counters": self._counter_snapshot(),
         }
         publish(METRICS_TOPIC, payload)
         self._audit("ohlcv_metrics", payload)
 
-    def _recompute_bar_from_new_tick(
-        self, published_bar: Bar, tick: Tick
-    ) -> Optional[Bar]:
-        new_bar = Bar(**published_bar.to_dict())
-        changed = False
-
-        if tick.price_ticks > new_bar.high:
-            new_bar.high = tick.price_ticks
-            changed = True
-        if tick.price_ticks < new_bar.low:
-            new_bar.low = tick.price_ticks
-            changed = True
-
-        new_bar.volume += tick.size
-        new_bar.trade_count += 1
-        if (
-            new_bar.volume != published_bar.volume
-            or new_bar.trade_count != published_bar.trade_count
-        ):
-            changed = True
-
-        if not changed:
-            return None
-
-        new_bar.version = published_bar.version + 1
-        return new_bar
+    def _recompute_bar_from_new_tick(self, published_bar: Bar, tick: Tick) -> Bar:
+        """Fold a late tick into `published_bar` in place.
+
+        Every tick adds to trade_count, so the bar always changes and is
+        returned with a new version (the same object, no copy is made).
+        """
+        if tick.price_ticks > published_bar.high:
+            published_bar.high = tick.price_ticks
+        if tick.price_ticks < published_bar.low:
+            published_bar.low = tick.price_ticks
+        published_bar.volume += tick.size
+        published_bar.trade_count += 1
+        published_bar.version += 1
+        return published_bar
+
+    def _flush_metrics(self) -> None:
+        for (symbol, tf), pending in self._pending_metrics.items():
+            payload = {
+                "symbol": symbol,
+                "timeframe_start_ms": pending["timeframe_start_ms"],
+                "timeframe_ms": tf,
+                "trade_count": pending["trade_count"],
+                "volume": pending["volume"],
+                "bars": pending["bars"],
+                "interval_ms": self.metrics_interval_ms,
+                "emitted_ts_ms": self._now_ms(),
+                "counters": self._counter_snapshot(),
+            }
+            publish(METRICS_TOPIC, payload)
+            self._audit("ohlcv_metrics", payload)
+        self._pending_metrics.clear()
+
+    def _metrics_tick(self, now_ms: int) -> None:
+        interval = self.metrics_interval_ms
+        if self._metrics_due_ms is not None and now_ms >= self._metrics_due_ms:
+            self._flush_metrics()
+            self._metrics_due_ms = None
+        if self._metrics_due_ms is None:
+            self._metrics_due_ms = (now_ms // interval + 1) * interval
+
+    def _record_published(self, key: BarKey, bar: Bar) -> None:
+        self._published[key] = bar
+        if self.correction_horizon_ms:
+            evict_at = bar.timeframe_start_ms + bar.timeframe_ms
+            evict_at += self.correction_horizon_ms
+            heapq.heappush(self._retention_heap, (evict_at, key))
+        if self.max_published_per_symbol:
+            symbol, tf, start = key
+            order = self._published_order.setdefault((symbol, tf), deque())
+            order.append(start)
+            while len(order) > self.max_published_per_symbol:
+                self._evict_published((symbol, tf, order.popleft()))
+
+    def _evict_published(self, key: BarKey) -> None:
+        if self._published.pop(key, None) is None:
+            return
+        self._counters["published_evicted"] += 1
+        series, start = key[:2], key[2]
+        upto = self._evicted_upto.get(series)
+        if upto is None or start > upto:
+            self._evicted_upto[series] = start
+
+    def _evict_beyond_horizon(self, now_ms: int) -> None:
+        heap = self._retention_heap
+        while heap and heap[0][0] <= now_ms:
+            self._evict_published(heapq.heappop(heap)[1])
+
+    def _beyond_horizon(self, key: BarKey, now_ms: int) -> bool:
+        if key in self._published or key in self._bars:
+            return False
+        symbol, tf, start = key
+        if self.correction_horizon_ms:
+            if start + tf + self.correction_horizon_ms <= now_ms:
+                return True
+        evicted_upto = self._evicted_upto.get((symbol, tf))
+        return evicted_upto is not None and start <= evicted_upto
+
+    def _dead_letter(self, key: BarKey, tick_payload: Dict[str, Any]) -> None:
+        self._counters["late_beyond_horizon"] += 1
+        publish(
+            OHLCV_DEAD_LETTER_TOPIC,
+            {
+                "symbol": key[0],
+                "reason": "beyond_correction_horizon",
+                "timeframe_ms": key[1],
+                "timeframe_start_ms": key[2],
+                "tick": tick_payload,
+                "emitted_ts_ms": self._now_ms(),
+            },
+        )
 
     def _finalize_expired(self, now_ms: int) -> None:
-        expirables = []
-        for key, bar in self._bars.items():
-            bar_end_ms = bar.timeframe_start_ms + bar.timeframe_ms
-            if now_ms >= bar_end_ms + self.allowed_lateness_ms:
-                expirables.append((key, bar))
-
-        for key, bar in sorted(expirables, key=lambda x: x[0][1]):
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now_ms:
+            _, _, key = heapq.heappop(heap)
+            bar = self._bars.get(key)
+            if bar is None:
+                continue
             self._publish_bar(bar, replaced=False)
-            self._published[key] = bar
+            self._record_published(key, bar)
             self._bars.pop(key, None)
             self._emit_metrics(bar.symbol, bar)
+        if self.correction_horizon_ms:
+            self._evict_beyond_horizon(now_ms)
+        if self.metrics_interval_ms:
+            self._metrics_tick(now_ms)
+
+    def _observe_event_time(self, symbol: str, venue: Any, ts_ms: int) -> int:
+        """Account for a tick and return the (monotonic) event-time watermark."""
+        source = (symbol, venue)
+        heap = self._source_heap
+        newest = self._source_max.get(source)
+        if self._max_event_ms is None or ts_ms > self._max_event_ms:
+            self._max_event_ms = ts_ms
+        threshold = self._max_event_ms - self.idle_timeout_ms
+        if newest is None or ts_ms > newest:
+            self._source_max[source] = ts_ms
+            if newest is None or (
+                source in self._idle_sources
+                and (not self.idle_timeout_ms or ts_ms >= threshold)
+            ):
+                self._idle_sources.discard(source)
+                heapq.heappush(heap, (ts_ms, self._source_seq, source))
+                self._source_seq += 1
+        while heap:
+            entry_ms, _, top = heap[0]
+            current = self._source_max[top]
+            if self.idle_timeout_ms and current < threshold:
+                heapq.heappop(heap)
+                self._idle_sources.add(top)
+            elif entry_ms != current:
+                heapq.heapreplace(heap, (current, self._source_seq, top))
+                self._source_seq += 1
+            else:
+                break
+        watermark = heap[0][0] if heap else self._max_event_ms
+        if self._watermark_ms is None or watermark > self._watermark_ms:
+            self._watermark_ms = watermark
+        return self._watermark_ms
+
+    @property
+    def watermark_ms(self) -> Optional[int]:
+        """Event-time watermark (`clock_mode="event"`); None before any tick."""
+        return self._watermark_ms
+
+    def advance(self, now_ms: Optional[int] = None) -> None:
+        """Finalize bars that have expired by `now_ms` without a new tick.
+
+        In event mode only ticks move the clock: bars are finalized up to
+        the watermark and `now_ms` is ignored.
+        """
+        if self.clock_mode == CLOCK_EVENT:
+            if self._watermark_ms is not None:
+                self._finalize_expired(self._watermark_ms)
+            return
+        self._finalize_expired(self._now_ms() if now_ms is None else now_ms)
 
     def handle_tick(
         self, symbol: str, tick_payload: Dict[str, Any], now_ms: Optional[int] = None
@@ -197,28 +470,53 @@ class DeterministicAggregator:
             size=int(tick_payload.get("size", 1)),
             trade_id=tick_payload.get("trade_id"),
             seq=tick_payload.get("seq"),
-            raw=tick_payload,
         )
 
         if self._is_duplicate(symbol, tick):
             self._audit("tick_duplicate", tick_payload)
             return
 
-        timeframe_start = self._floor_start(tick.ts_ms)
-        key = (symbol, timeframe_start)
+        if self.clock_mode == CLOCK_EVENT:
+            now_ms = self._observe_event_time(
+                symbol, tick_payload.get("venue"), tick.ts_ms
+            )
+        elif now_ms is None:
+            now_ms = self._now_ms()
+        opened = False
+        for tf in self.timeframes:
+            opened |= self._apply_tick(symbol, tf, tick, tick_payload, now_ms)
+        if opened:
+            self._finalize_expired(now_ms)
+
+    def _apply_tick(
+        self,
+        symbol: str,
+        tf: int,
+        tick: Tick,
+        tick_payload: Dict[str, Any],
+        now_ms: int,
+    ) -> bool:
+        """Apply `tick` to its `tf` bar; False if it only hit published bars.
+
+        Corrections and dead letters do not advance finalization.
+        """
+        timeframe_start = (tick.ts_ms // tf) * tf
+        key = (symbol, tf, timeframe_start)
+
+        if self._beyond_horizon(key, now_ms):
+            self._dead_letter(key, tick_payload)
+            return False
 
         if key in self._published:
-            replacement = self._recompute_bar_from_new_tick(self._published[key], tick)
-            if replacement is not None:
-                self._published[key] = replacement
-                self._publish_bar(replacement, replaced=True)
-            return
+            corrected = self._recompute_bar_from_new_tick(self._published[key], tick)
+            self._publish_bar(corrected, replaced=True)
+            return False
 
         bar = self._bars.get(key)
         if bar is None:
             bar = Bar(
                 symbol=symbol,
-                timeframe_ms=self.timeframe_ms,
+                timeframe_ms=tf,
                 timeframe_start_ms=timeframe_start,
                 open=tick.price_ticks,
                 high=tick.price_ticks,
@@ -228,18 +526,310 @@ class DeterministicAggregator:
                 trade_count=1,
             )
             self._bars[key] = bar
+            expiry_ms = timeframe_start + tf + self.lateness_ms[tf]
+            heapq.heappush(self._expiry_heap, (expiry_ms, self._bar_seq, key))
+            self._bar_seq += 1
         else:
             bar.high = max(bar.high, tick.price_ticks)
             bar.low = min(bar.low, tick.price_ticks)
             bar.close = tick.price_ticks
             bar.volume += tick.size
             bar.trade_count += 1
+        return True
+
+    def handle_ticks(
+        self,
+        symbol: str,
+        ticks: Sequence[Dict[str, Any]],
+        now_ms: BatchClock = None,
+    ) -> None:
+        """Feed a batch of tick payloads for one symbol.
+
+        Output is identical to calling `handle_tick` on each payload in order
+        with the same clock: `now_ms` is one value for the whole batch (read
+        once from `time_source` when None) or one value per tick.
+        """
+        ticks = list(ticks)
+        self._handle_columns(
+            symbol,
+            [int(t["ts_ms"]) for t in ticks],
+            [int(t["price_ticks"]) for t in ticks],
+            [int(t.get("size", 1)) for t in ticks],
+            [t.get("trade_id") for t in ticks],
+            [t.get("seq") for t in ticks],
+            ticks,
+            now_ms,
+        )
+
+    def handle_tick_arrays(
+        self,
+        symbol: str,
+        ts_ms: Sequence[int],
+        price_ticks: Sequence[int],
+        size: Optional[Sequence[int]] = None,
+        trade_id: Optional[Sequence[Optional[str]]] = None,
+        seq: Optional[Sequence[Optional[int]]] = None,
+        now_ms: BatchClock = None,
+    ) -> None:
+        """Columnar `handle_ticks`; columns may be lists or NumPy arrays.
+
+        Equivalent to per-tick payloads holding `ts_ms`, `price_ticks`,
+        `size` and, when not None, `trade_id` / `seq`.
+        """
+        ts = [int(v) for v in _as_list(ts_ms)]
+        n = len(ts)
+        self._handle_columns(
+            symbol,
+            ts,
+            [int(v) for v in _as_list(price_ticks)],
+            [int(v) for v in _as_list(size)] if size is not None else [1] * n,
+            _as_list(trade_id) if trade_id is not None else [None] * n,
+            _as_list(seq) if seq is not None else [None] * n,
+            None,
+            now_ms,
+        )
 
-        self._finalize_expired(now_ms if now_ms is not None else self._now_ms())
+    def _deadline_ms(self) -> Optional[int]:
+        """Earliest clock value at which `_finalize_expired` has work to do."""
+        deadline = self._expiry_heap[0][0] if self._expiry_heap else None
+        if self.correction_horizon_ms and self._retention_heap:
+            evict_at = self._retention_heap[0][0]
+            if deadline is None or evict_at < deadline:
+                deadline = evict_at
+        due = self._metrics_due_ms
+        if self.metrics_interval_ms and due is not None:
+            if deadline is None or due < deadline:
+                deadline = due
+        return deadline
+
+    def _handle_columns(
+        self,
+        symbol: str,
+        ts: List[int],
+        price: List[int],
+        size: List[int],
+        trade_id: List[Optional[str]],
+        seq: List[Optional[int]],
+        payloads: Optional[List[Dict[str, Any]]],
+        now_ms: BatchClock,
+    ) -> None:
+        # Runs of ticks that hit the same open bars before the next expiry
+        # are folded in one step; everything else takes the per-tick path.
+        n = len(ts)
+        if self.clock_mode == CLOCK_EVENT:
+            # The watermark moves with every tick: no runs to fold.
+            for k in range(n):
+                if payloads is not None:
+                    self.handle_tick(symbol, payloads[k])
+                    continue
+                out: Dict[str, Any] = {"ts_ms": ts[k], "price_ticks": price[k]}
+                out["size"] = size[k]
+                if trade_id[k] is not None:
+                    out["trade_id"] = trade_id[k]
+                if seq[k] is not None:
+                    out["seq"] = seq[k]
+                self.handle_tick(symbol, out)
+            return
+        if now_ms is None or isinstance(now_ms, int):
+            batch_now = self._now_ms() if now_ms is None else now_ms
+            clocks = [batch_now] * n
+        else:
+            clocks = [int(v) for v in _as_list(now_ms)]
+        starts = [_bar_starts(ts, tf) for tf in self.timeframes]
+
+        def payload(k: int) -> Dict[str, Any]:
+            if payloads is not None:
+                return payloads[k]
+            out: Dict[str, Any] = {"ts_ms": ts[k], "price_ticks": price[k]}
+            out["size"] = size[k]
+            if trade_id[k] is not None:
+                out["trade_id"] = trade_id[k]
+            if seq[k] is not None:
+                out["seq"] = seq[k]
+            return out
+
+        def duplicate(k: int) -> bool:
+            key = trade_key(trade_id[k], seq[k], ts[k], price[k], size[k])
+            return key is not None and self._seen(symbol, key, ts[k])
+
+        i = 0
+        while i < n:
+            if duplicate(i):
+                self._audit("tick_duplicate", payload(i))
+                i += 1
+                continue
+            now = clocks[i]
+            deadline = self._deadline_ms()
+            bars = [
+                self._bars.get((symbol, tf, col[i]))
+                for tf, col in zip(self.timeframes, starts)
+            ]
+            if None in bars or (deadline is not None and now >= deadline):
+                tick = Tick(
+                    ts_ms=ts[i],
+                    price_ticks=price[i],
+                    size=size[i],
+                    trade_id=trade_id[i],
+                    seq=seq[i],
+                )
+                raw = payload(i)
+                opened = False
+                for tf in self.timeframes:
+                    opened |= self._apply_tick(symbol, tf, tick, raw, now)
+                if opened:
+                    self._finalize_expired(now)
+                i += 1
+                continue
+
+            j = i + 1
+            dup = False
+            while j < n:
+                if any(col[j] != col[i] for col in starts):
+                    break
+                if deadline is not None and clocks[j] >= deadline:
+                    break
+                if duplicate(j):
+                    dup = True
+                    break
+                j += 1
+            high = max(price[i:j])
+            low = min(price[i:j])
+            volume = sum(size[i:j])
+            # Every bar is open here; `None in bars` took the slow path above.
+            for bar in cast(List[Bar], bars):
+                if high > bar.high:
+                    bar.high = high
+                if low < bar.low:
+                    bar.low = low
+                bar.close = price[j - 1]
+                bar.volume += volume
+                bar.trade_count += j - i
+            if dup:
+                self._audit("tick_duplicate", payload(j))
+                j += 1
+            i = j
 
     def flush(self) -> None:
-        for key, bar in sorted(self._bars.items(), key=lambda x: x[0][1]):
+        for key, bar in sorted(self._bars.items(), key=lambda x: x[0][2]):
             self._publish_bar(bar, replaced=False)
-            self._published[key] = bar
+            self._record_published(key, bar)
             self._emit_metrics(bar.symbol, bar)
         self._bars.clear()
+        self._expiry_heap.clear()
+        if self.metrics_interval_ms:
+            self._flush_metrics()
+        self._audit_sink.flush()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable copy of the aggregator state.
+
+        Covers open and retained published bars, their expiry/retention
+        order, dedupe windows, counters and pending interval metrics; the
+        configuration is recorded so `restore` can reject a mismatch.
+        Queued background audit records are flushed first.
+        """
+        self._audit_sink.flush()
+        return {
+            "version": SNAPSHOT_VERSION,
+            "config": self._snapshot_config(),
+            "bars": [_bar_row(bar) for bar in self._bars.values()],
+            "expiry_heap": [[e, seq, *key] for e, seq, key in self._expiry_heap],
+            "bar_seq": self._bar_seq,
+            "published": [_bar_row(bar) for bar in self._published.values()],
+            "retention_heap": [[e, *key] for e, key in self._retention_heap],
+            "published_order": [
+                [symbol, tf, list(starts)]
+                for (symbol, tf), starts in self._published_order.items()
+            ],
+            "evicted_upto": [
+                [symbol, tf, start]
+                for (symbol, tf), start in self._evicted_upto.items()
+            ],
+            "dedupe": self._deduper.snapshot(),
+            "counters": dict(self._counters),
+            "audit_seen": dict(self._audit_seen),
+            "metrics_due_ms": self._metrics_due_ms,
+            "pending_metrics": [
+                [symbol, tf, dict(pending)]
+                for (symbol, tf), pending in self._pending_metrics.items()
+            ],
+            "sources": [
+                [symbol, venue, ts_ms, (symbol, venue) in self._idle_sources]
+                for (symbol, venue), ts_ms in self._source_max.items()
+            ],
+            "max_event_ms": self._max_event_ms,
+            "watermark_ms": self._watermark_ms,
+        }
+
+    def _snapshot_config(self) -> Dict[str, Any]:
+        return {
+            "timeframes": self.timeframes,
+            "lateness_ms": [[tf, self.lateness_ms[tf]] for tf in self.timeframes],
+            "correction_horizon_ms": self.correction_horizon_ms,
+            "max_published_per_symbol": self.max_published_per_symbol,
+            "dedupe_window_ms": self._deduper.window_ms,
+            "dedupe_bloom": self._deduper.bloom is not None,
+            "metrics_interval_ms": self.metrics_interval_ms,
+            "clock_mode": self.clock_mode,
+            "idle_timeout_ms": self.idle_timeout_ms,
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Replace the state with a `snapshot()` of this aggregator's configuration.
+
+        Raises ValueError if the snapshot was taken with a different one.
+        """
+        if state.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot version: {state.get('version')}")
+        if state["config"] != self._snapshot_config():
+            raise ValueError("snapshot was taken with a different configuration")
+        self._deduper.restore(state["dedupe"])
+        self._bars = {}
+        for row in state["bars"]:
+            bar = Bar(*row)
+            self._bars[(bar.symbol, bar.timeframe_ms, bar.timeframe_start_ms)] = bar
+        self._expiry_heap = [
+            (e, seq, (s, tf, t)) for e, seq, s, tf, t in state["expiry_heap"]
+        ]
+        self._bar_seq = state["bar_seq"]
+        self._published = {}
+        for row in state["published"]:
+            bar = Bar(*row)
+            self._published[
+                (bar.symbol, bar.timeframe_ms, bar.timeframe_start_ms)
+            ] = bar
+        self._retention_heap = [
+            (e, (s, tf, t)) for e, s, tf, t in state["retention_heap"]
+        ]
+        self._published_order = {
+            (symbol, tf): deque(starts)
+            for symbol, tf, starts in state["published_order"]
+        }
+        self._evicted_upto = {
+            (symbol, tf): start for symbol, tf, start in state["evicted_upto"]
+        }
+        self._counters = dict(state["counters"])
+        self._audit_seen = dict(state["audit_seen"])
+        self._metrics_due_ms = state["metrics_due_ms"]
+        self._pending_metrics = {
+            (symbol, tf): dict(pending)
+            for symbol, tf, pending in state["pending_metrics"]
+        }
+        self._source_max = {}
+        self._idle_sources = set()
+        self._source_heap = []
+        for seq, (symbol, venue, ts_ms, idle) in enumerate(state["sources"]):
+            self._source_max[(symbol, venue)] = ts_ms
+            if idle:
+                self._idle_sources.add((symbol, venue))
+            else:
+                self._source_heap.append((ts_ms, seq, (symbol, venue)))
+        heapq.heapify(self._source_heap)
+        self._source_seq = len(state["sources"])
+        self._max_event_ms = state["max_event_ms"]
+        self._watermark_ms = state["watermark_ms"]
+
+    def close(self) -> None:
+        """Flush, then stop the background audit thread if one is running."""
+        self.flush()
+        self._audit_sink.close()
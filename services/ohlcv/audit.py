@@ -0,0 +1,103 @@
+"""Audit record sink for the OHLCV aggregator."""
+from __future__ import annotations
+
+import atexit
+import contextvars
+import json
+import queue
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from services.event_store.simple_bus import publish
+
+AUDIT_TOPIC = "audit.records.v1"
+
+AUDIT_OFF = "off"
+AUDIT_SAMPLED = "sampled"
+AUDIT_FULL = "full"
+AUDIT_LEVELS = (AUDIT_OFF, AUDIT_SAMPLED, AUDIT_FULL)
+
+_STOP = object()
+
+
+class AuditSink:
+    """Serializes audit payloads and publishes them to `AUDIT_TOPIC`.
+
+    Inline by default. With `background=True` records are queued (bounded by
+    `max_queue`, blocking when full) and serialized/published by a daemon
+    thread in the caller's event-store context, in emission order; `flush()`
+    waits for the queue to drain. Payloads are copied (shallowly) on emit.
+    """
+
+    def __init__(
+        self, topic: str = AUDIT_TOPIC, background: bool = False, max_queue: int = 0
+    ):
+        self.topic = topic
+        self.background = background
+        self.max_queue = max_queue
+        self._queue: Optional["queue.Queue[Any]"] = None
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+    def _write(self, event_type: str, ts_ms: int, payload: Dict[str, Any]) -> None:
+        publish(
+            self.topic,
+            {
+                "id": f"audit-{event_type}-{ts_ms}",
+                "event_type": event_type,
+                "ts_ms": ts_ms,
+                "payload_json": json.dumps(payload, sort_keys=True),
+            },
+        )
+
+    def _start(self) -> "queue.Queue[Any]":
+        if self._queue is None:
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            ctx = contextvars.copy_context()
+            self._thread = threading.Thread(
+                target=ctx.run, args=(self._run,), name="ohlcv-audit", daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.close)
+        return self._queue
+
+    def _run(self) -> None:
+        q = self._queue
+        assert q is not None
+        while True:
+            item = q.get()
+            try:
+                if item is _STOP:
+                    return
+                self._write(*item)
+            except BaseException as exc:  # surfaced on the next emit/flush
+                self._error = exc
+            finally:
+                q.task_done()
+
+    def _raise_pending_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def emit(self, event_type: str, ts_ms: int, payload: Dict[str, Any]) -> None:
+        if not self.background:
+            self._write(event_type, ts_ms, payload)
+            return
+        self._raise_pending_error()
+        item: Tuple[str, int, Dict[str, Any]] = (event_type, ts_ms, dict(payload))
+        self._start().put(item)
+
+    def flush(self) -> None:
+        if self._queue is not None:
+            self._queue.join()
+        self._raise_pending_error()
+
+    def close(self) -> None:
+        self.flush()
+        if self._queue is not None and self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            atexit.unregister(self.close)
+        self._queue = None
+        self._thread = None
@@ -0,0 +1,66 @@
+"""Memory footprint of aggregator state: bytes per open and per published bar.
+
+python -m services.ohlcv.bench_memory --symbols 2000 --bars 20
+"""
+from __future__ import annotations
+
+import gc
+import tempfile
+import tracemalloc
+from typing import Dict
+
+from services.event_store import simple_bus
+from services.event_store.store import EventStore
+from services.ohlcv.aggregator import DeterministicAggregator
+
+
+def _ticks_for(agg: DeterministicAggregator, symbols: int, start_ms: int) -> None:
+    for s in range(symbols):
+        agg.handle_tick(
+            f"S{s:05d}",
+            {"ts_ms": start_ms, "price_ticks": 1000 + s, "size": 1},
+            now_ms=start_ms,
+        )
+
+
+def measure(symbols: int = 2000, bars: int = 20) -> Dict[str, float]:
+    """Average traced bytes per open bar and per retained published bar."""
+    base = 1_700_000_000_000
+    with tempfile.TemporaryDirectory() as root:
+        store = EventStore(root, persist="none")
+        with simple_bus.use_store(store):
+            agg = DeterministicAggregator(
+                timeframe_ms=1000, allowed_lateness_ms=10**12, time_source=lambda: 0
+            )
+            # Warm up dict/heap growth so it is not attributed to the bars.
+            _ticks_for(agg, symbols, base - 1000)
+            agg.flush()
+
+            gc.collect()
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            for b in range(bars):
+                _ticks_for(agg, symbols, base + b * 1000)
+            gc.collect()
+            open_bytes = tracemalloc.get_traced_memory()[0] - before
+            agg.flush()
+            gc.collect()
+            published_bytes = tracemalloc.get_traced_memory()[0] - before
+            tracemalloc.stop()
+        store.close()
+    count = symbols * bars
+    return {
+        "bytes_per_open_bar": open_bytes / count,
+        "bytes_per_published_bar": published_bytes / count,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--bars", type=int, default=20)
+    args = parser.parse_args()
+    for name, value in measure(args.symbols, args.bars).items():
+        print(f"{name}: {value:.0f}")
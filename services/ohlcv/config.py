@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence
+
+from services.ohlcv.aggregator import CLOCK_MODES, CLOCK_PROCESSING
+from services.ohlcv.audit import AUDIT_FULL, AUDIT_LEVELS
 
 
 def _int_env(name: str, default: int) -> int:
@@ -14,13 +17,60 @@ def _int_env(name: str, default: int) -> int:
         return default
 
 
+def _int_list_env(name: str) -> Optional[List[int]]:
+    """Comma-separated ints, e.g. "1000,60000"; None when unset or invalid."""
+    value = os.getenv(name)
+    if not value:
+        return None
+    try:
+        return [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        return None
+
+
+def _int_map_env(name: str) -> Optional[Dict[int, int]]:
+    """Comma-separated key:value ints, e.g. "60000:1000,3600000:5000"."""
+    value = os.getenv(name)
+    if not value:
+        return None
+    try:
+        pairs = [part.split(":", 1) for part in value.split(",") if part.strip()]
+        return {int(k): int(v) for k, v in pairs}
+    except ValueError:
+        return None
+
+
+def _str_env(name: str, default: str, choices: Sequence[str]) -> str:
+    value = os.getenv(name, default)
+    return value if value in choices else default
+
+
 class AggregatorConfig:
-    """Environment-driven runtime knobs for DeterministicAggregator."""
+    """Environment-driven runtime knobs for DeterministicAggregator.
+
+    `shards` / `shard_batch_size` configure `ShardedAggregator` and are not
+    part of `as_kwargs()`.
+    """
 
     timeframe_ms: int
     allowed_lateness_ms: int
     dedupe_limit: int
     prune_batch: int
+    correction_horizon_ms: int
+    max_published_per_symbol: int
+    timeframes: Optional[List[int]]
+    lateness_by_timeframe_ms: Optional[Dict[int, int]]
+    audit_level: str
+    audit_sample_every: int
+    audit_background: bool
+    metrics_interval_ms: int
+    dedupe_window_ms: int
+    dedupe_bloom_capacity: int
+    dedupe_bloom_bits_per_key: int
+    clock_mode: str
+    idle_timeout_ms: int
+    shards: int
+    shard_batch_size: int
 
     def __init__(self, prefix: Optional[str] = None):
         p = (prefix + "_") if prefix else ""
@@ -28,6 +78,25 @@ class AggregatorConfig:
         self.allowed_lateness_ms = _int_env(p + "OHLC_ALLOWED_LATENESS_MS", 1_000)
         self.dedupe_limit = _int_env(p + "OHLC_DEDUPE_LIMIT", 10_000)
         self.prune_batch = _int_env(p + "OHLC_PRUNE_BATCH", 1_000)
+        self.correction_horizon_ms = _int_env(p + "OHLC_CORRECTION_HORIZON_MS", 0)
+        self.max_published_per_symbol = _int_env(p + "OHLC_MAX_PUBLISHED_PER_SYMBOL", 0)
+        self.timeframes = _int_list_env(p + "OHLC_TIMEFRAMES_MS")
+        self.lateness_by_timeframe_ms = _int_map_env(
+            p + "OHLC_LATENESS_BY_TIMEFRAME_MS"
+        )
+        self.audit_level = _str_env(p + "OHLC_AUDIT_LEVEL", AUDIT_FULL, AUDIT_LEVELS)
+        self.audit_sample_every = _int_env(p + "OHLC_AUDIT_SAMPLE_EVERY", 100)
+        self.audit_background = _int_env(p + "OHLC_AUDIT_BACKGROUND", 0) == 1
+        self.metrics_interval_ms = _int_env(p + "OHLC_METRICS_INTERVAL_MS", 0)
+        self.dedupe_window_ms = _int_env(p + "OHLC_DEDUPE_WINDOW_MS", 0)
+        self.dedupe_bloom_capacity = _int_env(p + "OHLC_DEDUPE_BLOOM_CAPACITY", 0)
+        self.dedupe_bloom_bits_per_key = _int_env(
+            p + "OHLC_DEDUPE_BLOOM_BITS_PER_KEY", 10
+        )
+        self.clock_mode = _str_env(p + "OHLC_CLOCK_MODE", CLOCK_PROCESSING, CLOCK_MODES)
+        self.idle_timeout_ms = _int_env(p + "OHLC_IDLE_TIMEOUT_MS", 60_000)
+        self.shards = _int_env(p + "OHLC_SHARDS", 1)
+        self.shard_batch_size = _int_env(p + "OHLC_SHARD_BATCH_SIZE", 1024)
 
     def as_kwargs(self) -> Dict[str, Any]:
         return {
@@ -35,4 +104,17 @@ class AggregatorConfig:
             "allowed_lateness_ms": self.allowed_lateness_ms,
             "dedupe_limit": self.dedupe_limit,
             "prune_batch": self.prune_batch,
+            "correction_horizon_ms": self.correction_horizon_ms,
+            "max_published_per_symbol": self.max_published_per_symbol,
+            "timeframes": self.timeframes,
+            "lateness_by_timeframe_ms": self.lateness_by_timeframe_ms,
+            "audit_level": self.audit_level,
+            "audit_sample_every": self.audit_sample_every,
+            "audit_background": self.audit_background,
+            "metrics_interval_ms": self.metrics_interval_ms,
+            "dedupe_window_ms": self.dedupe_window_ms,
+            "dedupe_bloom_capacity": self.dedupe_bloom_capacity,
+            "dedupe_bloom_bits_per_key": self.dedupe_bloom_bits_per_key,
+            "clock_mode": self.clock_mode,
+            "idle_timeout_ms": self.idle_timeout_ms,
         }
@@ -0,0 +1,244 @@
+"""Trade de-duplication for the OHLCV aggregator.
+
+Keys are 64-bit integers: a stable hash of the trade id, or of
+(seq, ts_ms, price_ticks, size) for feeds without ids. Each symbol keeps an
+exact set of the keys it saw within `window_ms` of its newest event time
+(and at most `limit` keys). An optional rotating Bloom filter remembers keys
+beyond that window, so replayed duplicates older than the exact window are
+still caught, at a bounded false-positive rate.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import math
+from array import array
+from itertools import islice
+from typing import Any, Dict, Optional, Tuple
+
+_MASK64 = (1 << 64) - 1
+
+
+def hash_text(text: str) -> int:
+    """Stable (process-independent) 64-bit hash of `text`."""
+    digest = hashlib.blake2b(text.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def trade_key(
+    trade_id: Any, seq: Any, ts_ms: int, price: int, size: int
+) -> Optional[int]:
+    """Integer dedupe key of a tick; None when it cannot be deduplicated.
+
+    Numeric and string forms of the same trade id, or of an integer seq,
+    give the same key. Any other seq is keyed by its text.
+    """
+    if trade_id:
+        return hash_text(str(trade_id))
+    if seq is None:
+        return None
+    if type(seq) is int or (isinstance(seq, str) and seq.isdecimal()):
+        seq_key = int(seq)
+    else:
+        seq_key = hash_text(str(seq))
+    # Hashes of int tuples are not randomized per process; str ones are.
+    return hash((seq_key, int(ts_ms), int(price), int(size))) & _MASK64
+
+
+class BloomFilter:
+    """Blocked, two-generation Bloom filter over 64-bit keys.
+
+    A key sets `num_hashes` bits of a single 64-bit word, so a lookup is one
+    array read. Each generation holds up to `capacity` keys; when the
+    current one is full the older one is dropped, so memory stays bounded
+    and the newest `capacity` .. `2 * capacity` keys are remembered.
+    """
+
+    def __init__(self, capacity: int, bits_per_key: int = 10):
+        self.capacity = max(1, capacity)
+        self.num_words = max(1, -(-self.capacity * max(1, bits_per_key) // 64))
+        self.num_hashes = min(10, max(1, round(bits_per_key * math.log(2))))
+        self._shifts = tuple(6 * i for i in range(self.num_hashes))
+        self._current = array("Q", bytes(8 * self.num_words))
+        self._previous: Optional["array[int]"] = None
+        self._count = 0
+
+    def _slot(self, key: int) -> Tuple[int, int]:
+        mask = 0
+        for shift in self._shifts:
+            mask |= 1 << (key >> shift & 63)
+        return (key >> 60 ^ key >> 32) % self.num_words, mask
+
+    def __contains__(self, key: int) -> bool:
+        index, mask = self._slot(key)
+        if self._current[index] & mask == mask:
+            return True
+        return self._previous is not None and self._previous[index] & mask == mask
+
+    def add(self, key: int) -> bool:
+        """Insert `key`; returns whether it was (probably) present already."""
+        index, mask = self._slot(key)
+        current = self._current
+        word = current[index]
+        if word & mask == mask:
+            return True
+        previous = self._previous
+        if previous is not None and previous[index] & mask == mask:
+            return True
+        if self._count >= self.capacity:
+            self._previous = current
+            current = self._current = array("Q", bytes(8 * self.num_words))
+            self._count = 0
+            word = 0
+        current[index] = word | mask
+        self._count += 1
+        return False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self._count,
+            "current": base64.b64encode(self._current.tobytes()).decode(),
+            "previous": (
+                None
+                if self._previous is None
+                else base64.b64encode(self._previous.tobytes()).decode()
+            ),
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        current = array("Q", base64.b64decode(state["current"]))
+        if len(current) != self.num_words:
+            raise ValueError("Bloom filter snapshot has a different size")
+        self._current = current
+        self._previous = (
+            None
+            if state["previous"] is None
+            else array("Q", base64.b64decode(state["previous"]))
+        )
+        self._count = state["count"]
+
+    def nbytes(self) -> int:
+        words = self.num_words * (1 if self._previous is None else 2)
+        return 8 * words
+
+
+class TradeDeduper:
+    """Hybrid exact + probabilistic duplicate detection per symbol.
+
+    `seen(symbol, key, ts_ms)` returns True for a duplicate and records the
+    key otherwise. A key is a duplicate when it is in the symbol's exact set,
+    or when the tick is not newer than the keys already pruned from that set
+    and the Bloom filter reports it. Other Bloom hits are settled by the
+    exact set; all are counted in `counters` ("dedupe_bloom_checks",
+    "dedupe_bloom_false_positives", "dedupe_bloom_duplicates") so the
+    observed false-positive rate can be monitored.
+
+    `window_ms` = 0 keeps keys until `limit` is reached (oldest first, in
+    batches of `prune_batch`); `bloom_capacity` = 0 disables the filter.
+    """
+
+    def __init__(
+        self,
+        limit: int = 10_000,
+        prune_batch: int = 1_000,
+        window_ms: int = 0,
+        bloom_capacity: int = 0,
+        bloom_bits_per_key: int = 10,
+    ):
+        self.limit = limit
+        self.prune_batch = max(1, prune_batch)
+        self.window_ms = window_ms
+        self.bloom = (
+            BloomFilter(bloom_capacity, bloom_bits_per_key) if bloom_capacity else None
+        )
+        # symbol -> {key: event ts}, in insertion order.
+        self.windows: Dict[str, Dict[int, int]] = {}
+        # Newest event time per symbol, the event time at which its window
+        # is next pruned, and the newest event time of a key that left the
+        # exact set (older ticks are only covered by the filter).
+        self._watermark: Dict[str, int] = {}
+        self._next_prune: Dict[str, int] = {}
+        self._pruned_upto: Dict[str, int] = {}
+        self._symbol_salt: Dict[str, int] = {}
+        self.counters: Dict[str, int] = {
+            "dedupe_bloom_checks": 0,
+            "dedupe_bloom_false_positives": 0,
+            "dedupe_bloom_duplicates": 0,
+        }
+
+    def seen(self, symbol: str, key: int, ts_ms: int) -> bool:
+        window = self.windows.get(symbol)
+        if window is None:
+            window = self.windows[symbol] = {}
+        elif key in window:
+            return True
+
+        bloom = self.bloom
+        if bloom is not None:
+            salt = self._symbol_salt.get(symbol)
+            if salt is None:
+                salt = self._symbol_salt[symbol] = hash_text(symbol)
+            if bloom.add(key ^ salt):
+                self.counters["dedupe_bloom_checks"] += 1
+                if ts_ms <= self._pruned_upto.get(symbol, ts_ms - 1):
+                    # Keys of this age may have left the exact set; the
+                    # filter has the last word.
+                    self.counters["dedupe_bloom_duplicates"] += 1
+                    return True
+                self.counters["dedupe_bloom_false_positives"] += 1
+
+        window[key] = ts_ms
+        if self.window_ms:
+            watermark = self._watermark.get(symbol)
+            if watermark is None or ts_ms > watermark:
+                watermark = self._watermark[symbol] = ts_ms
+            if watermark >= self._next_prune.get(symbol, watermark):
+                self._prune_window(symbol, watermark - self.window_ms)
+        if len(window) > self.limit:
+            self._prune_oldest(symbol)
+        return False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable state (see `restore`)."""
+        return {
+            "windows": {
+                s: [[k, ts] for k, ts in w.items()] for s, w in self.windows.items()
+            },
+            "watermark": self._watermark,
+            "next_prune": self._next_prune,
+            "pruned_upto": self._pruned_upto,
+            "counters": self.counters,
+            "bloom": None if self.bloom is None else self.bloom.snapshot(),
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Replace the state with a `snapshot()` of a deduper with this config."""
+        if (state["bloom"] is None) != (self.bloom is None):
+            raise ValueError("dedupe snapshot does not match the Bloom filter setting")
+        self.windows = {s: dict(w) for s, w in state["windows"].items()}
+        self._watermark = dict(state["watermark"])
+        self._next_prune = dict(state["next_prune"])
+        self._pruned_upto = dict(state["pruned_upto"])
+        self.counters = dict(state["counters"])
+        if self.bloom is not None:
+            self.bloom.restore(state["bloom"])
+
+    def _set_pruned(self, symbol: str, ts_ms: int) -> None:
+        if ts_ms > self._pruned_upto.get(symbol, ts_ms - 1):
+            self._pruned_upto[symbol] = ts_ms
+
+    def _prune_window(self, symbol: str, cutoff: int) -> None:
+        # Rebuilt in one pass every quarter window rather than per tick.
+        window = self.windows[symbol]
+        kept = {k: ts for k, ts in window.items() if ts >= cutoff}
+        if len(kept) < len(window):
+            self._set_pruned(symbol, cutoff - 1)
+            self.windows[symbol] = kept
+        self._next_prune[symbol] = cutoff + self.window_ms + self.window_ms // 4
+
+    def _prune_oldest(self, symbol: str) -> None:
+        window = self.windows[symbol]
+        oldest = list(islice(window.items(), min(self.prune_batch, len(window))))
+        for key, _ in oldest:
+            del window[key]
+        self._set_pruned(symbol, max(ts for _, ts in oldest))
@@ -0,0 +1,319 @@
+"""Sharded aggregation across worker processes.
+
+    with ShardedAggregator(shards=4, timeframe_ms=60_000) as agg:
+        for symbol, tick, now_ms in feed:
+            agg.handle_tick(symbol, tick, now_ms)
+
+Symbols are assigned to shards by a stable hash, and each worker process
+owns a `DeterministicAggregator` for its symbols. Ticks are buffered and
+dispatched in batches of `batch_size`. After its ticks, every shard advances
+to the batch's latest clock, so bars of quiet symbols close on time.
+
+Workers do not touch the bus. They send their output back, and the parent
+publishes it to the current store in input order: output caused by the
+tick at position i comes before output caused by position i + 1. Output
+from the end-of-batch advance and from `flush()` follows, in shard order.
+For a given shard count and batch size the published stream (shard metrics
+aside) is therefore a pure function of the input. The bars themselves
+match a single aggregator; only the moment a bar is finalized can move to
+the end of its batch.
+
+Worker aggregators take their clock (`emitted_ts_ms`) from the input
+clocks. Ticks without `now_ms` are stamped with the wall clock when they are
+buffered.
+"""
+from __future__ import annotations
+
+import heapq
+import multiprocessing
+import tempfile
+import time
+import traceback
+from multiprocessing.connection import Connection
+from typing import Any, Dict, Iterable, List, Optional, Tuple, cast
+
+from services.event_store import simple_bus
+from services.event_store.simple_bus import publish
+from services.event_store.store import EventStore
+from services.ohlcv.aggregator import (
+    METRICS_TOPIC,
+    OHLCV_CORRECTION_TOPIC,
+    OHLCV_DEAD_LETTER_TOPIC,
+    OHLCV_TOPIC,
+    DeterministicAggregator,
+)
+from services.ohlcv.audit import AUDIT_TOPIC
+from services.ohlcv.dedupe import hash_text
+
+SHARD_METRICS_TOPIC = "metrics.ohlcv.shard.v1"
+
+OUTPUT_TOPICS = (
+    OHLCV_TOPIC,
+    OHLCV_CORRECTION_TOPIC,
+    METRICS_TOPIC,
+    OHLCV_DEAD_LETTER_TOPIC,
+    AUDIT_TOPIC,
+)
+
+# (input position, symbol, tick payload, now_ms)
+ShardTick = Tuple[int, str, Dict[str, Any], int]
+# (input position, topic, message)
+ShardOutput = Tuple[int, str, Dict[str, Any]]
+# (status, outputs or traceback, busy seconds, newest tick ts_ms)
+ShardReply = Tuple[str, Any, float, Optional[int]]
+
+
+def shard_for(symbol: str, shards: int) -> int:
+    """Shard index of `symbol`; stable across processes and runs."""
+    return hash_text(symbol) % shards
+
+
+def _run_shard(conn: Connection, aggregator_kwargs: Dict[str, Any]) -> None:
+    """Worker loop: apply batches and send back the captured output."""
+    clock = [0]
+    position = [0]
+    newest_ts: Optional[int] = None
+    outputs: List[ShardOutput] = []
+
+    with tempfile.TemporaryDirectory() as root, EventStore(
+        root, persist="none"
+    ) as store, simple_bus.use_store(store):
+        for topic in OUTPUT_TOPICS:
+            store.subscribe(
+                topic,
+                lambda message, topic=topic: outputs.append(
+                    (position[0], topic, message)
+                ),
+            )
+        try:
+            agg = DeterministicAggregator(
+                time_source=lambda: clock[0],
+                **{**aggregator_kwargs, "audit_background": False},
+            )
+        except Exception:
+            conn.send(("error", traceback.format_exc(), 0.0, None))
+            return
+        conn.send(("ok", [], 0.0, None))
+        while True:
+            request = conn.recv()
+            if request[0] == "stop":
+                conn.send(("ok", [], 0.0, newest_ts))
+                return
+            started = time.perf_counter()
+            try:
+                if request[0] == "batch":
+                    _, ticks, end_position, end_ms = request
+                    for index, symbol, payload, now_ms in ticks:
+                        position[0], clock[0] = index, now_ms
+                        agg.handle_tick(symbol, payload, now_ms)
+                        ts_ms = int(payload["ts_ms"])
+                        if newest_ts is None or ts_ms > newest_ts:
+                            newest_ts = ts_ms
+                    position[0], clock[0] = end_position, end_ms
+                    agg.advance(end_ms)
+                else:  # "flush"
+                    position[0] = request[1]
+                    agg.flush()
+            except Exception:
+                conn.send(("error", traceback.format_exc(), 0.0, newest_ts))
+                outputs.clear()
+                continue
+            busy_s = time.perf_counter() - started
+            conn.send(("ok", outputs[:], busy_s, newest_ts))
+            outputs.clear()
+
+
+class ShardedAggregator:
+    """Fans ticks out to `shards` worker processes (see module docstring).
+
+    `aggregator_kwargs` go to every worker's `DeterministicAggregator`. They
+    must be picklable, and `time_source` is not accepted. Audit records are
+    always serialized inline inside the workers. Errors raised in a worker
+    are re-raised here as `RuntimeError` with the worker's traceback.
+    """
+
+    def __init__(
+        self,
+        shards: int = 2,
+        batch_size: int = 1024,
+        start_method: Optional[str] = None,
+        **aggregator_kwargs: Any,
+    ):
+        if shards < 1:
+            raise ValueError("shards must be >= 1")
+        if "time_source" in aggregator_kwargs:
+            raise ValueError("sharded workers take their clock from the input")
+        self.shards = shards
+        self.batch_size = max(1, batch_size)
+        self._pending: List[Tuple[str, Dict[str, Any], int]] = []
+        self._position = 0
+        self._closed = False
+        self._conns: List[Connection] = []
+        self._procs: List[multiprocessing.process.BaseProcess] = []
+        self._stats: List[Dict[str, Any]] = []
+        # Every start method's context has `Process`; typeshed only declares
+        # it on the concrete context classes.
+        ctx = cast(
+            multiprocessing.context.SpawnContext,
+            multiprocessing.get_context(start_method),
+        )
+        for index in range(shards):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(
+                target=_run_shard,
+                args=(child, aggregator_kwargs),
+                name=f"ohlcv-shard-{index}",
+                daemon=True,
+            )
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+            self._stats.append(
+                {
+                    "shard": index,
+                    "ticks": 0,
+                    "batches": 0,
+                    "outputs": 0,
+                    "busy_ms": 0.0,
+                    "last_reply_ms": 0.0,
+                    "last_event_ts_ms": None,
+                    "event_lag_ms": 0,
+                }
+            )
+        self._await_ready()
+
+    def _await_ready(self) -> None:
+        """Wait for every worker's aggregator; setup errors raise `RuntimeError`."""
+        errors: List[str] = []
+        for index, conn in enumerate(self._conns):
+            try:
+                status, payload, _, _ = conn.recv()
+            except (EOFError, OSError):
+                status, payload = "error", "worker exited during setup"
+            if status == "error":
+                errors.append(f"shard {index}:\n{payload}")
+        if errors:
+            self._stop_workers()
+            raise RuntimeError("aggregator shard failed\n" + "\n".join(errors))
+
+    def __enter__(self) -> "ShardedAggregator":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def handle_tick(
+        self, symbol: str, tick_payload: Dict[str, Any], now_ms: Optional[int] = None
+    ) -> None:
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+        self._pending.append((symbol, tick_payload, now_ms))
+        if len(self._pending) >= self.batch_size:
+            self._dispatch()
+
+    def handle_ticks(
+        self, ticks: Iterable[Tuple[str, Dict[str, Any], Optional[int]]]
+    ) -> None:
+        """`handle_tick` for each `(symbol, payload, now_ms)` in order."""
+        for symbol, payload, now_ms in ticks:
+            self.handle_tick(symbol, payload, now_ms)
+
+    def _exchange(self, requests: List[Tuple[Any, ...]]) -> List[List[ShardOutput]]:
+        sent = time.perf_counter()
+        for conn, request in zip(self._conns, requests):
+            conn.send(request)
+        results: List[List[ShardOutput]] = []
+        errors: List[str] = []
+        for index, conn in enumerate(self._conns):
+            reply: ShardReply = conn.recv()
+            status, payload, busy_s, newest_ts = reply
+            stats = self._stats[index]
+            stats["last_event_ts_ms"] = newest_ts
+            stats["last_reply_ms"] = (time.perf_counter() - sent) * 1000
+            stats["busy_ms"] += busy_s * 1000
+            if status == "error":
+                errors.append(f"shard {index}:\n{payload}")
+                payload = []
+            stats["outputs"] += len(payload)
+            results.append(payload)
+        if errors:
+            raise RuntimeError("aggregator shard failed\n" + "\n".join(errors))
+        return results
+
+    def _publish(self, results: List[List[ShardOutput]]) -> None:
+        # Each shard's output is ordered by input position; merging by
+        # position (ties in shard order) gives one deterministic stream.
+        for _, topic, message in heapq.merge(*results, key=lambda out: out[0]):
+            publish(topic, message)
+
+    def _dispatch(self) -> None:
+        if not self._pending:
+            return
+        batches: List[List[ShardTick]] = [[] for _ in range(self.shards)]
+        end_ms = 0
+        for symbol, payload, now_ms in self._pending:
+            batches[shard_for(symbol, self.shards)].append(
+                (self._position, symbol, payload, now_ms)
+            )
+            self._position += 1
+            if now_ms > end_ms:
+                end_ms = now_ms
+        self._pending = []
+        for stats, batch in zip(self._stats, batches):
+            stats["batches"] += 1
+            stats["ticks"] += len(batch)
+        self._publish(
+            self._exchange(
+                [("batch", batch, self._position, end_ms) for batch in batches]
+            )
+        )
+        for stats in self._stats:
+            if stats["last_event_ts_ms"] is not None:
+                stats["event_lag_ms"] = end_ms - stats["last_event_ts_ms"]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-shard counters.
+
+        Each entry has `ticks`, `batches`, `outputs`, `busy_ms` and
+        `ticks_per_s` (worker processing time only). `last_reply_ms` is the
+        wall time of the last dispatch round trip. `event_lag_ms` is the
+        latest batch clock minus the newest tick event time the shard has
+        seen.
+        """
+        out = []
+        for stats in self._stats:
+            entry = dict(stats)
+            busy_s = stats["busy_ms"] / 1000
+            entry["ticks_per_s"] = stats["ticks"] / busy_s if busy_s else 0.0
+            out.append(entry)
+        return out
+
+    def flush(self) -> None:
+        """Dispatch buffered ticks, flush every shard and publish shard metrics."""
+        self._dispatch()
+        self._publish(self._exchange([("flush", self._position)] * self.shards))
+        for entry in self.stats():
+            publish(SHARD_METRICS_TOPIC, entry)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._stop_workers()
+
+    def _stop_workers(self) -> None:
+        self._closed = True
+        for conn in self._conns:
+            try:
+                conn.send(("stop",))
+                conn.recv()
+            except (EOFError, OSError):
+                pass
+            conn.close()
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
@@ -18,7 +18,7 @@ def day_rule_minimal(
     output_topic: str = "signal.display.v1",
 ) -> None:
     _ = tick_decimals, features_topic
-    recent_bars = [bar for bar in read_all(bars_topic) if bar.get("symbol") == symbol]
+    recent_bars = list(read_all(bars_topic, symbol=symbol))
     if len(recent_bars) < 2:
         return
     prev = recent_bars[-2]
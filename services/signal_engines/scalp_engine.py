@@ -18,10 +18,8 @@ def scalp_rule_minimal(
     output_topic: str = "signal.display.v1",
 ) -> None:
     _ = tick_decimals
-    ticks = [t for t in read_all(ticks_topic) if t.get("symbol") == symbol]
-    for ob in read_all(orderbook_topic):
-        if ob.get("symbol") != symbol:
-            continue
+    ticks = list(read_all(ticks_topic, symbol=symbol))
+    for ob in read_all(orderbook_topic, symbol=symbol):
         top = ob.get("levels", [])[0] if ob.get("levels") else None
         if not top:
             continue
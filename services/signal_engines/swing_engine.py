@@ -17,7 +17,7 @@ def swing_rule_minimal(
     articles_topic: str = "article.analysis.v1",
     output_topic: str = "signal.display.v1",
 ) -> None:
-    bars = [b for b in read_all(bars_topic) if b.get("symbol") == symbol]
+    bars = list(read_all(bars_topic, symbol=symbol))
     if not bars:
         return
     window = bars[-20:] if len(bars) >= 20 else bars
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from services.event_store.async_bus import (
+    DROP_NEWEST,
+    DROP_OLDEST,
+    POLICY_BLOCK,
+    AsyncBus,
+)
+from services.event_store.writer import BusWriter
+
+
+def test_publish_persists_and_delivers(tmp_path) -> None:
+    writer = BusWriter(tmp_path)
+
+    async def main() -> list:
+        bus = AsyncBus(writer, queue_size=4, persist_queue_size=8, write_batch=3)
+        sub = bus.subscribe("t.v1")
+
+        async def consume() -> list:
+            return [m["i"] async for m in sub]
+
+        consumer = asyncio.create_task(consume())
+        for i in range(20):
+            await bus.publish("t.v1", {"i": i})
+        await bus.close()
+        return await consumer
+
+    assert asyncio.run(main()) == list(range(20))
+    assert len(writer.path_for("t.v1").read_text().splitlines()) == 20
+    writer.close()
+
+
+@pytest.mark.parametrize(
+    "policy, expected", [(DROP_NEWEST, [0, 1, 2]), (DROP_OLDEST, [7, 8, 9])]
+)
+def test_drop_policies_never_block_publisher(policy, expected) -> None:
+    async def main():
+        bus = AsyncBus(queue_size=3, policy=policy)
+        sub = bus.subscribe("t.v1")
+        for i in range(10):
+            await asyncio.wait_for(bus.publish("t.v1", {"i": i}), timeout=1)
+        await bus.close()
+        return [m["i"] async for m in sub], sub.dropped
+
+    got, dropped = asyncio.run(main())
+    assert got == expected
+    assert dropped == 7
+
+
+def test_block_policy_applies_backpressure() -> None:
+    async def main():
+        bus = AsyncBus(queue_size=2, policy=POLICY_BLOCK)
+        sub = bus.subscribe("t.v1")
+        for i in range(2):
+            await bus.publish("t.v1", {"i": i})
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(bus.publish("t.v1", {"i": 2}), timeout=0.05)
+        with pytest.raises(asyncio.QueueFull):
+            bus.publish_nowait("t.v1", {"i": 2})
+        assert (await sub.__anext__())["i"] == 0
+        await asyncio.wait_for(bus.publish("t.v1", {"i": 2}), timeout=1)
+        await bus.close()
+        return [m["i"] async for m in sub]
+
+    assert asyncio.run(main()) == [1, 2]
+
+
+def test_slow_subscriber_does_not_stall_fast_one() -> None:
+    async def main():
+        bus = AsyncBus(queue_size=2)
+        fast = bus.subscribe("t.v1")
+        slow = bus.subscribe("t.v1", policy=DROP_OLDEST)
+
+        async def consume():
+            return [m["i"] async for m in fast]
+
+        task = asyncio.create_task(consume())
+        for i in range(50):
+            await bus.publish("t.v1", {"i": i})
+        stats = bus.stats()["t.v1"]
+        await bus.close()
+        return await task, slow.dropped, stats
+
+    got, dropped, stats = asyncio.run(main())
+    assert got == list(range(50))
+    assert dropped == 48
+    assert stats["subscribers"] == 2
@@ -0,0 +1,122 @@
+import pytest
+
+from services.event_store import codec
+from services.event_store.convert import convert_topic
+from services.event_store.key_index import KeyIndex
+from services.event_store.reader import TopicReader
+from services.event_store.segments import TopicConfig
+from services.event_store.writer import BusWriter
+
+TICK = {
+    "source_id": "csv_ingest",
+    "symbol": "CBA.ASX",
+    "seq_no": 7,
+    "ts_ms": 1_700_000_000_123,
+    "recv_ts_ms": 1_700_000_000_125,
+    "price_ticks": 113420,
+    "size": 50,
+    "venue": "CSV",
+}
+BAR = {
+    "symbol": "CBA.ASX",
+    "timeframe_ms": 60_000,
+    "timeframe_start_ms": 1_700_000_000_000,
+    "open": 1,
+    "high": 3,
+    "low": 1,
+    "close": 2,
+    "volume": 10,
+    "trade_count": 4,
+    "version": 1,
+    "replaced": False,
+    "emitted_ts_ms": 1_700_000_061_000,
+}
+
+
+def _decode_one(frame: bytes) -> dict:
+    ((_, payload, end),) = list(codec.BINARY.iter_records(frame))
+    assert end == len(frame)
+    return codec.BINARY.decode(payload)
+
+
+def test_fixed_schemas_round_trip_and_are_compact() -> None:
+    for message, schema_id in ((TICK, codec.SCHEMA_TICK), (BAR, codec.SCHEMA_BAR)):
+        frame = codec.BINARY.encode(message)
+        assert frame[4] == schema_id
+        assert len(frame) < len(codec.NDJSON.encode(message)) / 2
+        decoded = _decode_one(frame)
+        assert decoded == message
+        assert list(decoded) == sorted(message)
+
+
+def test_non_matching_messages_fall_back_to_json() -> None:
+    odd = dict(TICK, size=True)
+    extra = dict(BAR, note="x")
+    for message in (odd, extra, {"nested": {"a": [1, 2]}}):
+        frame = codec.BINARY.encode(message)
+        assert frame[4] == codec.SCHEMA_JSON
+        assert _decode_one(frame) == message
+
+
+def test_partial_binary_frame_is_not_yielded() -> None:
+    frame = codec.BINARY.encode(TICK)
+    assert list(codec.BINARY.iter_records(frame[:-1])) == []
+
+
+def test_binary_topic_write_read_and_index(tmp_path) -> None:
+    writer = BusWriter(tmp_path)
+    writer.configure_topic("market.tick.v1", TopicConfig(encoding="binary"))
+    for i in range(5):
+        writer.publish("market.tick.v1", dict(TICK, seq_no=i, symbol="AB"[i % 2]))
+    path = writer.path_for("market.tick.v1")
+    assert path.suffix == ".bin"
+
+    reader = TopicReader(tmp_path, "market.tick.v1")
+    assert [r["seq_no"] for r in reader.poll()] == [0, 1, 2, 3, 4]
+    reader.seek_to_index(3)
+    assert [r["seq_no"] for r in reader.poll()] == [3, 4]
+
+    index = KeyIndex(path)
+    index.refresh()
+    got = [r["seq_no"] for r in codec.read_at(path, index.lookup("B"))]
+    assert got == [1, 3]
+    writer.close()
+
+
+def test_convert_topic_between_formats(tmp_path) -> None:
+    writer = BusWriter(tmp_path)
+    for i in range(4):
+        writer.publish("ohlcv.bar.v1", dict(BAR, version=i + 1))
+    writer.close()
+    before = list(codec.iter_messages(tmp_path / "ohlcv.bar.v1.ndjson"))
+
+    (binary,) = convert_topic(tmp_path, "ohlcv.bar.v1", "binary")
+    assert not (tmp_path / "ohlcv.bar.v1.ndjson").exists()
+    assert list(codec.iter_messages(binary)) == before
+
+    (back,) = convert_topic(tmp_path, "ohlcv.bar.v1", "ndjson")
+    assert list(codec.iter_messages(back)) == before
+
+
+def test_switching_encoding_of_unsegmented_topic_requires_conversion(
+    tmp_path,
+) -> None:
+    writer = BusWriter(tmp_path)
+    writer.publish("t.v1", {"i": 0})
+    writer.flush()
+    with pytest.raises(ValueError):
+        writer.configure_topic("t.v1", TopicConfig(encoding="binary"))
+    writer.close()
+
+
+def test_segments_may_mix_encodings(tmp_path) -> None:
+    writer = BusWriter(tmp_path)
+    writer.configure_topic("t.v1", TopicConfig(segment_bytes=1_000))
+    writer.publish("t.v1", dict(TICK, seq_no=0))
+    writer.configure_topic("t.v1", TopicConfig(segment_bytes=1_000, encoding="binary"))
+    writer.publish("t.v1", dict(TICK, seq_no=1))
+    writer.flush()
+
+    reader = TopicReader(tmp_path, "t.v1")
+    assert [r["seq_no"] for r in reader.poll()] == [0, 1]
+    writer.close()
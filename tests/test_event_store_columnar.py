@@ -0,0 +1,113 @@
+from services.event_store import simple_bus
+from services.event_store.columnar import (
+    ColumnarReader,
+    ColumnarWriter,
+    read_part_header,
+)
+from services.event_store.store import EventStore
+from services.ingest.ingest import ingest_csv_bulk
+from services.ingest.pipeline import run_csv_pipeline
+from services.ohlcv.aggregator import DeterministicAggregator
+
+DAY = 86_400_000
+BASE = 1_699_920_000_000  # 2023-11-14T00:00:00Z
+
+
+def make_ticks():
+    ticks = []
+    for i in range(600):
+        ts = BASE + i * 400_000  # spans three days
+        tick = {
+            "symbol": f"S/{i % 2}",
+            "ts_ms": ts,
+            "price_ticks": 100 + i % 13,
+            "size": 1 + i % 3,
+            "venue": "ASX" if i % 5 else None,
+        }
+        if i % 7 == 0:
+            tick["trade_id"] = f"t{i}"
+        ticks.append(tick)
+    return ticks
+
+
+def test_scan_matches_filtered_rows(tmp_path) -> None:
+    ticks = make_ticks()
+    with ColumnarWriter(tmp_path, "market.tick.v1", rows_per_part=40) as writer:
+        writer.extend(ticks)
+    reader = ColumnarReader(tmp_path, "market.tick.v1")
+    assert reader.symbols() == ["S/0", "S/1"]
+
+    since, until = BASE + DAY // 2, BASE + DAY + 3 * 3_600_000
+    expected = [
+        t for t in ticks if t["symbol"] == "S/1" and since <= t["ts_ms"] < until
+    ]
+    batches = list(reader.scan("S/1", ["ts_ms", "size"], since, until))
+    assert all(list(b) == ["ts_ms", "size"] for b in batches)
+    assert [ts for b in batches for ts in b["ts_ms"]] == [t["ts_ms"] for t in expected]
+    assert [s for b in batches for s in b["size"]] == [t["size"] for t in expected]
+
+    # The last day is pruned without being opened.
+    assert len(reader.parts("S/1", since, until)) < len(reader.parts("S/1"))
+    rows = list(reader.rows("S/1", since, until))
+    assert rows == [{k: v for k, v in t.items() if v is not None} for t in expected]
+
+
+def test_unsorted_parts_and_column_kinds(tmp_path) -> None:
+    rows = [
+        {"symbol": "A", "ts_ms": BASE + t, "price_ticks": t, "tag": str(t)}
+        for t in (5, 1, 9, 3, 7)
+    ]
+    with ColumnarWriter(tmp_path, "market.tick.v1") as writer:
+        writer.extend(rows)
+    reader = ColumnarReader(tmp_path, "market.tick.v1")
+    (part,) = reader.parts("A")
+    header = read_part_header(part)
+    assert header["sorted"] is False
+    assert header["columns"]["price_ticks"][0] == "i8"
+    assert header["columns"]["tag"][0] == "json"
+
+    (batch,) = reader.scan("A", ["price_ticks", "tag"], BASE + 2, BASE + 7)
+    assert batch == {"price_ticks": [5, 3], "tag": ["5", "3"]}
+    assert list(reader.scan("A", None, BASE + 10)) == []
+
+
+def test_adjacent_windows_page_without_overlap(tmp_path) -> None:
+    ticks = make_ticks()
+    with ColumnarWriter(tmp_path, "market.tick.v1", rows_per_part=40) as writer:
+        writer.extend(ticks)
+    reader = ColumnarReader(tmp_path, "market.tick.v1")
+    # Window edges fall on tick timestamps and on a day boundary.
+    edges = [BASE, BASE + 40 * 400_000, BASE + DAY, BASE + 3 * DAY]
+    paged = [
+        ts
+        for since, until in zip(edges, edges[1:])
+        for batch in reader.scan("S/0", ["ts_ms"], since, until)
+        for ts in batch["ts_ms"]
+    ]
+    assert paged == [t["ts_ms"] for t in ticks if t["symbol"] == "S/0"]
+    assert list(reader.scan("S/0", ["ts_ms"], BASE, BASE)) == []
+
+
+def test_ingest_and_pipeline_write_columnar(tmp_path) -> None:
+    csv_path = tmp_path / "ticks.csv"
+    lines = ["ts_ms,symbol,price_ticks,size,venue,seq_no"]
+    for i in range(200):
+        lines.append(f"{BASE + i * 700},S{i % 2},{100 + i % 9},1,ASX,{i}")
+    csv_path.write_text("\n".join(lines) + "\n")
+
+    with EventStore(tmp_path / "bus") as store, simple_bus.use_store(store):
+        with ColumnarWriter(tmp_path / "cols", "market.tick.v1") as writer:
+            ingest_csv_bulk(csv_path, chunk_rows=64, columnar=writer)
+        published = list(store.read_all("market.tick.v1", symbol="S0"))
+    reader = ColumnarReader(tmp_path / "cols", "market.tick.v1")
+    assert list(reader.rows("S0")) == published
+
+    agg = DeterministicAggregator(timeframes=[5000], time_source=lambda: 0)
+    with EventStore(tmp_path / "bus2") as store, simple_bus.use_store(store):
+        run_csv_pipeline([csv_path], agg, columnar_root=tmp_path / "pipe")
+        bars = list(store.read_all("ohlcv.bar.v1", symbol="S1"))
+    bar_reader = ColumnarReader(tmp_path / "pipe", "ohlcv.bar.v1")
+    assert bars and list(bar_reader.rows("S1")) == bars
+    tick_reader = ColumnarReader(tmp_path / "pipe", "market.tick.v1")
+    batches = [b for s in ("S0", "S1") for b in tick_reader.scan(s, ["ts_ms"])]
+    assert sum(len(b["ts_ms"]) for b in batches) == 200
@@ -0,0 +1,79 @@
+import shutil
+
+from services.event_store.codec import read_at
+from services.event_store.key_index import KeyIndex, record_key
+from services.event_store.simple_bus import BUS_DIR, publish, read_all
+from services.event_store.writer import BusWriter, FlushPolicy
+
+
+def clear_bus() -> None:
+    if BUS_DIR.exists():
+        shutil.rmtree(BUS_DIR)
+    BUS_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def test_record_key_picks_first_event_time_field() -> None:
+    assert record_key({"symbol": "A", "ts_ms": 5, "end_ts_ms": 9}) == ("A", 5)
+    assert record_key({"symbol": "A", "end_ts_ms": 9}) == ("A", 9)
+    assert record_key({"generated_ts_ms": "7"})[1] == 7
+    assert record_key({"symbol": 3})[0] == ""
+
+
+def test_lookup_by_symbol_and_time_range(tmp_path) -> None:
+    writer = BusWriter(tmp_path, FlushPolicy(max_records=4))
+    for i in range(12):
+        writer.publish("t.v1", {"symbol": "AB"[i % 2], "ts_ms": 1000 + i, "i": i})
+    writer.flush()
+
+    path = writer.path_for("t.v1")
+    index = KeyIndex(path)
+    index.refresh()
+    assert index.symbols() == ["A", "B"]
+
+    only_a = [r["i"] for r in read_at(path, index.lookup("A"))]
+    assert only_a == [0, 2, 4, 6, 8, 10]
+    ranged = [r["i"] for r in read_at(path, index.lookup("B", 1003, 1009))]
+    assert ranged == [3, 5, 7]
+    all_ranged = [r["i"] for r in read_at(path, index.lookup(None, 1010))]
+    assert all_ranged == [10, 11]
+
+    writer.publish("t.v1", {"symbol": "C", "ts_ms": 5, "i": 12})
+    writer.flush()
+    index.refresh()
+    assert [r["i"] for r in read_at(path, index.lookup("C"))] == [12]
+    writer.close()
+
+
+def test_out_of_order_timestamps_are_still_filtered(tmp_path) -> None:
+    writer = BusWriter(tmp_path)
+    for ts in (30, 10, 20, 40):
+        writer.publish("t.v1", {"symbol": "A", "ts_ms": ts})
+    path = writer.path_for("t.v1")
+    index = KeyIndex(path)
+    index.refresh()
+    got = [r["ts_ms"] for r in read_at(path, index.lookup("A", 15, 35))]
+    assert got == [30, 20]
+    writer.close()
+
+
+def test_legacy_topic_is_indexed_on_first_filtered_read(tmp_path) -> None:
+    path = tmp_path / "t.v1.ndjson"
+    path.write_text('{"symbol":"A","ts_ms":1}\n{"symbol":"B","ts_ms":2}\n')
+    index = KeyIndex(path)
+    index.refresh()
+    assert [r["symbol"] for r in read_at(path, index.lookup("B"))] == ["B"]
+
+
+def test_read_all_filters_match_full_scan() -> None:
+    clear_bus()
+    for i in range(20):
+        publish("idx.test.v1", {"symbol": f"S{i % 3}", "end_ts_ms": i * 10})
+
+    expected = [
+        r
+        for r in read_all("idx.test.v1")
+        if r["symbol"] == "S1" and 50 <= r["end_ts_ms"] < 150
+    ]
+    got = list(read_all("idx.test.v1", symbol="S1", since_ts=50, until_ts=150))
+    assert got == expected
+    assert list(read_all("idx.test.v1", symbol="missing")) == []
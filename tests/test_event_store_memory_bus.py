@@ -0,0 +1,80 @@
+import shutil
+
+import pytest
+
+from services.event_store import simple_bus
+from services.event_store.memory_bus import InMemoryBus
+from services.event_store.simple_bus import BUS_DIR, read_all, subscribe
+from services.event_store.writer import BusWriter
+from services.indicators.engine import IndicatorEngine
+from services.ohlcv.aggregator import DeterministicAggregator
+
+
+def clear_bus() -> None:
+    if BUS_DIR.exists():
+        shutil.rmtree(BUS_DIR)
+    BUS_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def test_callbacks_run_in_order_and_depth_first() -> None:
+    bus = InMemoryBus(persist="none")
+    seen = []
+    bus.subscribe("a", lambda m: bus.publish("b", {"from": m["i"]}))
+    bus.subscribe("a", lambda m: seen.append(("a", m["i"])))
+    bus.subscribe("b", lambda m: seen.append(("b", m["from"])))
+
+    bus.publish("a", {"i": 1})
+    assert seen == [("b", 1), ("a", 1)]
+
+    unsubscribe = bus.subscribe("a", lambda m: seen.append(("late", m["i"])))
+    unsubscribe()
+    bus.publish("a", {"i": 2})
+    assert ("late", 2) not in seen
+
+
+@pytest.mark.parametrize("persist", ["sync", "async"])
+def test_persistence_modes_write_the_log(tmp_path, persist) -> None:
+    writer = BusWriter(tmp_path)
+    bus = InMemoryBus(writer, persist=persist, queue_size=4)
+    got = []
+    bus.subscribe("t.v1", got.append)
+    for i in range(50):
+        bus.publish("t.v1", {"i": i})
+    assert [m["i"] for m in got] == list(range(50))
+
+    bus.flush()
+    lines = writer.path_for("t.v1").read_text().splitlines()
+    assert len(lines) == 50
+    bus.close()
+
+
+def test_persistence_requires_writer() -> None:
+    with pytest.raises(ValueError):
+        InMemoryBus(persist="async")
+    with pytest.raises(ValueError):
+        InMemoryBus(persist="bogus")
+
+
+def test_aggregator_feeds_indicators_in_process() -> None:
+    clear_bus()
+    engine = IndicatorEngine()
+    unsubscribe = subscribe("ohlcv.bar.v1", engine.handle_bar)
+    try:
+        simple_bus.configure_persistence("async")
+        agg = DeterministicAggregator(timeframe_ms=1000, allowed_lateness_ms=0)
+        base = 1_700_000_000_000
+        for i in range(5):
+            ts = base + i * 1000
+            tick = {"ts_ms": ts, "price_ticks": 100 + i, "size": 1, "trade_id": str(i)}
+            agg.handle_tick("SYM", tick, now_ms=ts + 1)
+        agg.flush()
+    finally:
+        unsubscribe()
+        simple_bus.configure_persistence("sync")
+
+    bars = list(read_all("ohlcv.bar.v1"))
+    indicators = list(read_all("indicators.bar.v1"))
+    assert len(bars) == 5
+    assert [r["timeframe_start_ms"] for r in indicators] == [
+        b["timeframe_start_ms"] for b in bars
+    ]
@@ -0,0 +1,113 @@
+import pytest
+
+from services.event_store import offset_index
+from services.event_store import reader as reader_module
+from services.event_store.reader import START_LATEST, TopicReader
+from services.event_store.writer import BusWriter, FlushPolicy
+
+
+def _writer(root) -> BusWriter:
+    return BusWriter(root, FlushPolicy(max_records=1))
+
+
+def test_poll_returns_only_new_records(tmp_path) -> None:
+    writer = _writer(tmp_path)
+    reader = TopicReader(tmp_path, "t.v1")
+    assert reader.poll() == []
+
+    for i in range(3):
+        writer.publish("t.v1", {"i": i})
+    assert [r["i"] for r in reader.poll()] == [0, 1, 2]
+    assert reader.poll() == []
+
+    writer.publish("t.v1", {"i": 3})
+    assert [r["i"] for r in reader.poll(max_records=5)] == [3]
+    writer.close()
+
+
+def test_partial_trailing_record_is_left_for_next_poll(tmp_path) -> None:
+    path = tmp_path / "t.v1.ndjson"
+    path.write_bytes(b'{"i":0}\n{"i":')
+    reader = TopicReader(tmp_path, "t.v1")
+    assert reader.poll() == [{"i": 0}]
+
+    with path.open("ab") as fh:
+        fh.write(b"1}\n")
+    assert reader.poll() == [{"i": 1}]
+
+
+def test_poll_reads_in_bounded_chunks(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(reader_module, "READ_CHUNK_BYTES", 16)
+    path = tmp_path / "t.v1.ndjson"
+    lines = [b'{"i":%d,"pad":"%s"}\n' % (i, b"x" * (i % 40)) for i in range(200)]
+    path.write_bytes(b"".join(lines[:100]) + b"\n\n" + b"".join(lines[100:]) + b"\n")
+    reader = TopicReader(tmp_path, "t.v1")
+
+    assert [r["i"] for r in reader.poll(max_records=3)] == [0, 1, 2]
+    # Only the chunks holding those records were read, not the backlog.
+    assert reader._fh is not None and reader._fh.tell() < reader.position + 16 + 60
+    assert [r["i"] for r in reader.poll()] == list(range(3, 200))
+    assert reader.position == path.stat().st_size
+
+    with path.open("ab") as fh:
+        fh.write(b'{"i":200}\n{"i":')
+    assert reader.poll() == [{"i": 200}]
+    with path.open("ab") as fh:
+        fh.write(b"201}\n")
+    assert reader.poll() == [{"i": 201}]
+
+
+def test_group_offsets_commit_and_resume(tmp_path) -> None:
+    writer = _writer(tmp_path)
+    for i in range(4):
+        writer.publish("t.v1", {"i": i})
+
+    first = TopicReader(tmp_path, "t.v1", group="engines")
+    assert [r["i"] for r in first.poll(max_records=2)] == [0, 1]
+    first.commit()
+
+    resumed = TopicReader(tmp_path, "t.v1", group="engines")
+    assert resumed.committed() == first.position
+    assert [r["i"] for r in resumed.poll()] == [2, 3]
+
+    latest = TopicReader(tmp_path, "t.v1", group="other", start=START_LATEST)
+    writer.publish("t.v1", {"i": 4})
+    assert [r["i"] for r in latest.poll()] == [4]
+    writer.close()
+
+
+def test_seek_by_index_uses_sidecar(tmp_path) -> None:
+    writer = _writer(tmp_path)
+    for i in range(5):
+        writer.publish("t.v1", {"i": i})
+    path = writer.path_for("t.v1")
+    assert offset_index.entry_count(offset_index.index_path(path)) == 5
+    assert offset_index.is_current(path)
+
+    reader = TopicReader(tmp_path, "t.v1")
+    reader.seek_to_index(3)
+    assert [r["i"] for r in reader.poll()] == [3, 4]
+    with pytest.raises(IndexError):
+        reader.seek_to_index(9)
+    writer.close()
+
+
+def test_index_is_rebuilt_for_legacy_files(tmp_path) -> None:
+    path = tmp_path / "t.v1.ndjson"
+    path.write_bytes(b'{"i":0}\n{"i":1}\n')
+    writer = _writer(tmp_path)
+    writer.publish("t.v1", {"i": 2})
+
+    reader = TopicReader(tmp_path, "t.v1")
+    reader.seek_to_index(2)
+    assert reader.poll() == [{"i": 2}]
+    writer.close()
+
+
+def test_tail_stops_after_idle_timeout(tmp_path) -> None:
+    writer = _writer(tmp_path)
+    writer.publish("t.v1", {"i": 0})
+    reader = TopicReader(tmp_path, "t.v1")
+    got = list(reader.tail(poll_interval_s=0.001, idle_timeout_s=0.01))
+    assert got == [{"i": 0}]
+    writer.close()
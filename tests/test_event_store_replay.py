@@ -0,0 +1,74 @@
+from services.event_store.mmap_replay import LazyRecord, replay_columns, replay_topic
+from services.event_store.segments import TopicConfig
+from services.event_store.store import EventStore
+from services.event_store.writer import BusWriter
+
+
+def _tick(i: int) -> dict:
+    return {
+        "source_id": "csv_ingest",
+        "symbol": "AB"[i % 2],
+        "seq_no": i,
+        "ts_ms": 1_000 + i,
+        "recv_ts_ms": 1_000 + i,
+        "price_ticks": 100 + i,
+        "size": 1,
+        "venue": "CSV",
+    }
+
+
+def _write(tmp_path, config: TopicConfig, n: int = 6) -> BusWriter:
+    writer = BusWriter(tmp_path)
+    writer.configure_topic("market.tick.v1", config)
+    for i in range(n):
+        writer.publish("market.tick.v1", _tick(i))
+    writer.flush()
+    return writer
+
+
+def test_replay_matches_published_records_in_both_formats(tmp_path) -> None:
+    for encoding in ("ndjson", "binary"):
+        root = tmp_path / encoding
+        writer = _write(root, TopicConfig(encoding=encoding, segment_bytes=200))
+        records = [rec.to_dict() for rec in replay_topic(root, "market.tick.v1")]
+        assert records == [_tick(i) for i in range(6)]
+        writer.close()
+
+
+def test_binary_fields_are_read_lazily_from_the_map(tmp_path) -> None:
+    writer = _write(tmp_path, TopicConfig(encoding="binary"))
+    seen = []
+    for rec in replay_topic(tmp_path, "market.tick.v1"):
+        assert isinstance(rec, LazyRecord)
+        assert isinstance(rec.payload, memoryview)
+        seen.append((rec["symbol"], rec["price_ticks"], rec.get("trade_id")))
+        assert rec._decoded is None
+    assert seen[:2] == [("A", 100, None), ("B", 101, None)]
+    writer.close()
+
+
+def test_replay_columns_batches_selected_fields(tmp_path) -> None:
+    writer = _write(tmp_path, TopicConfig(encoding="binary"), n=5)
+    batches = list(
+        replay_columns(
+            tmp_path, "market.tick.v1", ["ts_ms", "price_ticks"], batch_size=2
+        )
+    )
+    assert [len(b["ts_ms"]) for b in batches] == [2, 2, 1]
+    assert batches[0] == {"ts_ms": [1000, 1001], "price_ticks": [100, 101]}
+
+    (only_b,) = replay_columns(tmp_path, "market.tick.v1", ["seq_no"], symbol="B")
+    assert only_b == {"seq_no": [1, 3]}
+    writer.close()
+
+
+def test_replay_skips_whitespace_only_lines(tmp_path) -> None:
+    writer = _write(tmp_path, TopicConfig(), n=2)
+    path = writer.path_for("market.tick.v1")
+    writer.close()
+    with path.open("ab") as fh:
+        fh.write(b"\r\n\n   \n")
+    with EventStore(tmp_path) as store:
+        expected = list(store.read_all("market.tick.v1"))
+    records = [rec.to_dict() for rec in replay_topic(tmp_path, "market.tick.v1")]
+    assert records == expected == [_tick(0), _tick(1)]
@@ -0,0 +1,109 @@
+import json
+import shutil
+
+import pytest
+
+from services.event_store import segments
+from services.event_store.reader import TopicReader
+from services.event_store.segments import TopicConfig
+from services.event_store.simple_bus import BUS_DIR, configure_topic, publish, read_all
+from services.event_store.writer import BusWriter
+
+
+def clear_bus() -> None:
+    if BUS_DIR.exists():
+        shutil.rmtree(BUS_DIR)
+    BUS_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def read_lines(path) -> list:
+    return [json.loads(line) for line in path.read_text().splitlines() if line]
+
+
+def test_size_bounded_segments_roll_and_read_in_order(tmp_path) -> None:
+    writer = BusWriter(tmp_path)
+    writer.configure_topic("t.v1", TopicConfig(segment_bytes=60))
+    reader = TopicReader(tmp_path, "t.v1")
+
+    for i in range(10):
+        writer.publish("t.v1", {"symbol": "A", "ts_ms": i, "i": i})
+    files = segments.topic_files(tmp_path, "t.v1")
+    assert len(files) > 1
+    assert [base for base, _ in files] == sorted(base for base, _ in files)
+
+    assert [r["i"] for r in reader.poll()] == list(range(10))
+    writer.publish("t.v1", {"symbol": "A", "ts_ms": 10, "i": 10})
+    assert [r["i"] for r in reader.poll()] == [10]
+
+    reader.seek_to_index(7)
+    assert [r["i"] for r in reader.poll()] == [7, 8, 9, 10]
+    writer.close()
+
+
+def test_time_bounded_segments(tmp_path) -> None:
+    clock = {"now": 0}
+    writer = BusWriter(tmp_path, time_source=lambda: clock["now"])
+    writer.configure_topic("t.v1", TopicConfig(segment_ms=1_000))
+    for i in range(3):
+        writer.publish("t.v1", {"i": i})
+        clock["now"] += 600
+    assert len(segments.topic_files(tmp_path, "t.v1")) == 2
+    writer.close()
+
+
+def test_byte_retention_drops_oldest_closed_segments(tmp_path) -> None:
+    writer = BusWriter(tmp_path)
+    writer.configure_topic("t.v1", TopicConfig(segment_bytes=40, retention_bytes=100))
+    reader = TopicReader(tmp_path, "t.v1")
+    for i in range(20):
+        writer.publish("t.v1", {"i": i})
+
+    files = segments.topic_files(tmp_path, "t.v1")
+    assert files[0][0] > 0
+    assert sum(p.stat().st_size for _, p in files) <= 100 + 40
+    got = [r["i"] for r in reader.poll()]
+    assert got == list(range(got[0], 20))
+    writer.close()
+
+
+def test_compaction_keeps_latest_record_per_key(tmp_path) -> None:
+    writer = BusWriter(tmp_path)
+    writer.configure_topic(
+        "corr.v1",
+        TopicConfig(segment_bytes=80, compact_key=("symbol", "timeframe_start_ms")),
+    )
+    for version in range(1, 6):
+        for start in (0, 1000):
+            writer.publish(
+                "corr.v1",
+                {"symbol": "X", "timeframe_start_ms": start, "version": version},
+            )
+    writer.flush()
+
+    files = segments.topic_files(tmp_path, "corr.v1")
+    closed = [r for _, p in files[:-1] for r in read_lines(p)]
+    keys = [(r["symbol"], r["timeframe_start_ms"]) for r in closed]
+    assert len(keys) == len(set(keys))
+
+    reader = TopicReader(tmp_path, "corr.v1")
+    latest = {}
+    for r in reader.poll():
+        latest[r["timeframe_start_ms"]] = r["version"]
+    assert latest == {0: 5, 1000: 5}
+    writer.close()
+
+
+def test_retention_requires_segmentation() -> None:
+    with pytest.raises(ValueError):
+        TopicConfig(retention_ms=1_000)
+
+
+def test_read_all_spans_segments_with_filters() -> None:
+    clear_bus()
+    configure_topic("seg.test.v1", TopicConfig(segment_bytes=64))
+    for i in range(12):
+        publish("seg.test.v1", {"symbol": "AB"[i % 2], "ts_ms": i})
+
+    assert [r["ts_ms"] for r in read_all("seg.test.v1")] == list(range(12))
+    got = [r["ts_ms"] for r in read_all("seg.test.v1", symbol="B", since_ts=4)]
+    assert got == [5, 7, 9, 11]
@@ -0,0 +1,77 @@
+import json
+import multiprocessing
+
+import pytest
+
+from services.event_store import offset_index, simple_bus
+from services.event_store.key_index import KeyIndex
+from services.event_store.reader import TopicReader
+from services.event_store.segments import TopicConfig
+from services.event_store.writer import BusWriter, FlushPolicy
+
+
+def _write_many(root: str, worker: int, count: int) -> None:
+    writer = BusWriter(root, FlushPolicy(max_records=7), shared=True)
+    pad = "x" * (5_000 + worker * 3_000)
+    for i in range(count):
+        writer.publish("shared.v1", {"symbol": f"S{worker}", "ts_ms": i, "pad": pad})
+    writer.close()
+
+
+def test_concurrent_writers_never_interleave(tmp_path) -> None:
+    ctx = multiprocessing.get_context("fork")
+    procs = [
+        ctx.Process(target=_write_many, args=(str(tmp_path), w, 150)) for w in range(4)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+        assert p.exitcode == 0
+
+    path = tmp_path / "shared.v1.ndjson"
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(records) == 600
+    by_writer = {}
+    for r in records:
+        by_writer.setdefault(r["bus_writer"], []).append((r["bus_seq"], r["ts_ms"]))
+    assert len(by_writer) == 4
+    for seqs in by_writer.values():
+        assert seqs == [(i + 1, i) for i in range(150)]
+    assert not offset_index.index_path(path).exists()
+
+
+def test_shared_topics_are_readable_without_sidecars(tmp_path) -> None:
+    writer = BusWriter(tmp_path, shared=True)
+    for i in range(6):
+        writer.publish("t.v1", {"symbol": "AB"[i % 2], "ts_ms": i})
+    writer.flush()
+
+    path = writer.path_for("t.v1")
+    index = KeyIndex(path)
+    index.refresh()
+    assert len(index.lookup("B", since_ts=2)) == 2
+    writer.publish("t.v1", {"symbol": "B", "ts_ms": 6})
+    writer.flush()
+    index.refresh()
+    assert len(index.lookup("B", since_ts=2)) == 3
+
+    reader = TopicReader(tmp_path, "t.v1")
+    reader.seek_to_index(4)
+    assert [r["ts_ms"] for r in reader.poll()] == [4, 5, 6]
+    writer.close()
+
+
+def test_shared_mode_limits() -> None:
+    writer = BusWriter("unused", shared=True, max_append_bytes=64)
+    with pytest.raises(ValueError):
+        writer.publish("t.v1", {"pad": "x" * 100})
+    with pytest.raises(ValueError):
+        writer.configure_topic("t.v1", TopicConfig(segment_bytes=1_000))
+
+
+def test_simple_bus_writer_from_env(monkeypatch) -> None:
+    monkeypatch.setenv("BUS_SHARED_APPEND", "1")
+    monkeypatch.setenv("BUS_MAX_APPEND_BYTES", "4096")
+    writer = BusWriter.from_env(simple_bus.BUS_DIR)
+    assert writer.shared and writer.max_append_bytes == 4096
@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from services.event_store import simple_bus
+from services.event_store.store import EventStore
+from services.ohlcv.aggregator import DeterministicAggregator
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_import_has_no_filesystem_side_effects(tmp_path) -> None:
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+    env.pop("BUS_ROOT", None)
+    subprocess.run(
+        [sys.executable, "-c", "import services.event_store.simple_bus"],
+        cwd=tmp_path,
+        env=env,
+        check=True,
+    )
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_store_creates_root_lazily(tmp_path) -> None:
+    root = tmp_path / "bus"
+    with EventStore(root) as store:
+        assert store.topic_path("t.v1") == root / "t.v1.ndjson"
+        assert list(store.read_all("t.v1")) == []
+        assert not root.exists()
+        store.publish("t.v1", {"i": 1})
+        assert [r["i"] for r in store.read_all("t.v1")] == [1]
+
+
+def test_stores_are_isolated_and_routable(tmp_path) -> None:
+    a = EventStore(tmp_path / "a")
+    b = EventStore(tmp_path / "b")
+    base = 1_700_000_000_000
+    for store, price in ((a, 100), (b, 200)):
+        with simple_bus.use_store(store):
+            agg = DeterministicAggregator(timeframe_ms=1000, allowed_lateness_ms=0)
+            agg.handle_tick(
+                "SYM",
+                {"ts_ms": base, "price_ticks": price, "size": 1, "trade_id": "t"},
+                now_ms=base + 1,
+            )
+            agg.flush()
+
+    assert [r["open"] for r in a.read_all("ohlcv.bar.v1")] == [100]
+    assert [r["open"] for r in b.read_all("ohlcv.bar.v1")] == [200]
+    assert simple_bus.get_store() not in (a, b)
+    a.close()
+    b.close()
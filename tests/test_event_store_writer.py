@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from services.event_store.writer import BusWriter, FlushPolicy
+
+
+def _lines(path) -> list:
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text().splitlines() if line]
+
+
+def test_records_are_batched_until_count_threshold(tmp_path) -> None:
+    writer = BusWriter(tmp_path, FlushPolicy(max_records=3))
+    path = writer.path_for("t.v1")
+
+    writer.publish("t.v1", {"i": 0})
+    writer.publish("t.v1", {"i": 1})
+    assert _lines(path) == []
+
+    writer.publish("t.v1", {"i": 2})
+    assert [r["i"] for r in _lines(path)] == [0, 1, 2]
+    writer.close()
+
+
+def test_byte_and_interval_thresholds(tmp_path) -> None:
+    clock = {"now": 0}
+    writer = BusWriter(
+        tmp_path,
+        FlushPolicy(max_records=0, max_bytes=40, max_interval_ms=100),
+        time_source=lambda: clock["now"],
+    )
+    path = writer.path_for("t.v1")
+
+    writer.publish("t.v1", {"i": 0})
+    assert _lines(path) == []
+    clock["now"] = 150
+    writer.publish("t.v1", {"i": 1})
+    assert len(_lines(path)) == 2
+
+    writer.publish("t.v1", {"payload": "x" * 40})
+    assert len(_lines(path)) == 3
+    writer.close()
+
+
+def test_explicit_flush_and_reopen_after_removal(tmp_path) -> None:
+    writer = BusWriter(tmp_path, FlushPolicy(max_records=100))
+    path = writer.path_for("t.v1")
+
+    writer.publish("t.v1", {"i": 0})
+    writer.flush()
+    assert _lines(path) == [{"i": 0}]
+
+    path.unlink()
+    writer.publish("t.v1", {"i": 1})
+    writer.flush("t.v1")
+    assert _lines(path) == [{"i": 1}]
+    writer.close()
+
+
+def test_fsync_durability_and_invalid_mode(tmp_path) -> None:
+    writer = BusWriter(tmp_path, FlushPolicy(durability="fsync"))
+    writer.publish("t.v1", {"i": 0})
+    assert _lines(writer.path_for("t.v1")) == [{"i": 0}]
+    writer.close()
+
+    with pytest.raises(ValueError):
+        FlushPolicy(durability="sometimes")
+
+
+def test_publish_many_writes_one_batch_with_index(tmp_path) -> None:
+    from services.event_store import offset_index
+
+    one = BusWriter(tmp_path / "one", FlushPolicy(max_records=1))
+    many = BusWriter(tmp_path / "many", FlushPolicy(max_records=1000))
+    messages = [{"symbol": "A", "ts_ms": i, "i": i} for i in range(5)]
+    for m in messages:
+        one.publish("t.v1", m)
+    many.publish_many("t.v1", messages)
+    # Written out despite the record threshold, byte-identical to publish().
+    path = many.path_for("t.v1")
+    assert path.read_bytes() == one.path_for("t.v1").read_bytes()
+    assert offset_index.entry_count(offset_index.index_path(path)) == 5
+    one.close()
+    many.close()
@@ -0,0 +1,50 @@
+import pytest
+
+from services.event_store import simple_bus
+from services.event_store.store import EventStore
+from services.feature_worker.feature_worker import run_feature_worker
+
+
+def make_bar(i: int) -> dict:
+    close = 10_000 + (i * 7) % 23
+    return {
+        "symbol": "CBA.ASX",
+        "start_ts_ms": 1_700_000_000_000 + i * 60_000,
+        "end_ts_ms": 1_700_000_060_000 + i * 60_000,
+        "open_ticks": close,
+        "high_ticks": close + 5 + i % 3,
+        "low_ticks": close - 4,
+        "close_ticks": close,
+        "volume": 10 + i,
+    }
+
+
+def test_atr_warms_up_on_the_14th_bar(tmp_path) -> None:
+    with EventStore(tmp_path) as store, simple_bus.use_store(store):
+        for i in range(16):
+            simple_bus.publish("ohlcv.bar.v1", make_bar(i))
+        run_feature_worker("CBA.ASX")
+        snapshots = list(store.read_all("feature.snapshot.v1"))
+
+    assert len(snapshots) == 16
+    assert {s["version"] for s in snapshots} == {"features_v1.1.0"}
+    atr = [s["features"]["atr_14"] for s in snapshots]
+    assert atr[:13] == ["null"] * 13
+    assert "null" not in atr[13:]
+    assert snapshots[0]["features"]["ema_20"] != "null"
+
+
+@pytest.mark.parametrize(
+    "extra",
+    [
+        {"atr_14": ("atr", {"period": 5})},
+        {"close": ("sma", {"period": 3})},
+        {"volume": ("vwap", {})},
+    ],
+)
+def test_extra_indicators_cannot_redefine_features(tmp_path, extra) -> None:
+    with EventStore(tmp_path) as store, simple_bus.use_store(store):
+        simple_bus.publish("ohlcv.bar.v1", make_bar(0))
+        with pytest.raises(ValueError, match="feature name already in use"):
+            run_feature_worker("CBA.ASX", extra_indicators=extra)
+        assert list(store.read_all("feature.snapshot.v1")) == []
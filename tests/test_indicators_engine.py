@@ -1,7 +1,16 @@
+import math
 import shutil
 
+import pytest
+
 from services.event_store.simple_bus import BUS_DIR, read_all
-from services.indicators.engine import IndicatorEngine
+from services.indicators.engine import (
+    BATCH_RTOL,
+    INDICATOR_NAMES,
+    IndicatorEngine,
+    IndicatorState,
+    compute_matrix,
+)
 
 
 def clear_bus() -> None:
@@ -81,3 +90,79 @@ def test_indicator_signal_confidence_bounds() -> None:
     signals = [s for s in read_all("signal.display.v1") if s["symbol"] == "BOUNDS"]
     for signal in signals:
         assert 30 <= int(signal["confidence_pct"]) <= 95
+
+
+def make_bars(symbol: str, n: int, seed: int) -> list:
+    bars = []
+    for i in range(n):
+        close = 1000 + (i * 37 + seed * 11) % 53 - (i % 7) * 3
+        bars.append(
+            {
+                "symbol": symbol,
+                "timeframe_start_ms": 1_700_000_000_000 + i * 60_000,
+                "open": close,
+                "high": close + (i + seed) % 5,
+                "low": close - (i * seed) % 4,
+                "close": close,
+            }
+        )
+    return bars
+
+
+def streamed(bars: list) -> dict:
+    state = IndicatorState()
+    values = [state.update_from_bar(bar) for bar in bars]
+    return {name: [v[name] for v in values] for name in INDICATOR_NAMES}
+
+
+def test_compute_batch_matches_streaming_and_continues_state() -> None:
+    bars = make_bars("AAA", 80, 3)
+    engine = IndicatorEngine()
+    head = engine.compute_batch("AAA", bars[:30])
+    tail = engine.compute_batch("AAA", bars[30:])
+    expected = streamed(bars)
+    for name in INDICATOR_NAMES:
+        assert head[name] + tail[name] == expected[name]
+    assert expected["ema_long"][19] is None and expected["ema_long"][20] is not None
+
+    reference = IndicatorState()
+    for bar in bars:
+        reference.update_from_bar(bar)
+    state = engine._states["AAA"]
+    assert (state.prev_ema_short, state.prev_ema_long) == (
+        reference.prev_ema_short,
+        reference.prev_ema_long,
+    )
+    for bar in make_bars("AAA", 10, 4):
+        assert state.update_from_bar(bar) == reference.update_from_bar(bar)
+
+
+def test_compute_matrix_matches_streaming_per_symbol() -> None:
+    symbols = [make_bars(f"S{k}", 40, k) for k in range(5)]
+    matrix = compute_matrix(
+        [[bars[t]["close"] for bars in symbols] for t in range(40)],
+        [[bars[t]["high"] for bars in symbols] for t in range(40)],
+        [[bars[t]["low"] for bars in symbols] for t in range(40)],
+    )
+    for k, bars in enumerate(symbols):
+        expected = streamed(bars)
+        for name in INDICATOR_NAMES:
+            got = [float(row[k]) for row in matrix[name]]
+            for value, want in zip(got, expected[name]):
+                if want is None:
+                    assert math.isnan(value)
+                else:
+                    assert value == pytest.approx(want, rel=BATCH_RTOL)
+
+
+def test_engine_publishes_extra_indicators() -> None:
+    clear_bus()
+    engine = IndicatorEngine(indicators={"rsi_14": ("rsi", {"period": 14})})
+    for bar in make_bars("RSI", 20, 1):
+        engine.handle_bar(dict(bar, volume=10))
+    published = [m for m in read_all("indicators.bar.v1") if m["symbol"] == "RSI"]
+    assert set(published[-1]["indicators"]) == {*INDICATOR_NAMES, "rsi_14"}
+    assert published[13]["indicators"]["rsi_14"] is None
+    assert 0 <= published[14]["indicators"]["rsi_14"] <= 100
+    with pytest.raises(ValueError, match="already in use"):
+        IndicatorState(extra={"atr": ("atr", {"period": 5})})
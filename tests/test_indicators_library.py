@@ -0,0 +1,113 @@
+import random
+import statistics
+from decimal import Decimal
+
+import pytest
+
+from services.indicators.library import INDICATORS, IndicatorSet, create
+
+
+def make_series(n: int = 120, seed: int = 5):
+    rng = random.Random(seed)
+    close, bars = 1000.0, []
+    for _ in range(n):
+        close += rng.randint(-6, 6)
+        high = close + rng.randint(0, 4)
+        low = close - rng.randint(0, 4)
+        bars.append((close, high, low, rng.randint(0, 50)))
+    return bars
+
+
+def run(kind: str, bars, **params):
+    indicator = create(kind, **params)
+    return [indicator.update(*bar) for bar in bars]
+
+
+def test_registry_covers_library() -> None:
+    assert set(INDICATORS) >= {
+        "sma",
+        "ema",
+        "atr",
+        "vwap",
+        "rolling_high",
+        "rolling_low",
+        "bollinger",
+        "rsi",
+        "zscore",
+    }
+    with pytest.raises(ValueError, match="unknown indicator"):
+        create("macd")
+
+
+def test_rolling_indicators_match_full_window_recomputation() -> None:
+    bars = make_series()
+    period = 10
+    sma = run("sma", bars, period=period)
+    high = run("rolling_high", bars, period=period)
+    low = run("rolling_low", bars, period=period)
+    bands = run("bollinger", bars, period=period, width=2)
+    zscore = run("zscore", bars, period=period)
+    for i in range(len(bars)):
+        if i < period - 1:
+            assert sma[i] is high[i] is low[i] is bands[i] is zscore[i] is None
+            continue
+        window = bars[i - period + 1 : i + 1]
+        closes = [b[0] for b in window]
+        mean, std = statistics.fmean(closes), statistics.pstdev(closes)
+        assert sma[i] == pytest.approx(mean)
+        assert high[i] == max(b[1] for b in window)
+        assert low[i] == min(b[2] for b in window)
+        assert bands[i]["middle"] == pytest.approx(mean)
+        assert bands[i]["upper"] == pytest.approx(mean + 2 * std)
+        expected_z = (closes[-1] - mean) / std if std else 0.0
+        assert zscore[i] == pytest.approx(expected_z, abs=1e-9)
+
+
+def test_recursive_indicators() -> None:
+    bars = make_series()
+    ema = run("ema", bars, period=5)
+    assert ema[3] is None
+    assert ema[4] == pytest.approx(statistics.fmean(b[0] for b in bars[:5]))
+    assert ema[5] == pytest.approx(ema[4] + (bars[5][0] - ema[4]) / 3)
+    assert run("ema", bars, period=5, seed="first")[0] == bars[0][0]
+
+    vwap = run("vwap", bars)
+    volume = sum(b[3] for b in bars)
+    assert vwap[-1] == pytest.approx(sum(b[0] * b[3] for b in bars) / volume)
+
+    period = 14
+    prev = [bars[0][0]] + [b[0] for b in bars]
+    trs = [max(h - lo, abs(h - p), abs(lo - p)) for (_, h, lo, _), p in zip(bars, prev)]
+    atr = run("atr", bars, period=period)
+    assert atr[period - 2] is None
+    assert atr[period - 1] == pytest.approx(statistics.fmean(trs[:period]))
+    seed = atr[period - 1]
+    assert atr[period] == pytest.approx((seed * (period - 1) + trs[period]) / period)
+
+    changes = [b[0] - a[0] for a, b in zip(bars, bars[1:])]
+    gain = sum(max(c, 0) for c in changes[:period]) / period
+    loss = sum(max(-c, 0) for c in changes[:period]) / period
+    rsi = run("rsi", bars, period=period)
+    assert rsi[period - 1] is None
+    assert rsi[period] == pytest.approx(100 - 100 / (1 + gain / loss))
+    for c in changes[period:]:
+        gain = (gain * (period - 1) + max(c, 0)) / period
+        loss = (loss * (period - 1) + max(-c, 0)) / period
+    assert rsi[-1] == pytest.approx(100 - 100 / (1 + gain / loss))
+
+
+def test_indicator_set_flattens_parts_and_supports_decimal() -> None:
+    specs = {
+        "ema_3": ("ema", {"period": 3}),
+        "bb": ("bollinger", {"period": 3}),
+        "atr": ("atr", {"period": 2}),
+    }
+    indicators = IndicatorSet(specs, num=Decimal)
+    assert indicators.names == ["ema_3", "bb_middle", "bb_upper", "bb_lower", "atr"]
+    first = indicators.update(Decimal("10.5"))
+    assert first == dict.fromkeys(indicators.names)
+    indicators.update(Decimal("11"), Decimal("11.5"), Decimal("10"), 3)
+    values = indicators.update(Decimal("12"))
+    assert values["ema_3"] == values["bb_middle"] == Decimal("33.5") / 3
+    assert isinstance(values["bb_upper"], Decimal)
+    assert isinstance(values["atr"], Decimal)
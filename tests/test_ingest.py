@@ -0,0 +1,74 @@
+import gzip
+import shutil
+
+import pytest
+
+from services.event_store import simple_bus
+from services.event_store.store import EventStore
+from services.ingest import ingest
+from services.ingest.ingest import ingest_csv_bulk, ingest_csv_ticks, ingest_directory
+
+FIXTURE = "tests/fixtures/ticks.csv"
+
+
+def write_csv(path, symbol: str, rows: int) -> None:
+    lines = ["ts_ms,symbol,price_ticks,size,venue,seq_no"]
+    for i in range(rows):
+        lines.append(f"{1_700_000_000_000 + i},{symbol},{100 + i % 7},1,ASX,{i}")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_bulk_ingest_matches_row_ingest(tmp_path) -> None:
+    gz = tmp_path / "ticks.csv.gz"
+    with open(FIXTURE, "rb") as src, gzip.open(gz, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+
+    out = {}
+    for name, run in (
+        ("rows", lambda: ingest_csv_ticks(FIXTURE)),
+        ("bulk", lambda: ingest_csv_bulk(FIXTURE, chunk_rows=2)),
+        ("gzip", lambda: ingest_csv_bulk(gz)),
+    ):
+        with EventStore(tmp_path / name) as store, simple_bus.use_store(store):
+            run()
+            out[name] = store.topic_path("market.tick.v1").read_bytes()
+    assert out["rows"]
+    assert out["bulk"] == out["rows"] == out["gzip"]
+
+
+def test_directory_ingest_keeps_per_file_order(tmp_path) -> None:
+    src = tmp_path / "src"
+    src.mkdir()
+    write_csv(src / "a.csv", "A", 2500)
+    write_csv(src / "b.csv", "B", 1200)
+    write_csv(tmp_path / "c.csv", "C", 700)
+    with open(tmp_path / "c.csv", "rb") as f, gzip.open(src / "c.csv.gz", "wb") as g:
+        shutil.copyfileobj(f, g)
+    (src / "notes.txt").write_text("ignored")
+
+    with EventStore(tmp_path / "bus") as store, simple_bus.use_store(store):
+        counts = ingest_directory(src, processes=2, chunk_rows=500)
+        ticks = list(store.read_all("market.tick.v1"))
+
+    assert sorted(counts.values()) == [700, 1200, 2500]
+    assert len(ticks) == 4400
+    for symbol in "ABC":
+        seqs = [t["seq_no"] for t in ticks if t["symbol"] == symbol]
+        assert seqs == list(range(len(seqs)))
+
+
+def test_directory_ingest_reports_bad_files(tmp_path) -> None:
+    write_csv(tmp_path / "good.csv", "A", 10)
+    (tmp_path / "bad.csv").write_text("ts_ms,symbol\n1,A\n")
+    with EventStore(tmp_path / "bus") as store, simple_bus.use_store(store):
+        with pytest.raises(RuntimeError, match="bad.csv"):
+            ingest_directory(tmp_path, processes=2)
+        assert len(list(store.read_all("market.tick.v1"))) == 10
+
+
+def test_zstd_input_needs_zstandard(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(ingest, "zstandard", None)
+    path = tmp_path / "ticks.csv.zst"
+    path.write_bytes(b"")
+    with pytest.raises(RuntimeError, match="zstandard"):
+        ingest_csv_bulk(path)
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from services.event_store import simple_bus
+from services.event_store.columnar import ColumnarReader
+from services.event_store.store import EventStore
+from services.indicators.engine import INDICATORS_TOPIC, IndicatorEngine
+from services.ingest.ingest import ingest_csv_bulk
+from services.ingest.pipeline import run_csv_pipeline
+from services.ohlcv.aggregator import DeterministicAggregator
+from services.ohlcv.checkpoint import consume_ticks
+
+BAR_TOPICS = ("ohlcv.bar.v1", "ohlcv.correction.v1", "metrics.ohlcv.v1")
+
+
+def write_csv(path) -> None:
+    lines = ["ts_ms,symbol,price_ticks,size,venue,seq_no,recv_ts_ms"]
+    for i in range(300):
+        ts = 1_700_000_000_000 + i * 250
+        lines.append(f"{ts},S{i % 3},{100 + i % 11},{1 + i % 5},ASX,{i},{ts + 40}")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def make_aggregator() -> DeterministicAggregator:
+    return DeterministicAggregator(
+        timeframes=[1000, 5000],
+        allowed_lateness_ms=100,
+        metrics_interval_ms=10_000,
+        time_source=lambda: 0,
+    )
+
+
+def test_pipeline_matches_ingest_then_consume(tmp_path) -> None:
+    csv_path = tmp_path / "ticks.csv"
+    write_csv(csv_path)
+
+    with EventStore(tmp_path / "two_pass") as store, simple_bus.use_store(store):
+        ingest_csv_bulk(csv_path)
+        agg = make_aggregator()
+        consume_ticks(agg, store.open_reader("market.tick.v1"))
+        agg.flush()
+        expected = json.dumps({t: list(store.read_all(t)) for t in BAR_TOPICS})
+
+    with EventStore(tmp_path / "direct") as store, simple_bus.use_store(store):
+        assert run_csv_pipeline([csv_path], make_aggregator(), chunk_rows=64) == 300
+        got = json.dumps({t: list(store.read_all(t)) for t in BAR_TOPICS})
+        assert not store.topic_path("market.tick.v1").exists()
+
+    assert list(json.loads(got)["ohlcv.bar.v1"])
+    assert got == expected
+
+
+def test_pipeline_feeds_indicators_and_persists_ticks_on_request(tmp_path) -> None:
+    csv_path = tmp_path / "ticks.csv"
+    write_csv(csv_path)
+
+    with EventStore(tmp_path / "bus") as store, simple_bus.use_store(store):
+        run_csv_pipeline(
+            [csv_path], make_aggregator(), IndicatorEngine(), persist_ticks=True
+        )
+        bars = list(store.read_all("ohlcv.bar.v1"))
+        indicators = list(store.read_all(INDICATORS_TOPIC))
+        ticks = list(store.read_all("market.tick.v1"))
+
+    assert len(ticks) == 300
+    assert [(m["symbol"], m["timeframe_start_ms"]) for m in indicators] == [
+        (b["symbol"], b["timeframe_start_ms"]) for b in bars
+    ]
+
+
+def test_pipeline_writes_columnar_buffers_on_error(tmp_path) -> None:
+    csv_path = tmp_path / "ticks.csv"
+    write_csv(csv_path)
+
+    with EventStore(tmp_path / "bus") as store, simple_bus.use_store(store):
+        with pytest.raises(FileNotFoundError):
+            run_csv_pipeline(
+                [csv_path, tmp_path / "missing.csv"],
+                make_aggregator(),
+                columnar_root=tmp_path / "cols",
+            )
+    reader = ColumnarReader(tmp_path / "cols", "market.tick.v1")
+    assert sum(1 for s in reader.symbols() for _ in reader.rows(s)) == 300
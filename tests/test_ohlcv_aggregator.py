@@ -1,3 +1,6 @@
+import hashlib
+import json
+import random
 import shutil
 
 from services.event_store.simple_bus import BUS_DIR, read_all
@@ -117,7 +120,7 @@ def test_dedupe_pruning_is_bounded() -> None:
             now_ms=base + i + 2000,
         )
 
-    assert len(agg._dedupe["PRUNE"]) <= 100
+    assert len(agg._deduper.windows["PRUNE"]) <= 100
 
 
 def test_flush_orders_bars_by_timeframe_start() -> None:
@@ -141,3 +144,268 @@ def test_flush_orders_bars_by_timeframe_start() -> None:
     bars = [b for b in read_all("ohlcv.bar.v1") if b["symbol"] == "ORD"]
     starts = [b["timeframe_start_ms"] for b in bars]
     assert starts == sorted(starts)
+
+
+def test_expiry_order_is_start_then_creation_order() -> None:
+    clear_bus()
+    agg = DeterministicAggregator(timeframe_ms=1000, allowed_lateness_ms=500)
+    base = 1_700_000_000_000
+
+    for symbol, offset in (("B", 1000), ("A", 1000), ("C", 0), ("A", 0)):
+        agg.handle_tick(
+            symbol,
+            {"ts_ms": base + offset, "price_ticks": 1, "size": 1},
+            now_ms=base + 1_400,
+        )
+    assert list(read_all("ohlcv.bar.v1")) == []
+
+    agg.handle_tick(
+        "Z", {"ts_ms": base + 9_000, "price_ticks": 1, "size": 1}, now_ms=base + 2_500
+    )
+    bars = [
+        (b["symbol"], b["timeframe_start_ms"] - base) for b in read_all("ohlcv.bar.v1")
+    ]
+    assert bars == [("C", 0), ("A", 0), ("B", 1000), ("A", 1000)]
+
+
+def test_correction_horizon_evicts_and_dead_letters_late_ticks() -> None:
+    clear_bus()
+    agg = DeterministicAggregator(
+        timeframe_ms=1000, allowed_lateness_ms=0, correction_horizon_ms=2000
+    )
+    base = 1_700_000_000_000
+
+    for i in range(10):
+        ts = base + i * 1000
+        agg.handle_tick("H", {"ts_ms": ts, "price_ticks": 100, "size": 1}, now_ms=ts)
+    # Bars ending more than 2s before now are gone; the last ones remain.
+    assert sorted(start - base for _, _, start in agg._published) == [7000, 8000]
+
+    late = {"ts_ms": base + 7500, "price_ticks": 90, "size": 1}
+    agg.handle_tick("H", late, now_ms=base + 9000)
+    too_late = {"ts_ms": base + 1500, "price_ticks": 90, "size": 1}
+    agg.handle_tick("H", too_late, now_ms=base + 9000)
+
+    assert len(list(read_all("ohlcv.correction.v1"))) == 1
+    dead = list(read_all("ohlcv.dead_letter.v1"))
+    assert [d["timeframe_start_ms"] - base for d in dead] == [1000]
+    assert agg._counters["late_beyond_horizon"] == 1
+
+
+def test_count_bound_keeps_last_bars_per_symbol() -> None:
+    clear_bus()
+    agg = DeterministicAggregator(
+        timeframe_ms=1000, allowed_lateness_ms=0, max_published_per_symbol=3
+    )
+    base = 1_700_000_000_000
+    for i in range(20):
+        for symbol in ("A", "B"):
+            ts = base + i * 1000
+            tick = {"ts_ms": ts, "price_ticks": 100, "size": 1}
+            agg.handle_tick(symbol, tick, now_ms=ts)
+    assert len(agg._published) == 6
+
+    agg.handle_tick("A", {"ts_ms": base + 2000, "price_ticks": 1, "size": 1})
+    assert [d["symbol"] for d in read_all("ohlcv.dead_letter.v1")] == ["A"]
+    assert list(read_all("ohlcv.correction.v1")) == []
+
+
+def _ladder_ticks(base: int) -> list:
+    ticks = []
+    for i in range(400):
+        symbol = "AB"[i % 2]
+        ticks.append(
+            (symbol, {"ts_ms": base + i * 37, "price_ticks": 100 + (i * 7) % 13})
+        )
+        ticks[-1][1]["trade_id"] = f"{symbol}-{i}"
+    ticks.append(ticks[10])  # duplicate, dropped once for every timeframe
+    return ticks
+
+
+def test_timeframe_ladder_matches_separate_aggregators() -> None:
+    base = 1_700_000_000_000
+    timeframes = [1000, 5000, 60_000]
+
+    clear_bus()
+    for tf in timeframes:
+        agg = DeterministicAggregator(
+            timeframe_ms=tf, allowed_lateness_ms=0, time_source=lambda: 0
+        )
+        for symbol, tick in _ladder_ticks(base):
+            agg.handle_tick(symbol, tick, now_ms=tick["ts_ms"])
+        agg.flush()
+    separate = sorted(
+        read_all("ohlcv.bar.v1"),
+        key=lambda b: (b["timeframe_ms"], b["symbol"], b["timeframe_start_ms"]),
+    )
+
+    clear_bus()
+    ladder = DeterministicAggregator(
+        timeframes=timeframes, allowed_lateness_ms=0, time_source=lambda: 0
+    )
+    for symbol, tick in _ladder_ticks(base):
+        ladder.handle_tick(symbol, tick, now_ms=tick["ts_ms"])
+    ladder.flush()
+    combined = sorted(
+        read_all("ohlcv.bar.v1"),
+        key=lambda b: (b["timeframe_ms"], b["symbol"], b["timeframe_start_ms"]),
+    )
+
+    assert combined == separate
+    assert ladder._counters["duplicates"] == 1
+
+
+def test_ladder_lateness_per_timeframe() -> None:
+    clear_bus()
+    base = 1_700_000_000_000
+    agg = DeterministicAggregator(
+        timeframes=[1000, 10_000],
+        allowed_lateness_ms=0,
+        lateness_by_timeframe_ms={10_000: 5_000},
+    )
+    agg.handle_tick("L", {"ts_ms": base + 100, "price_ticks": 1}, now_ms=base + 100)
+    agg.handle_tick(
+        "L", {"ts_ms": base + 12_000, "price_ticks": 2}, now_ms=base + 12_000
+    )
+    assert {b["timeframe_ms"] for b in read_all("ohlcv.bar.v1")} == {1000}
+
+    # Still within the 10s bar's lateness: folded in, not a correction.
+    agg.handle_tick("L", {"ts_ms": base + 200, "price_ticks": 9}, now_ms=base + 14_000)
+    agg.handle_tick(
+        "L", {"ts_ms": base + 16_000, "price_ticks": 3}, now_ms=base + 16_000
+    )
+    big = [b for b in read_all("ohlcv.bar.v1") if b["timeframe_ms"] == 10_000]
+    assert [(b["high"], b["trade_count"]) for b in big] == [(9, 2)]
+    corrections = list(read_all("ohlcv.correction.v1"))
+    assert [c["timeframe_ms"] for c in corrections] == [1000]
+
+
+def test_corrections_update_published_bar_in_place() -> None:
+    clear_bus()
+    agg = DeterministicAggregator(timeframe_ms=1000, allowed_lateness_ms=0)
+    base = 1_700_000_000_000
+    agg.handle_tick("P", {"ts_ms": base, "price_ticks": 10}, now_ms=base)
+    agg.handle_tick("P", {"ts_ms": base + 1000, "price_ticks": 10}, now_ms=base + 1000)
+    bar = agg._published[("P", 1000, base)]
+    assert not hasattr(bar, "__dict__")
+
+    agg.handle_tick("P", {"ts_ms": base + 5, "price_ticks": 7, "size": 3})
+    assert agg._published[("P", 1000, base)] is bar
+    assert (bar.low, bar.volume, bar.trade_count, bar.version) == (7, 4, 2, 2)
+    corrections = list(read_all("ohlcv.correction.v1"))
+    assert [c["version"] for c in corrections] == [2]
+
+
+def test_corrections_do_not_advance_finalization() -> None:
+    clear_bus()
+    agg = DeterministicAggregator(timeframe_ms=1000, allowed_lateness_ms=0)
+    base = 1_700_000_000_000
+    agg.handle_tick("C", {"ts_ms": base, "price_ticks": 10}, now_ms=base)
+    agg.handle_tick("C", {"ts_ms": base + 1000, "price_ticks": 11}, now_ms=base + 1000)
+    # Corrects the first bar; the second bar has expired but stays open.
+    agg.handle_tick("C", {"ts_ms": base + 5, "price_ticks": 9}, now_ms=base + 2500)
+    agg.handle_tick("C", {"ts_ms": base + 1500, "price_ticks": 12}, now_ms=base + 2500)
+
+    bars = list(read_all("ohlcv.bar.v1"))
+    assert [(b["timeframe_start_ms"], b["trade_count"]) for b in bars] == [
+        (base, 1),
+        (base + 1000, 2),
+    ]
+    corrections = list(read_all("ohlcv.correction.v1"))
+    assert [c["timeframe_start_ms"] for c in corrections] == [base]
+
+
+def _late_tick_stream(seed: int = 8, n: int = 400) -> list:
+    rng = random.Random(seed)
+    now = 1_700_000_000_000
+    ticks = []
+    for i in range(n):
+        now += rng.randint(0, 150)
+        lag = rng.randint(0, 3000) if rng.random() < 0.15 else rng.randint(0, 400)
+        tick = {
+            "ts_ms": now - lag,
+            "price_ticks": 100 + rng.randint(-9, 9),
+            "size": rng.randint(1, 4),
+            "trade_id": f"t{i}",
+        }
+        ticks.append((rng.choice("ABC"), tick, now))
+    return ticks
+
+
+def test_single_timeframe_output_matches_pre_ladder_aggregator() -> None:
+    clear_bus()
+    agg = DeterministicAggregator(
+        timeframe_ms=1000,
+        allowed_lateness_ms=0,
+        dedupe_limit=5,
+        prune_batch=2,
+        time_source=lambda: 0,
+    )
+    for symbol, tick, now_ms in _late_tick_stream():
+        agg.handle_tick(symbol, tick, now_ms)
+    agg.flush()
+    out = {
+        topic: [
+            {k: v for k, v in m.items() if k != "emitted_ts_ms"}
+            for m in read_all(topic)
+        ]
+        for topic in ("ohlcv.bar.v1", "ohlcv.correction.v1")
+    }
+    assert [len(out["ohlcv.bar.v1"]), len(out["ohlcv.correction.v1"])] == [96, 85]
+    # Digest of the same run on the single-timeframe aggregator before the
+    # timeframe ladder.
+    digest = hashlib.sha256(json.dumps(out, sort_keys=True).encode()).hexdigest()
+    assert digest == (
+        "6107aed2e8fe7a890253de23822decc94fa32ca447ce0acab92600620040bad1"
+    )
+
+
+def test_event_time_watermark_releases_bars_during_replay() -> None:
+    clear_bus()
+    base = 1_700_000_000_000
+    # Frozen wall clock: only event time can finalize bars.
+    agg = DeterministicAggregator(
+        timeframe_ms=1000,
+        allowed_lateness_ms=500,
+        clock_mode="event",
+        time_source=lambda: 0,
+    )
+    max_open = 0
+    for i in range(2000):
+        ts = base + i * 50
+        agg.handle_tick(f"S{i % 2}", {"ts_ms": ts, "price_ticks": 1})
+        max_open = max(max_open, len(agg._bars))
+    assert max_open <= 4
+    assert agg.watermark_ms == base + 1999 * 50 - 50
+    assert len(list(read_all("ohlcv.bar.v1"))) == 2 * 99
+
+
+def test_idle_sources_stop_holding_the_watermark() -> None:
+    base = 1_700_000_000_000
+    published = {}
+    for timeout in (0, 5000):
+        clear_bus()
+        agg = DeterministicAggregator(
+            timeframe_ms=1000,
+            allowed_lateness_ms=0,
+            clock_mode="event",
+            idle_timeout_ms=timeout,
+        )
+        agg.handle_tick("QUIET", {"ts_ms": base, "price_ticks": 1})
+        for i in range(20):
+            tick = {"ts_ms": base + i * 1000, "price_ticks": 2, "venue": "X"}
+            agg.handle_tick("BUSY", tick)
+            if i <= 14:
+                # A second venue of the same symbol stops a bit earlier.
+                tick = {"ts_ms": base + i * 1000 + 500, "price_ticks": 3, "venue": "Y"}
+                agg.handle_tick("BUSY", tick)
+        published[timeout] = [
+            (b["symbol"], b["timeframe_start_ms"]) for b in read_all("ohlcv.bar.v1")
+        ]
+        watermark = agg.watermark_ms
+    # Without a timeout the quiet symbol holds every bar back.
+    assert published[0] == []
+    assert ("QUIET", base) in published[5000]
+    assert ("BUSY", base + 13_000) in published[5000]
+    assert ("BUSY", base + 14_000) not in published[5000]
+    assert watermark == base + 14_500
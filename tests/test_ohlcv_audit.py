@@ -0,0 +1,85 @@
+from services.event_store import simple_bus
+from services.event_store.store import EventStore
+from services.ohlcv import audit
+from services.ohlcv.aggregator import DeterministicAggregator
+from services.ohlcv.audit import AuditSink
+
+BASE = 1_700_000_000_000
+
+
+def feed(agg: DeterministicAggregator, bars: int = 10) -> None:
+    for i in range(bars):
+        ts = BASE + i * 1000
+        agg.handle_tick("A", {"ts_ms": ts, "price_ticks": 10, "trade_id": f"a{i}"}, ts)
+        agg.handle_tick("A", {"ts_ms": ts, "price_ticks": 10, "trade_id": f"a{i}"}, ts)
+    agg.flush()
+
+
+def audit_types(store: EventStore) -> list:
+    return [a["event_type"] for a in store.read_all("audit.records.v1")]
+
+
+def test_audit_levels(tmp_path) -> None:
+    counts = {}
+    for level in ("full", "sampled", "off"):
+        with EventStore(tmp_path / level) as store, simple_bus.use_store(store):
+            feed(
+                DeterministicAggregator(
+                    timeframe_ms=1000,
+                    allowed_lateness_ms=0,
+                    audit_level=level,
+                    audit_sample_every=4,
+                )
+            )
+            counts[level] = audit_types(store)
+            assert len(list(store.read_all("ohlcv.bar.v1"))) == 10
+
+    assert counts["full"].count("tick_duplicate") == 10
+    assert counts["sampled"].count("tick_duplicate") == 3  # events 1, 5 and 9
+    assert counts["off"] == []
+
+
+def test_background_sink_writes_into_callers_store(tmp_path) -> None:
+    with EventStore(tmp_path / "inline") as store, simple_bus.use_store(store):
+        feed(
+            DeterministicAggregator(
+                timeframe_ms=1000, allowed_lateness_ms=0, time_source=lambda: 5
+            )
+        )
+        inline = list(store.read_all("audit.records.v1"))
+    with EventStore(tmp_path / "bg") as store, simple_bus.use_store(store):
+        agg = DeterministicAggregator(
+            timeframe_ms=1000,
+            allowed_lateness_ms=0,
+            time_source=lambda: 5,
+            audit_background=True,
+        )
+        feed(agg)
+        background = list(store.read_all("audit.records.v1"))
+        agg.close()
+    assert background == inline
+
+
+def test_closed_sinks_leave_no_exit_hook(tmp_path, monkeypatch) -> None:
+    hooks: list = []
+    monkeypatch.setattr(audit.atexit, "register", hooks.append)
+    monkeypatch.setattr(audit.atexit, "unregister", hooks.remove)
+    with EventStore(tmp_path) as store, simple_bus.use_store(store):
+        sink = AuditSink(background=True)
+        for _ in range(2):  # restarted after close
+            sink.emit("test", BASE, {"n": 1})
+            sink.close()
+            assert hooks == []
+        assert audit_types(store) == ["test", "test"]
+
+
+def test_interval_metrics_are_summed(tmp_path) -> None:
+    with EventStore(tmp_path) as store, simple_bus.use_store(store):
+        agg = DeterministicAggregator(
+            timeframe_ms=1000, allowed_lateness_ms=0, metrics_interval_ms=5000
+        )
+        feed(agg)
+        metrics = list(store.read_all("metrics.ohlcv.v1"))
+    assert [m["bars"] for m in metrics] == [5, 5]
+    assert sum(m["trade_count"] for m in metrics) == 10
+    assert all(m["symbol"] == "A" and m["interval_ms"] == 5000 for m in metrics)
@@ -0,0 +1,91 @@
+import random
+
+import pytest
+
+from services.event_store import simple_bus
+from services.event_store.store import EventStore
+from services.ohlcv.aggregator import DeterministicAggregator
+
+
+def make_ticks(seed: int = 7, n: int = 3000) -> list:
+    rng = random.Random(seed)
+    base = 1_700_000_000_000
+    ticks = []
+    ts = base
+    for i in range(n):
+        ts += rng.randint(0, 120)
+        # Occasional late ticks (corrections / dead letters) and duplicates.
+        tick_ts = ts - rng.randint(0, 6_000) if rng.random() < 0.05 else ts
+        tick = {
+            "ts_ms": tick_ts,
+            "price_ticks": 1000 + rng.randint(-20, 20),
+            "size": rng.randint(1, 5),
+        }
+        if rng.random() < 0.8:
+            tick["trade_id"] = f"t{i}"
+        ticks.append(tick)
+        if rng.random() < 0.03:
+            ticks.append(dict(tick))
+    return ticks
+
+
+def new_aggregator() -> DeterministicAggregator:
+    return DeterministicAggregator(
+        timeframes=[1000, 5000],
+        allowed_lateness_ms=200,
+        correction_horizon_ms=3000,
+        time_source=lambda: 42,
+    )
+
+
+def run(tmp_path, name: str, feed) -> dict:
+    store = EventStore(tmp_path / name)
+    with simple_bus.use_store(store):
+        agg = new_aggregator()
+        feed(agg)
+        agg.flush()
+    store.close()
+    return {
+        p.name: p.read_bytes()
+        for p in sorted((tmp_path / name).iterdir())
+        if p.suffix == ".ndjson"
+    }
+
+
+@pytest.mark.parametrize("clock", ["per_tick", "batch"])
+def test_batch_paths_match_per_tick_output(tmp_path, clock) -> None:
+    ticks = make_ticks()
+    chunks = [ticks[i : i + 250] for i in range(0, len(ticks), 250)]
+
+    def clock_for(chunk):
+        if clock == "per_tick":
+            return [t["ts_ms"] + 100 for t in chunk]
+        return max(t["ts_ms"] for t in chunk)
+
+    def per_tick(agg):
+        for chunk in chunks:
+            clocks = clock_for(chunk)
+            for k, tick in enumerate(chunk):
+                now = clocks[k] if isinstance(clocks, list) else clocks
+                agg.handle_tick("SYM", tick, now_ms=now)
+
+    def batched(agg):
+        for chunk in chunks:
+            agg.handle_ticks("SYM", chunk, now_ms=clock_for(chunk))
+
+    def columnar(agg):
+        for chunk in chunks:
+            agg.handle_tick_arrays(
+                "SYM",
+                [t["ts_ms"] for t in chunk],
+                [t["price_ticks"] for t in chunk],
+                size=[t["size"] for t in chunk],
+                trade_id=[t.get("trade_id") for t in chunk],
+                now_ms=clock_for(chunk),
+            )
+
+    expected = run(tmp_path, "per_tick", per_tick)
+    assert expected["ohlcv.correction.v1.ndjson"]
+    assert expected["ohlcv.dead_letter.v1.ndjson"]
+    assert run(tmp_path, "batched", batched) == expected
+    assert run(tmp_path, "columnar", columnar) == expected
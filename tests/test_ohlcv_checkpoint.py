@@ -0,0 +1,106 @@
+import json
+
+import pytest
+
+from services.event_store import simple_bus
+from services.event_store.store import EventStore
+from services.ohlcv.aggregator import DeterministicAggregator
+from services.ohlcv.checkpoint import consume_ticks, load_checkpoint, save_checkpoint
+
+BASE = 1_700_000_000_000
+OUTPUT_TOPICS = (
+    "ohlcv.bar.v1",
+    "ohlcv.correction.v1",
+    "ohlcv.dead_letter.v1",
+    "metrics.ohlcv.v1",
+    "audit.records.v1",
+)
+
+
+def make_aggregator(clock_mode: str = "processing") -> DeterministicAggregator:
+    return DeterministicAggregator(
+        clock_mode=clock_mode,
+        idle_timeout_ms=1500,
+        timeframes=[1000, 5000],
+        allowed_lateness_ms=100,
+        correction_horizon_ms=3000,
+        dedupe_window_ms=2000,
+        dedupe_bloom_capacity=500,
+        metrics_interval_ms=4000,
+        audit_level="sampled",
+        audit_sample_every=3,
+        time_source=lambda: 0,
+    )
+
+
+def publish_ticks(store: EventStore) -> int:
+    count = 0
+    for i in range(400):
+        ts = BASE + i * 53
+        tick = {"symbol": f"S{i % 3}", "ts_ms": ts, "recv_ts_ms": ts + 7}
+        tick.update(price_ticks=100 + i % 17, size=1 + i % 4, trade_id=f"t{i}")
+        store.publish("market.tick.v1", tick)
+        count += 1
+        if i % 40 == 5:  # duplicate, correction and beyond-horizon ticks
+            store.publish("market.tick.v1", dict(tick, recv_ts_ms=ts + 20))
+            late = dict(tick, ts_ms=ts - 900, trade_id=f"l{i}")
+            store.publish("market.tick.v1", late)
+            old = dict(tick, ts_ms=ts - 9000, trade_id=f"o{i}")
+            store.publish("market.tick.v1", old)
+            count += 3
+    return count
+
+
+def outputs(store: EventStore) -> str:
+    return json.dumps({t: list(store.read_all(t)) for t in OUTPUT_TOPICS})
+
+
+@pytest.mark.parametrize("clock_mode", ["processing", "event"])
+def test_restart_from_checkpoint_matches_uninterrupted_run(
+    tmp_path, clock_mode
+) -> None:
+    with EventStore(tmp_path / "full") as store, simple_bus.use_store(store):
+        total = publish_ticks(store)
+        agg = make_aggregator(clock_mode)
+        assert consume_ticks(agg, store.open_reader("market.tick.v1")) == total
+        agg.flush()
+        expected = outputs(store)
+
+    ckpt = tmp_path / "state" / "ohlcv.ckpt"
+    with EventStore(tmp_path / "restart") as store, simple_bus.use_store(store):
+        publish_ticks(store)
+        first = consume_ticks(
+            make_aggregator(clock_mode),
+            store.open_reader("market.tick.v1"),
+            checkpoint_path=ckpt,
+            checkpoint_interval_ms=2000,
+            max_records=173,
+            poll_size=50,
+        )
+        assert first == 173
+        # The first process is gone; a new one resumes from the checkpoint.
+        agg = make_aggregator(clock_mode)
+        rest = consume_ticks(agg, store.open_reader("market.tick.v1"), ckpt)
+        agg.flush()
+        assert first + rest == total
+        assert outputs(store) == expected
+    assert not ckpt.with_name("ohlcv.ckpt.tmp").exists()
+
+
+def test_snapshot_survives_json_and_rejects_other_config(tmp_path) -> None:
+    clock_mode = "event"
+    with EventStore(tmp_path) as store, simple_bus.use_store(store):
+        agg = make_aggregator(clock_mode)
+        for i in range(50):
+            tick = {"ts_ms": BASE + i * 100, "price_ticks": i, "trade_id": f"t{i}"}
+            agg.handle_tick("A", tick, BASE + i * 100)
+        save_checkpoint(tmp_path / "a.ckpt", agg, input_offset=42)
+
+        restored = make_aggregator(clock_mode)
+        assert load_checkpoint(tmp_path / "a.ckpt", restored) == 42
+        assert restored.snapshot() == json.loads(json.dumps(agg.snapshot()))
+        assert load_checkpoint(tmp_path / "missing.ckpt", restored) is None
+
+        other = DeterministicAggregator(timeframe_ms=1000, time_source=lambda: 0)
+        with pytest.raises(ValueError, match="different configuration"):
+            load_checkpoint(tmp_path / "a.ckpt", other)
@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+
+from services.ohlcv.aggregator import DeterministicAggregator
+from services.ohlcv.dedupe import TradeDeduper, trade_key
+
+
+def test_trade_keys_are_stable_integers() -> None:
+    assert trade_key("abc", None, 1, 2, 3) == trade_key("abc", 7, 9, 9, 9)
+    code = (
+        "from services.ohlcv.dedupe import trade_key; "
+        "print(trade_key('abc', 0, 0, 0, 0), trade_key(None, '7', 1, 2, 3))"
+    )
+    for seed in ("1", "2"):
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            env={**os.environ, "PYTHONHASHSEED": seed},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        by_id, by_seq = map(int, out.stdout.split())
+        assert by_id == trade_key("abc", None, 1, 2, 3)
+        assert by_seq == trade_key(None, 7, 1, 2, 3)
+    assert trade_key(12345, None, 1, 2, 3) == trade_key("12345", None, 1, 2, 3)
+    assert trade_key(None, 1, 1000, 5, 1) != trade_key(None, 1, 1000, 5, 2)
+    assert trade_key(None, None, 1000, 5, 1) is None
+    assert trade_key(None, "A-17", 1, 2, 3) == trade_key(None, "A-17", 1, 2, 3)
+    assert trade_key(None, "A-17", 1, 2, 3) != trade_key(None, "A-18", 1, 2, 3)
+    assert trade_key(None, 1.5, 1, 2, 3) != trade_key(None, 1, 1, 2, 3)
+    assert 0 <= trade_key(None, -1, -5, -7, 1) < 2**64
+
+
+def test_non_numeric_seq_is_deduplicated() -> None:
+    agg = DeterministicAggregator(timeframe_ms=1000, time_source=lambda: 0)
+    tick = {"ts_ms": 1, "price_ticks": 1, "seq": "abc"}
+    agg.handle_tick("A", tick)
+    agg.handle_tick("A", dict(tick))
+    agg.handle_tick("A", {**tick, "seq": "abd"})
+    assert agg._counters["duplicates"] == 1
+
+
+def test_window_prunes_by_event_time() -> None:
+    dedupe = TradeDeduper(window_ms=100)
+    for ts in range(0, 1000, 10):
+        assert not dedupe.seen("A", ts, ts)
+    window = dedupe.windows["A"]
+    # Pruned every quarter window of event time.
+    assert min(window.values()) >= 990 - 100 - 25
+    assert dedupe.seen("A", 990, 990)
+    # Aged out of the exact window and no filter: accepted again.
+    assert not dedupe.seen("A", 0, 0)
+
+
+def test_bloom_catches_duplicates_pruned_by_count() -> None:
+    exact = TradeDeduper(limit=10, prune_batch=5)
+    hybrid = TradeDeduper(limit=10, prune_batch=5, bloom_capacity=1000)
+    for dedupe in (exact, hybrid):
+        for i in range(100):
+            assert not dedupe.seen("A", trade_key(f"t{i}", None, i, 1, 1), i)
+    replay = trade_key("t3", None, 3, 1, 1)
+    assert not exact.seen("A", replay, 3)
+    assert hybrid.seen("A", replay, 3)
+    assert hybrid.counters["dedupe_bloom_duplicates"] == 1
+    # Keys are salted per symbol.
+    assert not hybrid.seen("B", replay, 3)
+
+
+def test_bloom_false_positives_never_drop_new_ticks() -> None:
+    # A saturated filter reports nearly everything; the exact set decides.
+    dedupe = TradeDeduper(limit=100_000, bloom_capacity=8, bloom_bits_per_key=1)
+    for i in range(500):
+        assert not dedupe.seen("A", trade_key(f"t{i}", None, i, 1, 1), i)
+    assert dedupe.counters["dedupe_bloom_false_positives"] > 0
+    assert dedupe.counters["dedupe_bloom_duplicates"] == 0
+    assert dedupe.bloom is not None and dedupe.bloom.nbytes() <= 2 * 8
+
+
+def test_aggregator_reports_dedupe_counters() -> None:
+    agg = DeterministicAggregator(
+        timeframe_ms=1000,
+        allowed_lateness_ms=0,
+        dedupe_window_ms=2000,
+        dedupe_bloom_capacity=1000,
+        time_source=lambda: 0,
+    )
+    base = 1_700_000_000_000
+    for i in range(10):
+        ts = base + i * 1000
+        agg.handle_tick("A", {"ts_ms": ts, "price_ticks": 1, "trade_id": f"a{i}"}, ts)
+    assert len(agg._deduper.windows["A"]) == 3
+    tick = {"ts_ms": base, "price_ticks": 1, "trade_id": "a0"}
+    agg.handle_tick("A", tick, base + 10_000)
+    counters = agg._counter_snapshot()
+    assert counters["duplicates"] == 1
+    assert counters["dedupe_bloom_duplicates"] == 1
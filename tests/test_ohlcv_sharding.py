@@ -0,0 +1,124 @@
+import json
+
+import pytest
+
+from services.event_store import simple_bus
+from services.event_store.store import EventStore
+from services.ohlcv.aggregator import DeterministicAggregator
+from services.ohlcv.config import AggregatorConfig
+from services.ohlcv.sharding import SHARD_METRICS_TOPIC, ShardedAggregator, shard_for
+
+BASE = 1_700_000_000_000
+TOPICS = ("ohlcv.bar.v1", "ohlcv.correction.v1", "metrics.ohlcv.v1", "audit.records.v1")
+KWARGS = {"timeframe_ms": 1000, "allowed_lateness_ms": 200, "timeframes": [1000, 5000]}
+
+
+def feed() -> list:
+    ticks = []
+    for i in range(600):
+        ts = BASE + i * 37
+        tick = {"ts_ms": ts, "price_ticks": 100 + i % 11, "size": 1 + i % 3}
+        tick["trade_id"] = f"t{i}"
+        ticks.append((f"S{i % 7}", tick, ts))
+        if i % 50 == 0:
+            ticks.append((f"S{i % 7}", dict(tick), ts + 5))  # duplicate
+        if i % 90 == 0 and i:
+            late = {"ts_ms": ts - 1500, "price_ticks": 90, "trade_id": f"late{i}"}
+            ticks.append((f"S{i % 7}", late, ts))
+    return ticks
+
+
+def run_sharded(tmp_path, shards: int) -> dict:
+    with EventStore(tmp_path) as store, simple_bus.use_store(store):
+        with ShardedAggregator(shards=shards, batch_size=64, **KWARGS) as agg:
+            agg.handle_ticks(feed())
+        stats = agg.stats()
+        out = {topic: list(store.read_all(topic)) for topic in TOPICS}
+        out["shard_metrics"] = list(store.read_all(SHARD_METRICS_TOPIC))
+    out["stats"] = stats
+    return out
+
+
+def bar_set(bars: list) -> list:
+    return sorted(
+        json.dumps({k: v for k, v in b.items() if k != "emitted_ts_ms"}, sort_keys=True)
+        for b in bars
+    )
+
+
+def test_shard_assignment_is_stable() -> None:
+    assert [shard_for(f"S{i}", 4) for i in range(8)] == [
+        shard_for(f"S{i}", 4) for i in range(8)
+    ]
+    assert {shard_for(f"S{i}", 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+def test_sharded_bars_match_single_aggregator(tmp_path) -> None:
+    with EventStore(tmp_path / "single") as store, simple_bus.use_store(store):
+        agg = DeterministicAggregator(time_source=lambda: 0, **KWARGS)
+        for symbol, tick, now_ms in feed():
+            agg.handle_tick(symbol, tick, now_ms)
+        agg.flush()
+        single = {topic: list(store.read_all(topic)) for topic in TOPICS[:2]}
+
+    sharded = run_sharded(tmp_path / "sharded", shards=3)
+    for topic in TOPICS[:2]:
+        assert single[topic]
+        assert bar_set(sharded[topic]) == bar_set(single[topic])
+
+
+def test_sharded_event_mode_matches_single_aggregator(tmp_path) -> None:
+    kwargs = dict(KWARGS, clock_mode="event")
+    # Receive times run well ahead of event time; only the watermark counts.
+    ticks = [(symbol, tick, now_ms + 10_000) for symbol, tick, now_ms in feed()]
+    with EventStore(tmp_path / "single") as store, simple_bus.use_store(store):
+        agg = DeterministicAggregator(time_source=lambda: 0, **kwargs)
+        for symbol, tick, now_ms in ticks:
+            agg.handle_tick(symbol, tick, now_ms)
+        agg.flush()
+        single = {topic: list(store.read_all(topic)) for topic in TOPICS[:2]}
+
+    with EventStore(tmp_path / "sharded") as store, simple_bus.use_store(store):
+        with ShardedAggregator(shards=3, batch_size=64, **kwargs) as sharded:
+            sharded.handle_ticks(ticks)
+        for topic in TOPICS[:2]:
+            assert bar_set(store.read_all(topic)) == bar_set(single[topic])
+    assert single["ohlcv.bar.v1"]
+
+
+def test_sharded_replay_is_deterministic(tmp_path) -> None:
+    first = run_sharded(tmp_path / "a", shards=3)
+    second = run_sharded(tmp_path / "b", shards=3)
+    for topic in TOPICS:
+        assert json.dumps(first[topic]) == json.dumps(second[topic])
+
+    stats = first["stats"]
+    assert [s["shard"] for s in stats] == [0, 1, 2]
+    assert sum(s["ticks"] for s in stats) == len(feed())
+    assert all(s["busy_ms"] > 0 and s["ticks_per_s"] > 0 for s in stats)
+    assert len(first["shard_metrics"]) == 3
+
+
+def test_worker_errors_are_raised(tmp_path) -> None:
+    with EventStore(tmp_path) as store, simple_bus.use_store(store):
+        agg = ShardedAggregator(shards=2, batch_size=10, **KWARGS)
+        try:
+            with pytest.raises(RuntimeError, match="KeyError"):
+                agg.handle_tick("S1", {"price_ticks": 1}, BASE)
+                agg.flush()
+        finally:
+            agg.close()
+
+
+def test_sharded_aggregator_from_config(tmp_path) -> None:
+    kwargs = AggregatorConfig().as_kwargs()
+    assert "audit_background" in kwargs
+    with EventStore(tmp_path) as store, simple_bus.use_store(store):
+        with ShardedAggregator(shards=2, batch_size=16, **kwargs) as agg:
+            agg.handle_ticks(feed()[:100])
+        assert list(store.read_all("ohlcv.bar.v1"))
+
+
+def test_worker_setup_errors_are_raised() -> None:
+    with pytest.raises(RuntimeError, match="unknown clock mode"):
+        ShardedAggregator(shards=2, clock_mode="wall")
@@ -35,10 +35,19 @@ def test_high_throughput_pruning_and_stability() -> None:
             now_ms=base + 5000 + i,
         )
 
-    dedupe_map = agg._dedupe.get("STRESS")
+    dedupe_map = agg._deduper.windows.get("STRESS")
     assert dedupe_map is not None
     assert len(dedupe_map) <= 500
 
     agg.flush()
     bars = [b for b in read_all("ohlcv.bar.v1") if b["symbol"] == "STRESS"]
     assert isinstance(bars, list)
+
+
+def test_bar_state_is_compact() -> None:
+    from services.ohlcv.bench_memory import measure
+
+    sizes = measure(symbols=300, bars=5)
+    # Slotted bars plus their dict/heap entries (dict-backed bars were ~50B more).
+    assert sizes["bytes_per_open_bar"] < 600
+    assert sizes["bytes_per_published_bar"] < 450